@@ -0,0 +1,101 @@
+import json
+import os
+from datetime import date, datetime, timedelta
+
+import db
+from cache import TTLCache, host_store
+from slots import CALENDAR, BookingIndex, to_minute
+
+# Per-day view of taken slots. Each call runs in its own job process, so the
+# in-process copy only serves repeat lookups within one call; the host tier
+# (cache.HostStore) is what lets callers on other calls reuse a popular day.
+# The TTL bounds how stale a day can get when another worker books into it.
+DAY_CACHE_TTL = float(os.getenv("AVAILABILITY_CACHE_TTL", "30"))
+DAY_CACHE_SIZE = int(os.getenv("AVAILABILITY_CACHE_DAYS", "128"))
+
+_days = TTLCache(maxsize=DAY_CACHE_SIZE, ttl=DAY_CACHE_TTL, shared=host_store("availability_days"),
+                 encode=lambda index: json.dumps(index.by_id), decode=lambda text: BookingIndex(json.loads(text)))
+
+def parse_slot(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def _day_key(dt: datetime) -> str:
+    return dt.date().isoformat()
+
+def _index_rows(rows: list[dict]) -> BookingIndex:
+    return BookingIndex({r['id']: to_minute(parse_slot(r['appointment_slot'])) for r in rows})
+
+def cached_day(date: str) -> BookingIndex | None:
+    """The fresh cached index for a day, without touching hit/miss counters."""
+    return _days.peek(date)
+
+async def day_bookings(date: str) -> BookingIndex:
+    """Returns the booking index for a YYYY-MM-DD day, from cache when fresh."""
+    bookings = _days.get(date)
+    if bookings is not None:
+        return bookings
+
+    rows = await db.taken_slots_between(f"{date}T00:00:00Z", f"{date}T23:59:59Z")
+    bookings = _index_rows(rows)
+    _days.set(date, bookings)
+    return bookings
+
+async def range_bookings(start_day: date, end_day: date) -> BookingIndex:
+    """Returns one index covering [start_day, end_day], loading any uncached days in a single query."""
+    days = []
+    day = start_day
+    while day <= end_day:
+        days.append(day.isoformat())
+        day += timedelta(days=1)
+
+    cached = [_days.get(d) for d in days]
+    if all(index is not None for index in cached):
+        return BookingIndex.merge(cached)
+
+    rows = await db.taken_slots_between(f"{days[0]}T00:00:00Z", f"{days[-1]}T23:59:59Z")
+    by_day = {d: {} for d in days}
+    for r in rows:
+        slot = parse_slot(r['appointment_slot'])
+        by_day.setdefault(_day_key(slot), {})[r['id']] = to_minute(slot)
+    for d in days:
+        _days.set(d, BookingIndex(by_day[d]))
+    return _index_rows(rows)
+
+async def is_free(requested_dt: datetime, exclude_id: str | None = None) -> bool:
+    """Checks the configured conflict window around requested_dt (UTC-aware)."""
+    window = timedelta(minutes=CALENDAR.conflict_window)
+    dates = sorted({_day_key(requested_dt - window), _day_key(requested_dt + window)})
+    indexes = [await day_bookings(d) for d in dates]
+    index = indexes[0] if len(indexes) == 1 else BookingIndex.merge(indexes)
+    return CALENDAR.is_free(index, to_minute(requested_dt), exclude_id)
+
+# --- WRITE-THROUGH ---
+# Writes patch the cached days in place (and in the host tier) so the next
+# lookup stays a cache hit. forget() only sees days this process holds; a day
+# another process cached keeps a cancelled booking, i.e. errs towards "taken",
+# until its TTL.
+
+def record_booking(appointment_id: str, slot: datetime):
+    """Adds (or moves) a booking in the cached day it now belongs to."""
+    forget(appointment_id)
+    key = _day_key(slot)
+    bookings = _days.peek(key)
+    if bookings is not None:
+        bookings.add(appointment_id, to_minute(slot))
+        _days.update(key, bookings)
+
+def invalidate(slot: datetime):
+    """Drops the cached day(s) around a slot after the DB reported a conflict we missed."""
+    window = timedelta(minutes=CALENDAR.conflict_window)
+    for edge in (slot - window, slot + window):
+        _days.pop(_day_key(edge))
+
+def forget(appointment_id: str):
+    """Removes a booking from whichever cached day holds it."""
+    for key, bookings in _days.items():
+        if appointment_id in bookings.by_id:
+            bookings.remove(appointment_id)
+            _days.update(key, bookings)
+
+def stats() -> dict:
+    return _days.stats()
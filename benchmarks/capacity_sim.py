@@ -0,0 +1,183 @@
+"""Multi-process simulation of load-aware job dispatch on one machine.
+
+Usage:
+    python benchmarks/capacity_sim.py [--workers 4] [--rate 3] [--seconds 60]
+                                      [--max-sessions 8] [--skew 1.0]
+
+Starts --workers OS processes. Each one runs an asyncio loop with the real
+capacity.LoadCalculator as its load_fnc, called from a side thread every
+--report-interval seconds, the way the LiveKit worker calls it from an
+executor. Each process stands in for a worker and its job processes
+together, so the loop lag comes from a capacity.LoopLagMonitor on the
+sessions' own loop instead of from job reports. Sessions are asyncio tasks that burn a slice of CPU every 20ms,
+like VAD and audio framing do, so both CPU and event-loop lag grow with
+each admitted call. With --skew above 1, worker 0's sessions cost that many
+times more CPU (a noisy neighbour).
+
+The parent plays dispatcher. Calls arrive as a Poisson stream at --rate per
+second and hold for a random duration. Each call goes to the least-loaded
+worker whose last reported load is below the threshold, or is rejected if
+every worker is full. At the end it prints, per worker: jobs taken, peak
+sessions, peak load, what limited it, and the highest loop-lag p95 it reported, plus how evenly
+jobs were spread (coefficient of variation) and how many calls were rejected.
+"""
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import queue
+import random
+import statistics
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FRAME_S = 0.02
+
+class SimWorker:
+    """The attribute LoadCalculator reads from a livekit Worker."""
+
+    def __init__(self):
+        self.active_jobs: list = []
+
+
+def burn(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+async def session(worker: SimWorker, job_id: int, duration: float, work_per_frame: float):
+    worker.active_jobs.append(job_id)
+    try:
+        end = time.monotonic() + duration
+        while time.monotonic() < end:
+            burn(work_per_frame)
+            await asyncio.sleep(FRAME_S)
+    finally:
+        worker.active_jobs.remove(job_id)
+
+def worker_main(index: int, jobs: mp.Queue, reports: mp.Queue, args):
+    import capacity
+
+    monitor = capacity.LoopLagMonitor()
+    calc = capacity.LoadCalculator(max_sessions=args.max_sessions, threshold=args.threshold,
+                                   lag_source=monitor.p95)
+    work = args.work_ms / 1000 * (args.skew if index == 0 else 1.0)
+    lag_peaks = []
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        monitor.start()
+        worker = SimWorker()
+        stop = asyncio.Event()
+        peak = {"sessions": 0, "load": 0.0, "limited_by": {}}
+
+        def report_loop():
+            while not stop.is_set():
+                load = calc(worker)
+                lag_peaks.append(calc.last["loop_lag_ms"])
+                peak["sessions"] = max(peak["sessions"], calc.last["sessions"])
+                peak["load"] = max(peak["load"], load)
+                if load >= calc.threshold:
+                    limit = calc.last["limited_by"]
+                    peak["limited_by"][limit] = peak["limited_by"].get(limit, 0) + 1
+                reports.put(("load", index, load))
+                time.sleep(args.report_interval)
+
+        def intake():
+            while True:
+                job = jobs.get()
+                if job is None:
+                    loop.call_soon_threadsafe(stop.set)
+                    return
+                job_id, duration = job
+                loop.call_soon_threadsafe(lambda j=job_id, d=duration: loop.create_task(session(worker, j, d, work)))
+
+        threading.Thread(target=report_loop, daemon=True).start()
+        threading.Thread(target=intake, daemon=True).start()
+        await stop.wait()
+        while worker.active_jobs:
+            await asyncio.sleep(0.1)
+        reports.put(("done", index, {**peak, "lag_p95": max(lag_peaks, default=0.0)}))
+
+    asyncio.run(run())
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=3.0, help="New calls per second")
+    parser.add_argument("--seconds", type=float, default=60.0, help="How long calls keep arriving")
+    parser.add_argument("--hold", type=float, default=8.0, help="Mean call duration (s)")
+    parser.add_argument("--max-sessions", type=int, default=8)
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--work-ms", type=float, default=0.8, help="CPU per session per 20ms frame")
+    parser.add_argument("--skew", type=float, default=1.0, help="CPU multiplier for worker 0's sessions")
+    parser.add_argument("--report-interval", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    reports: mp.Queue = mp.Queue()
+    queues = [mp.Queue() for _ in range(args.workers)]
+    procs = [mp.Process(target=worker_main, args=(i, q, reports, args)) for i, q in enumerate(queues)]
+    for proc in procs:
+        proc.start()
+
+    loads = [0.0] * args.workers
+    assigned = [0] * args.workers
+    rejected = 0
+    per_session = args.threshold / args.max_sessions  # Optimistic bump until the next report
+
+    def drain():
+        while True:
+            try:
+                kind, index, value = reports.get_nowait()
+            except queue.Empty:
+                return
+            if kind == "load":
+                loads[index] = value
+
+    time.sleep(1.0)  # Let every worker report once
+    drain()
+    started = time.monotonic()
+    next_arrival = started
+    job_id = 0
+    while time.monotonic() - started < args.seconds:
+        time.sleep(max(0.0, next_arrival - time.monotonic()))
+        next_arrival += rng.expovariate(args.rate)
+        drain()
+        open_workers = [i for i in range(args.workers) if loads[i] < args.threshold]
+        if not open_workers:
+            rejected += 1
+            continue
+        target = min(open_workers, key=lambda i: (loads[i], rng.random()))
+        queues[target].put((job_id, rng.expovariate(1 / args.hold)))
+        loads[target] += per_session
+        assigned[target] += 1
+        job_id += 1
+
+    for q in queues:
+        q.put(None)
+    results = {}
+    while len(results) < args.workers:
+        kind, index, value = reports.get()
+        if kind == "done":
+            results[index] = value
+    for proc in procs:
+        proc.join()
+
+    print(f"{'worker':>6} {'jobs':>5} {'peak sess':>9} {'peak load':>9} {'peak lag p95':>12}  full because")
+    for i in range(args.workers):
+        r = results[i]
+        limits = ", ".join(f"{k} x{v}" for k, v in sorted(r["limited_by"].items())) or "-"
+        print(f"{i:>6} {assigned[i]:>5} {r['sessions']:>9} {r['load']:>9.2f} {r['lag_p95']:>12.1f}  {limits}")
+    mean = statistics.mean(assigned)
+    spread = statistics.pstdev(assigned) / mean if mean else 0.0
+    print(f"calls {job_id + rejected}, admitted {job_id}, rejected {rejected}; "
+          f"jobs per worker CV {spread:.2f} (0 = perfectly even)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Tail latency of tool DB calls under injected faults, with and without resilience.py.
+
+Usage:
+    python benchmarks/db_faults.py [--ops 2000] [--concurrency 50]
+
+Runs a tool-shaped mix of db.py calls (identify, availability, list, book,
+move, cancel) against benchmarks/fake_supabase.py with Faults injected, once
+per scenario and mode:
+
+  plain      no hedging, no retries, no breaker; a call waits until the
+             client gives up (capped at --plain-timeout seconds)
+  resilient  per-tool budgets, hedged reads, idempotent write retries and
+             the circuit breaker, as shipped
+
+and prints p50/p95/p99/max per-call latency, how often the caller would
+hear the fallback line, and "orphans": bookings committed in the DB that the
+caller was never told about (lost replies nobody retried). Needs supabase
+installed (db.py imports it), but no network or credentials.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "offline")
+os.environ.setdefault("ARIA_HOST_CACHE", "")  # Per-process caches only: runs never warm each other
+
+import db  # noqa: E402
+import resilience  # noqa: E402
+from fake_supabase import FakeAsyncClient, Faults  # noqa: E402
+
+SCENARIOS = {
+    "healthy": {},
+    "slow tail 5%": {"tail_rate": 0.05, "tail": (0.3, 2.0)},
+    "errors 2%": {"error_rate": 0.02},
+    "lost replies 2%": {"lost_response_rate": 0.02},
+    "stalls 1%": {"stall_rate": 0.01},
+}
+
+# Tool-shaped callers, named like the tools so resilience.budgeted picks their budgets.
+@resilience.budgeted
+async def identify_user(ctx, number):
+    return await db.find_user(number)
+
+@resilience.budgeted
+async def fetch_slots(ctx, day):
+    return await db.taken_slots_between(f"{day}T00:00:00Z", f"{day}T23:59:59Z")
+
+@resilience.budgeted
+async def retrieve_appointments(ctx, number):
+    return await db.list_appointments(number, limit=5)
+
+@resilience.budgeted
+async def book_appointment(ctx, number, slot):
+    result = await db.reserve_appointment("Fault Bench", number, slot)
+    if result.get("ok"):
+        ctx["confirmed"].add(result["id"])
+    return result
+
+@resilience.budgeted
+async def modify_appointment(ctx, appointment_id, slot):
+    return await db.move_appointment(appointment_id, slot)
+
+@resilience.budgeted
+async def cancel_appointment(ctx, appointment_id):
+    await db.delete_appointment(appointment_id)
+    ctx["confirmed"].discard(appointment_id)
+
+def configure(mode: str, plain_timeout: float):
+    resilience.BREAKER = resilience.CircuitBreaker(resilience.BREAKER_FAILURES, resilience.BREAKER_COOLDOWN)
+    resilience._read_latency.clear()
+    for key in resilience.DB_TOTALS:
+        resilience.DB_TOTALS[key] = 0
+    if mode == "plain":
+        resilience.HEDGE_ENABLED = False
+        resilience.WRITE_RETRIES = 0
+        resilience.WRITE_ATTEMPT_TIMEOUT = plain_timeout
+        resilience.BREAKER.failures = 10 ** 9
+        resilience.DEFAULT_BUDGET = plain_timeout
+        budgets = {name: plain_timeout for name in resilience.TOOL_BUDGETS}
+    else:
+        resilience.HEDGE_ENABLED = True
+        resilience.WRITE_RETRIES = 2
+        resilience.WRITE_ATTEMPT_TIMEOUT = 1.2
+        resilience.DEFAULT_BUDGET = 3.0
+        budgets = dict(SHIPPED_BUDGETS)
+    resilience.TOOL_BUDGETS.update(budgets)
+
+SHIPPED_BUDGETS = dict(resilience.TOOL_BUDGETS)
+CALLS = {fn.__name__: fn for fn in (identify_user, fetch_slots, retrieve_appointments,
+                                    book_appointment, modify_appointment, cancel_appointment)}
+
+async def one_op(ctx, numbers, rng, latencies, fallbacks):
+    number = rng.choice(numbers)
+    day = datetime.now(timezone.utc) + timedelta(days=rng.randint(1, 60))
+    slot = day.replace(hour=rng.randint(0, 23), minute=rng.choice((0, 30)), second=0, microsecond=0)
+    slot_iso = slot.strftime("%Y-%m-%dT%H:%M:00Z")
+    kind = rng.choices(["identify_user", "fetch_slots", "retrieve_appointments",
+                        "book_appointment", "modify_appointment", "cancel_appointment"],
+                       weights=[3, 3, 2, 2, 1, 1])[0]
+    args = {"identify_user": (number,), "fetch_slots": (day.date().isoformat(),),
+            "retrieve_appointments": (number,), "book_appointment": (number, slot_iso)}.get(kind)
+    if args is None:
+        if not ctx["confirmed"]:
+            return
+        target = rng.choice(sorted(ctx["confirmed"]))
+        args = (target, slot_iso) if kind == "modify_appointment" else (target,)
+
+    started = time.perf_counter()
+    result = await CALLS[kind](ctx, *args)
+    latencies.append((time.perf_counter() - started) * 1000)
+    if result == resilience.FALLBACK_LINE:
+        fallbacks.append(kind)
+
+async def run(scenario: dict, mode: str, ops: int, concurrency: int, plain_timeout: float):
+    configure(mode, plain_timeout)
+    rng = random.Random(5)
+    faults = Faults(rng=random.Random(9), stall_seconds=plain_timeout + 5, **scenario)
+    client = FakeAsyncClient(latency=lambda op: rng.uniform(0.015, 0.040), faults=None)
+    numbers = client.seed(1_000, 500)  # Sparse, so most bookings succeed
+    client.faults = faults  # Seeding is fault-free
+    db.use_client(client)
+
+    ctx = {"confirmed": set()}
+    latencies, fallbacks = [], []
+    queue = iter(range(ops))
+
+    async def worker():
+        for _ in queue:
+            await one_op(ctx, numbers, rng, latencies, fallbacks)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    committed = {i for i, row in client.appointments.rows.items() if row["user_name"] == "Fault Bench"}
+    orphans = len(committed - ctx["confirmed"])
+    latencies.sort()
+    pick = lambda q: latencies[min(int(q * len(latencies)), len(latencies) - 1)] if latencies else 0.0
+    return {
+        "p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": latencies[-1] if latencies else 0.0,
+        "fallback_pct": 100 * len(fallbacks) / max(len(latencies), 1),
+        "orphans": orphans, "wall": wall, "totals": dict(resilience.DB_TOTALS),
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--plain-timeout", type=float, default=10.0,
+                        help="How long a plain call may hang before the client gives up")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<18} {'mode':<10} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>8} "
+          f"{'fallback':>8} {'orphans':>7}  hedges/wins retries timeouts")
+    for name, scenario in SCENARIOS.items():
+        for mode in ("plain", "resilient"):
+            r = asyncio.run(run(scenario, mode, args.ops, args.concurrency, args.plain_timeout))
+            t = r["totals"]
+            print(f"{name:<18} {mode:<10} {r['p50']:>7.0f} {r['p95']:>7.0f} {r['p99']:>7.0f} {r['max']:>8.0f} "
+                  f"{r['fallback_pct']:>7.1f}% {r['orphans']:>7}  {t['hedges']}/{t['hedge_wins']} "
+                  f"{t['retries']} {t['timeouts']}")
+
+if __name__ == "__main__":
+    main()
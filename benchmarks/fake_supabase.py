@@ -0,0 +1,297 @@
+"""In-memory stand-in for the Supabase AsyncClient, for offline load tests and benchmarks.
+
+Implements the slice of the PostgREST query builder db.py uses (select / eq /
+neq / gte / lte / order / limit / insert / update / delete / execute) plus the
+reserve_appointment and move_appointment RPCs from migrations/. Rows are
+indexed by contact_number and by appointment_slot, like the real table, so
+lookups stay realistic at 1M rows. Every execute() counts one round trip and
+the JSON bytes returned, and can be delayed by a latency model.
+
+Faults(...) injects the failures db.py / resilience.py must survive: errors,
+stalls, a slow tail, and "lost responses" (the write commits, the reply never
+arrives in time), which is what the RPCs' request ids exist for.
+"""
+import asyncio
+import bisect
+import json
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+def canon_slot(value) -> str:
+    """Normalizes any ISO timestamp to the form Postgres returns for timestamptz."""
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat()
+
+
+class FakeAPIError(Exception):
+    pass
+
+
+class Faults:
+    """Per-request fault probabilities for FakeAsyncClient."""
+
+    def __init__(self, error_rate: float = 0.0, stall_rate: float = 0.0, lost_response_rate: float = 0.0,
+                 tail_rate: float = 0.0, tail: tuple[float, float] = (0.3, 2.0), stall_seconds: float = 30.0,
+                 rng=None):
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.lost_response_rate = lost_response_rate
+        self.tail_rate = tail_rate
+        self.tail = tail
+        self.stall_seconds = stall_seconds
+        self.rng = rng or random.Random(11)
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeTable:
+    def __init__(self):
+        self.rows: dict[str, dict] = {}
+        self.by_contact: dict[str, set] = {}
+        self.by_slot: list[tuple[str, str]] = []  # sorted (slot, id)
+
+    def add(self, row: dict):
+        row = dict(row)
+        row.setdefault("id", str(uuid.uuid4()))
+        row["appointment_slot"] = canon_slot(row["appointment_slot"])
+        self.rows[row["id"]] = row
+        self.by_contact.setdefault(row.get("contact_number"), set()).add(row["id"])
+        bisect.insort(self.by_slot, (row["appointment_slot"], row["id"]))
+        return row
+
+    def remove(self, row_id: str):
+        row = self.rows.pop(row_id)
+        self.by_contact.get(row.get("contact_number"), set()).discard(row_id)
+        del self.by_slot[bisect.bisect_left(self.by_slot, (row["appointment_slot"], row_id))]
+        return row
+
+    def move(self, row_id: str, slot: str):
+        row = self.remove(row_id)
+        row["appointment_slot"] = slot
+        return self.add(row)
+
+    def slot_range(self, lo: str | None, hi: str | None) -> list[str]:
+        start = bisect.bisect_left(self.by_slot, (lo, "")) if lo else 0
+        end = bisect.bisect_right(self.by_slot, (hi, "￿")) if hi else len(self.by_slot)
+        return [row_id for _, row_id in self.by_slot[start:end]]
+
+
+class FakeQuery:
+    def __init__(self, client: "FakeAsyncClient", table: FakeTable):
+        self.client = client
+        self.table = table
+        self.op = "select"
+        self.columns = None
+        self.payload = None
+        self.filters: list[tuple[str, str, object]] = []
+        self.order_by = None
+        self.max_rows = None
+        self.minimal = False
+
+    def select(self, columns: str = "*"):
+        self.columns = None if columns.strip() == "*" else [c.strip() for c in columns.split(",")]
+        return self
+
+    def insert(self, data: dict):
+        self.op, self.payload = "insert", data
+        return self
+
+    def update(self, data: dict):
+        self.op, self.payload = "update", data
+        return self
+
+    def delete(self, returning: str = "representation"):
+        self.op = "delete"
+        self.minimal = str(getattr(returning, "value", returning)) == "minimal"
+        return self
+
+    def _filter(self, op: str, column: str, value):
+        if column == "appointment_slot":
+            value = canon_slot(value)
+        self.filters.append((op, column, value))
+        return self
+
+    def eq(self, column, value): return self._filter("eq", column, value)
+    def neq(self, column, value): return self._filter("neq", column, value)
+    def gte(self, column, value): return self._filter("gte", column, value)
+    def lte(self, column, value): return self._filter("lte", column, value)
+
+    def order(self, column: str, desc: bool = False):
+        self.order_by = (column, desc)
+        return self
+
+    def limit(self, count: int):
+        self.max_rows = count
+        return self
+
+    def _candidates(self) -> list[str]:
+        """Uses the contact or slot index when a filter allows it, like the planner would."""
+        for op, column, value in self.filters:
+            if op == "eq" and column == "id":
+                return [value] if value in self.table.rows else []
+            if op == "eq" and column == "contact_number":
+                return list(self.table.by_contact.get(value, ()))
+        lo = next((v for op, c, v in self.filters if op == "gte" and c == "appointment_slot"), None)
+        hi = next((v for op, c, v in self.filters if op == "lte" and c == "appointment_slot"), None)
+        if lo or hi:
+            return self.table.slot_range(lo, hi)
+        self.client.stats["seq_scans"] += 1
+        return list(self.table.rows)
+
+    def _matches(self, row: dict) -> bool:
+        for op, column, value in self.filters:
+            field = row.get(column)
+            if op == "eq" and field != value: return False
+            if op == "neq" and field == value: return False
+            if op == "gte" and not field >= value: return False
+            if op == "lte" and not field <= value: return False
+        return True
+
+    def _run(self):
+        if self.op == "insert":
+            return [self.table.add(self.payload)]
+        rows = [self.table.rows[i] for i in self._candidates() if self._matches(self.table.rows[i])]
+        if self.order_by:
+            column, desc = self.order_by
+            rows.sort(key=lambda r: r.get(column), reverse=desc)
+        if self.max_rows is not None:
+            rows = rows[:self.max_rows]
+        if self.op == "update":
+            out = []
+            for row in rows:
+                if "appointment_slot" in self.payload:
+                    row = self.table.move(row["id"], canon_slot(self.payload["appointment_slot"]))
+                row.update({k: v for k, v in self.payload.items() if k != "appointment_slot"})
+                out.append(dict(row))
+            return out
+        if self.op == "delete":
+            removed = [self.table.remove(row["id"]) for row in rows]
+            return [] if self.minimal else removed
+        if self.columns:
+            return [{c: row.get(c) for c in self.columns} for row in rows]
+        return [dict(row) for row in rows]
+
+    async def execute(self):
+        return await self.client._round_trip(f"{self.op}", self._run)
+
+
+class FakeRpc:
+    def __init__(self, client: "FakeAsyncClient", name: str, params: dict):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    async def execute(self):
+        handler = getattr(self.client, f"_rpc_{self.name}")
+        return await self.client._round_trip(f"rpc:{self.name}", lambda: handler(**self.params))
+
+
+class FakeAsyncClient:
+    """Drop-in for supabase.AsyncClient as used by db.py (see db.use_client)."""
+
+    def __init__(self, latency=None, faults: Faults | None = None):
+        # latency(op) -> seconds; defaults to a 15-40ms round trip
+        self.latency = latency or (lambda op: random.uniform(0.015, 0.040))
+        self.faults = faults
+        self.appointments = FakeTable()
+        self.requests: dict[str, dict] = {}  # p_request_id -> stored RPC result (migration 0004)
+        self.stats = {"round_trips": 0, "bytes": 0, "seq_scans": 0,
+                      "errors": 0, "stalls": 0, "lost_responses": 0, "replayed": 0}
+
+    def table(self, name: str) -> FakeQuery:
+        assert name == "appointments", name
+        return FakeQuery(self, self.appointments)
+
+    def rpc(self, name: str, params: dict) -> FakeRpc:
+        return FakeRpc(self, name, params)
+
+    async def _round_trip(self, op: str, run):
+        self.stats["round_trips"] += 1
+        faults = self.faults
+        delay = self.latency(op)
+        if faults and faults.rng.random() < faults.tail_rate:
+            delay += faults.rng.uniform(*faults.tail)
+        if delay:
+            await asyncio.sleep(delay)
+        if faults:
+            roll = faults.rng.random()
+            if roll < faults.error_rate:
+                self.stats["errors"] += 1
+                raise FakeAPIError(f"injected error on {op}")
+            if roll < faults.error_rate + faults.stall_rate:
+                self.stats["stalls"] += 1
+                await asyncio.sleep(faults.stall_seconds)
+        # The statement runs atomically at the "server", after the network delay
+        data = run()
+        if faults and faults.rng.random() < faults.lost_response_rate:
+            self.stats["lost_responses"] += 1
+            await asyncio.sleep(faults.stall_seconds)  # Committed, but the reply is stuck
+        self.stats["bytes"] += len(json.dumps(data, default=str))
+        return FakeResponse(data)
+
+    def _window_conflicts(self, slot: str, window_minutes: int, exclude_id=None) -> list[str]:
+        center = datetime.fromisoformat(slot)
+        lo = canon_slot(center - timedelta(minutes=window_minutes))
+        hi = canon_slot(center + timedelta(minutes=window_minutes))
+        ids = [i for i in self.appointments.slot_range(lo, hi) if i != exclude_id]
+        return sorted((self.appointments.rows[i]["appointment_slot"] for i in ids),
+                      key=lambda s: abs(datetime.fromisoformat(s) - center))
+
+    def _idempotent(self, request_id, apply):
+        if request_id in self.requests:
+            self.stats["replayed"] += 1
+            return self.requests[request_id]
+        result = apply()
+        if request_id:
+            self.requests[request_id] = result
+        return result
+
+    def _rpc_reserve_appointment(self, p_request_id=None, **params):
+        return self._idempotent(p_request_id, lambda: self._reserve(**params))
+
+    def _rpc_move_appointment(self, p_request_id=None, **params):
+        return self._idempotent(p_request_id, lambda: self._move(**params))
+
+    def _reserve(self, p_user_name, p_contact_number, p_slot, p_window_minutes=29, p_capacity=1):
+        slot = canon_slot(p_slot)
+        taken = self._window_conflicts(slot, p_window_minutes)
+        if len(taken) >= p_capacity:
+            return {"ok": False, "conflict_slot": taken[0]}
+        row = self.appointments.add({"user_name": p_user_name, "contact_number": p_contact_number,
+                                     "appointment_slot": slot, "status": "booked"})
+        return {"ok": True, "id": row["id"], "appointment_slot": slot}
+
+    def _move(self, p_id, p_slot, p_window_minutes=29, p_capacity=1):
+        slot = canon_slot(p_slot)
+        taken = self._window_conflicts(slot, p_window_minutes, exclude_id=p_id)
+        if len(taken) >= p_capacity:
+            return {"ok": False, "conflict_slot": taken[0]}
+        if p_id not in self.appointments.rows:
+            return {"ok": False, "missing": True}
+        self.appointments.move(p_id, slot)
+        return {"ok": True, "id": p_id, "appointment_slot": slot}
+
+    def seed(self, appointments: int, contacts: int, days: int = 60, start: datetime | None = None, rng=None):
+        """Fills the table with `appointments` rows spread over `days` and `contacts` callers."""
+        rng = rng or random.Random(7)
+        start = start or datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        numbers = [f"{5550000000 + i:010d}" for i in range(contacts)]
+        table = self.appointments
+        for n in range(appointments):
+            slot = canon_slot(start + timedelta(days=rng.randrange(days), minutes=rng.randrange(0, 24 * 60, 30)))
+            row = {"id": str(uuid.UUID(int=rng.getrandbits(128))), "user_name": f"Caller {n}",
+                   "contact_number": rng.choice(numbers), "appointment_slot": slot, "status": "booked"}
+            table.rows[row["id"]] = row
+            table.by_contact.setdefault(row["contact_number"], set()).add(row["id"])
+            table.by_slot.append((slot, row["id"]))
+        table.by_slot.sort()  # One sort instead of N insorts
+        return numbers
@@ -0,0 +1,550 @@
+"""Offline load test: N simulated callers against one worker process.
+
+Usage:
+    python benchmarks/loadtest.py [--sessions 10,50,100,200] [--time-scale 0.25]
+                                  [--rows 100000] [--ramp 5] [--worker-mem-mb 4096]
+
+Every level runs in a fresh interpreter. Each simulated caller goes through
+the real agent.entrypoint: its bring-up, the session event handlers it
+registers (interim/final transcripts drive the identity prefetch and slot
+speculation), AriaAgent.on_user_turn_completed's phone-number fast path, and
+the real tools, db, availability, UI channel and lifecycle code. Replaced:
+
+  * LiveKit room / job context -> in-process fakes (data packets are counted)
+  * AgentSession and Agent -> a scripted session (FakeAgentSession) that
+    fires the same events and calls the tools the LLM would. LiveKit's own
+    pipeline (audio frames, VAD inference, STT/TTS streaming, turn
+    detection, LLM streaming) does NOT run.
+  * Deepgram / OpenAI / Cartesia / Silero / Beyond Presence -> stubs; only
+    the TTS stub is exercised (greeting and goodbye renders), the rest are
+    just constructed. Provider delays are scripted sleeps.
+  * Supabase -> benchmarks/fake_supabase.py, seeded with --rows appointments
+
+So the numbers measure this repo's per-session overhead (tools, DB layer,
+caches, UI channel, session state) under concurrency. The sessions share one
+interpreter, but LiveKit gives every room its own job process, so per-room
+CPU and RSS add what a bare job process costs: a separate fresh interpreter
+that imports agent (with the real plugins when installed) and runs the real
+prewarm, measured once per run. Rooms per worker divides --worker-mem-mb by
+that per-room RSS. They are still LOWER BOUNDS: a real session also pays for
+LiveKit's audio pipeline, which dominates. Size workers from a staging run
+with real plugins, not from these figures.
+
+Per level it reports throughput, per-turn latency (end of caller speech ->
+first agent audio) p50/p95/p99, the part of it the worker itself added on
+top of the scripted provider delays, event-loop lag (pessimistic: real rooms
+don't share a loop), CPU and RSS per room, rooms per worker by memory, and
+how often the transcript fast path answered identify_user.
+Needs livekit-agents and supabase installed, but no network or credentials.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Provider delays in seconds (median, jitter), before --time-scale.
+DELAYS = {
+    "user_speech": (2.0, 0.8),   # Caller talking; not part of the turn latency
+    "stt_final": (0.25, 0.08),   # End of speech -> final transcript
+    "llm_ttft": (0.35, 0.12),    # Prompt -> first token (tool call or reply)
+    "tts_ttfb": (0.15, 0.05),    # Text -> first audio
+    "connect": (0.12, 0.04),
+    "avatar": (0.30, 0.10),
+}
+SPEECH_SECONDS_PER_CHAR = 0.06
+SAMPLE_RATE = 24000
+
+# --- STUB PROVIDERS ---
+
+class Scale:
+    factor = 1.0
+
+def delay(kind: str) -> float:
+    median, jitter = DELAYS[kind]
+    return max(0.0, random.gauss(median, jitter)) * Scale.factor
+
+def speech_seconds(text: str) -> float:
+    return len(text) * SPEECH_SECONDS_PER_CHAR * Scale.factor
+
+
+class FakeChunk:
+    def __init__(self, frame):
+        self.frame = frame
+
+
+class FakeSynthesis:
+    def __init__(self, text: str):
+        self.text = text
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def __aiter__(self):
+        from livekit import rtc
+        await asyncio.sleep(delay("tts_ttfb"))
+        samples = int(speech_seconds(self.text) * SAMPLE_RATE)
+        chunk = SAMPLE_RATE // 10
+        for offset in range(0, samples, chunk):
+            n = min(chunk, samples - offset)
+            yield FakeChunk(rtc.AudioFrame(bytes(2 * n), SAMPLE_RATE, 1, n))
+
+
+class FakeTTS:
+    def __init__(self, **kwargs):
+        pass
+
+    def synthesize(self, text: str):
+        return FakeSynthesis(text)
+
+
+class FakePlugin:
+    """Accepts any constructor arguments; stands in for STT, LLM and VAD objects."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    @classmethod
+    def load(cls, *args, **kwargs):
+        return cls()
+
+
+class FakeAvatarSession:
+    def __init__(self, **kwargs):
+        pass
+
+    async def start(self, session, room):
+        await asyncio.sleep(delay("avatar"))
+
+    async def aclose(self):
+        pass
+
+
+class FakeAgent:
+    """Holds the tools; on_user_turn_completed is the real AriaAgent's (see run_level)."""
+
+    def __init__(self, instructions: str = "", llm=None, tools=None):
+        self.session = None  # Set by FakeAgentSession.start, like LiveKit's activity
+        self.instructions = instructions
+        self.tools = {getattr(t, "__name__", str(t)): t for t in tools or []}
+
+
+class FakeSpeechHandle:
+    def __init__(self, playout):
+        self._playout = playout
+
+    async def wait_for_playout(self):
+        await asyncio.shield(self._playout)
+
+    def __await__(self):
+        return self.wait_for_playout().__await__()
+
+
+class FakeRunContext:
+    def __init__(self, session):
+        self.session = session
+        self.userdata = session.userdata
+
+
+class FakeTurnContext:
+    """Collects what on_user_turn_completed injects into the LLM's context."""
+
+    def __init__(self):
+        self.messages: list[tuple[str, str]] = []
+
+    def add_message(self, role: str, content: str):
+        self.messages.append((role, content))
+
+
+class FakeAgentSession:
+    """Plays one scripted caller: speaks, waits for the agent's tool call and
+    reply, and records how long the agent took to start answering."""
+
+    def __init__(self, userdata=None, vad=None, stt=None, tts=None, **kwargs):
+        self.userdata = userdata
+        self.tts = tts
+        self.handlers: dict[str, list] = {}
+        self.greeted = asyncio.Event()
+        self.conversation: asyncio.Task | None = None
+        self.turns = Harness.turns
+        self.overhead = Harness.overhead
+        self.fastpath = Harness.fastpath
+
+    def on(self, event: str, callback=None):
+        def register(fn):
+            self.handlers.setdefault(event, []).append(fn)
+            return fn
+        return register(callback) if callback else register
+
+    def _fire(self, event: str, payload):
+        for fn in self.handlers.get(event, []):
+            fn(payload)
+
+    async def start(self, agent, room):
+        self.agent = agent
+        agent.session = self
+        self.room = room
+        self.conversation = asyncio.create_task(self._converse(Harness.script()))
+        self.conversation.add_done_callback(self._check)
+        return None
+
+    def _check(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Conversation failed: {task.exception()!r}", file=sys.stderr)
+            self.userdata.lifecycle.hang_up()  # Don't leave the job waiting forever
+
+    def say(self, text: str, audio=None, **kwargs):
+        self._fire("agent_state_changed", type("Ev", (), {"new_state": "speaking"})())
+        return FakeSpeechHandle(asyncio.ensure_future(self._play(text, audio)))
+
+    async def _play(self, text: str, audio):
+        if audio is None:
+            await asyncio.sleep(delay("tts_ttfb") + speech_seconds(text))
+        else:
+            seconds = 0.0
+            async for frame in audio:
+                seconds += frame.samples_per_channel / frame.sample_rate
+            await asyncio.sleep(seconds)
+        self.greeted.set()
+
+    async def _speak(self, utterance: str):
+        """The caller talking: interim transcripts grow word by word, like STT's."""
+        words = utterance.split()
+        step = delay("user_speech") / max(len(words), 1)
+        for n in range(1, len(words) + 1):
+            await asyncio.sleep(step)
+            self._fire("user_input_transcribed", SimpleNamespace(transcript=" ".join(words[:n]), is_final=False))
+
+    async def _converse(self, script):
+        await self.greeted.wait()
+        ctx = FakeRunContext(self)
+        for utterance, tool_name, kwargs in script:
+            await self._speak(utterance)
+            ended = time.perf_counter()
+            scripted = delay("stt_final")
+            await asyncio.sleep(scripted)
+            self._fire("user_input_transcribed", SimpleNamespace(transcript=utterance, is_final=True))
+
+            # The real AriaAgent hook, exactly as AgentSession would call it
+            turn_ctx = FakeTurnContext()
+            await self.agent.on_user_turn_completed(turn_ctx, SimpleNamespace(text_content=utterance))
+            llm_delay = delay("llm_ttft")
+            scripted += llm_delay
+            await asyncio.sleep(llm_delay)
+
+            if tool_name == "identify_user" and turn_ctx.messages:
+                # Identity was injected; the LLM answers without a tool round trip
+                self.fastpath.append(1)
+                reply = turn_ctx.messages[-1][1]
+            else:
+                if tool_name == "identify_user":
+                    self.fastpath.append(0)
+                reply = await self.agent.tools[tool_name](ctx, **kwargs)
+            if tool_name == "summarize_and_exit":
+                # The tool speaks the goodbye itself and schedules the hang-up
+                self._record(ended, scripted)
+                return
+
+            reply_delay = delay("llm_ttft") + delay("tts_ttfb")
+            scripted += reply_delay
+            await asyncio.sleep(reply_delay)
+            self._record(ended, scripted)
+            await self.say(str(reply))
+
+    def _record(self, ended: float, scripted: float):
+        elapsed = (time.perf_counter() - ended) * 1000
+        self.turns.observe(elapsed)
+        self.overhead.observe(max(0.0, elapsed - scripted * 1000))
+
+    async def aclose(self):
+        if self.conversation is not None and not self.conversation.done():
+            self.conversation.cancel()
+
+
+# --- FAKE ROOM ---
+
+class FakeLocalParticipant:
+    def __init__(self):
+        self.packets = 0
+        self.bytes = 0
+
+    async def publish_data(self, payload, reliable=True, topic="", destination_identities=None):
+        self.packets += 1
+        self.bytes += len(payload)
+
+
+class FakeRoom:
+    def __init__(self, name: str):
+        self.name = name
+        self.local_participant = FakeLocalParticipant()
+        self.remote_participants = {"caller": object()}
+        self._handlers: dict[str, list] = {}
+        self._connected = False
+
+    def on(self, event: str, callback=None):
+        def register(fn):
+            self._handlers.setdefault(event, []).append(fn)
+            return fn
+        return register(callback) if callback else register
+
+    def isconnected(self) -> bool:
+        return self._connected
+
+    async def connect(self):
+        await asyncio.sleep(delay("connect"))
+        self._connected = True
+
+    async def disconnect(self):
+        if not self._connected:
+            return
+        self._connected = False
+        for fn in self._handlers.get("disconnected", []):
+            fn()
+
+
+class FakeJob:
+    def __init__(self, room):
+        self.room = room
+
+
+class FakeProc:
+    def __init__(self):
+        self.userdata: dict = {}
+
+
+class FakeJobContext:
+    def __init__(self, name: str, proc: FakeProc):
+        self.room = FakeRoom(name)
+        self.job = FakeJob(self.room)
+        self.proc = proc
+        self.shutdown_callbacks = []
+
+    def connect(self):
+        return self.room.connect()
+
+    def add_shutdown_callback(self, callback):
+        self.shutdown_callbacks.append(callback)
+
+    async def shutdown(self):
+        for callback in self.shutdown_callbacks:
+            await callback()
+
+
+# --- DRIVER ---
+
+class Harness:
+    turns = None
+    overhead = None
+    fastpath: list[int] = []
+    numbers: list[str] = []
+
+    @staticmethod
+    def script() -> list[tuple[str, str, dict]]:
+        """One call as (what the caller says, tool the LLM calls, its arguments): identify,
+        look for openings, book, list, then move or cancel, then goodbye."""
+        returning = random.random() < 0.7
+        phone = random.choice(Harness.numbers) if returning else f"{random.randrange(10**9, 10**10):010d}"
+        day = (datetime.now(timezone.utc) + timedelta(days=random.randint(1, 14))).date()
+        weekday, iso = day.strftime("%A"), day.isoformat()
+        slot = f"{random.randint(9, 16):02d}:{random.choice(('00', '30'))}"
+        other = f"{random.randint(9, 16):02d}:{random.choice(('00', '30'))}"
+        script = [
+            (f"Sure, my number is {' '.join(phone[:3])} {' '.join(phone[3:6])} {' '.join(phone[6:])}",
+             "identify_user", {"phone_number": phone}),
+            (f"Do you have anything on {weekday} the {day.day}th?", "find_next_available", {"start_date": iso})
+            if random.random() < 0.5 else
+            (f"What's open on {weekday} the {day.day}th?", "fetch_slots", {"date": iso}),
+            (f"Let's do {slot} please", "book_appointment",
+             {"name": "Load Test", "contact_number": phone, "date": iso, "time_str": slot}),
+            ("Can you read me my appointments?", "retrieve_appointments", {"contact_number": phone}),
+        ]
+        if random.random() < 0.5:
+            script.append((f"Move the first one to {other}", "modify_appointment",
+                           {"appointment_number": "1", "new_date": iso, "new_time": other}))
+        else:
+            script.append(("Cancel the first one", "cancel_appointment", {"appointment_number": "1"}))
+        script.append(("That's all, thanks", "summarize_and_exit", {"summary": "Booked and adjusted an appointment."}))
+        return script
+
+
+def rss_kb() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+def cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+def job_baseline() -> dict:
+    """CPU and RSS of an idle job process: interpreter, agent's imports and the real prewarm."""
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, HERE)
+    os.environ.setdefault("SUPABASE_URL", "http://localhost")
+    os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "offline")
+    os.environ.setdefault("ARIA_HOST_CACHE", "")
+    os.environ.pop("METRICS_PORT", None)
+
+    import agent
+    import db
+    from fake_supabase import FakeAsyncClient
+
+    db.use_client(FakeAsyncClient())  # Empty; supabase itself is already imported by db
+    prewarm = "real"
+    try:
+        agent.prewarm_resources({})
+    except Exception as e:
+        print(f"Real prewarm failed, VAD stubbed: {e!r}", file=sys.stderr)
+        agent.silero = type("silero", (), {"VAD": FakePlugin})
+        agent.prewarm_resources({})
+        prewarm = "stub"
+    return {"rss_kb": rss_kb(), "cpu_ms": round(cpu_seconds() * 1000, 1), "prewarm": prewarm}
+
+async def watch_loop(lag, peak: dict, interval: float = 0.05):
+    """Samples event-loop lag (sleep overshoot) and peak RSS until cancelled."""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag.observe(max(0.0, (time.perf_counter() - started - interval) * 1000))
+        peak["rss"] = max(peak["rss"], rss_kb())
+
+async def run_level(sessions: int, ramp: float, rows: int) -> dict:
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, HERE)
+    os.environ.setdefault("SUPABASE_URL", "http://localhost")
+    os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "offline")
+    os.environ.setdefault("ARIA_HOST_CACHE", "")  # Runs never warm each other
+    os.environ.pop("METRICS_PORT", None)
+
+    import agent
+    import db
+    import telemetry
+    from fake_supabase import FakeAsyncClient
+
+    client = FakeAsyncClient()
+    Harness.numbers = client.seed(rows, max(rows // 5, 1))
+    db.use_client(client)
+    Harness.turns = telemetry.LatencyHistogram(1_000_000)
+    Harness.overhead = telemetry.LatencyHistogram(1_000_000)
+    Harness.fastpath = []
+
+    # The scripted session drives the real fast path; only LiveKit's Agent base is swapped out
+    FakeAgent.on_user_turn_completed = agent.AriaAgent.on_user_turn_completed
+    agent.AgentSession = FakeAgentSession
+    agent.Agent = agent.AriaAgent = FakeAgent
+    agent.bey = type("bey", (), {"AvatarSession": FakeAvatarSession})
+    agent.cartesia = type("cartesia", (), {"TTS": FakeTTS})
+    agent.deepgram = type("deepgram", (), {"STT": FakePlugin})
+    agent.openai = type("openai", (), {"LLM": FakePlugin})
+    agent.silero = type("silero", (), {"VAD": FakePlugin})
+
+    proc = FakeProc()
+    agent.prewarm_resources(proc.userdata)
+
+    lag = telemetry.LatencyHistogram(1_000_000)
+    peak = {"rss": rss_kb()}
+    baseline_rss = peak["rss"]
+    watcher = asyncio.create_task(watch_loop(lag, peak))
+
+    async def one(index: int):
+        await asyncio.sleep(random.uniform(0, ramp))
+        ctx = FakeJobContext(f"load-{index}", proc)
+        try:
+            await agent.entrypoint(ctx)
+        finally:
+            await ctx.shutdown()
+        return ctx.room.local_participant
+
+    cpu_before = cpu_seconds()
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(sessions)), return_exceptions=True)
+    wall = time.perf_counter() - started
+    cpu = cpu_seconds() - cpu_before
+    watcher.cancel()
+
+    failures = [r for r in results if isinstance(r, BaseException)]
+    for failure in failures[:3]:
+        print(f"Session failed: {failure!r}", file=sys.stderr)
+    done = [r for r in results if not isinstance(r, BaseException)]
+    return {
+        "sessions": sessions,
+        "failed": len(failures),
+        "wall_s": round(wall, 2),
+        "sessions_per_s": round(len(done) / wall, 2),
+        "turns_per_s": round(Harness.turns.count / wall, 2),
+        "turn_ms": Harness.turns.summary(),
+        "worker_overhead_ms": Harness.overhead.summary(),
+        "loop_lag_ms": {**lag.summary(), "max": round(max(lag.samples, default=0.0), 1)},
+        "cpu_ms_per_session": round(cpu * 1000 / sessions, 1),
+        "cpu_util": round(cpu / wall, 3),
+        "rss_kb_per_session": round((peak["rss"] - baseline_rss) / sessions, 1),
+        "db_round_trips_per_session": round(client.stats["round_trips"] / sessions, 1),
+        "ui_bytes_per_session": round(sum(p.bytes for p in done) / max(len(done), 1)),
+        "identify_fastpath": round(sum(Harness.fastpath) / max(len(Harness.fastpath), 1), 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", default="10,50,100,200",
+                        help="Comma-separated concurrency levels")
+    parser.add_argument("--time-scale", type=float, default=0.25,
+                        help="Multiplier on every scripted delay (1.0 = real time)")
+    parser.add_argument("--ramp", type=float, default=5.0, help="Seconds over which callers arrive")
+    parser.add_argument("--rows", type=int, default=100_000, help="Appointments seeded into the fake table")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--worker-mem-mb", type=int, default=4096,
+                        help="Worker memory used for the rooms-per-worker estimate")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--job-baseline", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.job_baseline:
+        print(json.dumps(job_baseline()))
+        return
+    if args.child:
+        random.seed(args.seed)
+        Scale.factor = args.time_scale
+        result = asyncio.run(run_level(args.child, args.ramp * args.time_scale, args.rows))
+        print(json.dumps(result))
+        return
+
+    out = subprocess.check_output([sys.executable, __file__, "--job-baseline"], cwd=ROOT, text=True)
+    job = json.loads(out.strip().splitlines()[-1])
+    print(f"Job process baseline ({job['prewarm']} prewarm): {job['rss_kb']} kB RSS, "
+          f"{job['cpu_ms']} ms CPU to start; added to every room below")
+
+    print(f"{'N':>5} {'fail':>4} {'sess/s':>7} {'turns/s':>7} {'turn p50':>8} {'p95':>7} {'p99':>7} "
+          f"{'ovh p95':>7} {'lag p99':>7} {'lag max':>7} {'cpu ms/r':>8} {'cpu %':>6} {'rss kB/r':>8} "
+          f"{'rooms/w':>7} {'fastpath':>8}")
+    for level in (int(n) for n in args.sessions.split(",")):
+        out = subprocess.check_output(
+            [sys.executable, __file__, "--child", str(level), "--time-scale", str(args.time_scale),
+             "--ramp", str(args.ramp), "--rows", str(args.rows), "--seed", str(args.seed)],
+            cwd=ROOT, text=True,
+        )
+        r = json.loads(out.strip().splitlines()[-1])
+        cpu_per_room = round(job["cpu_ms"] + r["cpu_ms_per_session"], 1)
+        rss_per_room = round(job["rss_kb"] + r["rss_kb_per_session"])
+        rooms = args.worker_mem_mb * 1024 // rss_per_room
+        print(f"{r['sessions']:>5} {r['failed']:>4} {r['sessions_per_s']:>7} {r['turns_per_s']:>7} "
+              f"{r['turn_ms']['p50']:>8} {r['turn_ms']['p95']:>7} {r['turn_ms']['p99']:>7} "
+              f"{r['worker_overhead_ms']['p95']:>7} {r['loop_lag_ms']['p99']:>7} {r['loop_lag_ms']['max']:>7} "
+              f"{cpu_per_room:>8} {int(r['cpu_util'] * 100):>5}% {rss_per_room:>8} {rooms:>7} "
+              f"{int(r['identify_fastpath'] * 100):>7}%")
+
+if __name__ == "__main__":
+    main()
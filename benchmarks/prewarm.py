@@ -0,0 +1,62 @@
+"""What worker prewarm removes from the job -> first-greeting path.
+
+Usage:
+    python benchmarks/prewarm.py [--runs N]
+
+Each run starts a fresh interpreter (like a new job process) and times the
+steps entrypoint would otherwise pay per job: importing agent.py, loading
+the VAD, building the DB client, and the first vs a warm DB round trip.
+With prewarm enabled all of these happen before a job is assigned, so the
+"cold" total is the time cut from join-to-greeting. Needs the full runtime
+deps and a .env with Supabase credentials.
+
+The live end-to-end number is the `bringup_first_audio` stage on the metrics
+endpoint; compare a worker started with ARIA_PREWARM=1 against ARIA_PREWARM=0.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import asyncio, json, sys, time
+sys.path.insert(0, sys.argv[1])
+started = time.perf_counter()
+import agent, db
+timings = {"import_agent": (time.perf_counter() - started) * 1000}
+timings.update(agent.prewarm_resources({}))
+
+async def round_trips():
+    query = lambda: db._execute(db._appointments().select("id").limit(1))
+    t = time.perf_counter(); await query(); cold = (time.perf_counter() - t) * 1000
+    t = time.perf_counter(); await query(); warm = (time.perf_counter() - t) * 1000
+    return cold, warm
+
+timings["db_first_call"], timings["db_warm_call"] = asyncio.run(round_trips())
+print(json.dumps(timings))
+"""
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = []
+    for _ in range(args.runs):
+        out = subprocess.check_output([sys.executable, "-c", PROBE, ROOT], cwd=ROOT, text=True)
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+
+    median = {key: statistics.median(r[key] for r in runs) for key in runs[0]}
+    for key, value in median.items():
+        print(f"{key:<16} {value:8.1f} ms")
+    handshake = median["db_first_call"] - median["db_warm_call"]
+    per_job = median["vad_load"] + median["db_client"] + handshake
+    print(f"{'cold per job':<16} {per_job:8.1f} ms  (vad + client + first-connection overhead)")
+    print(f"{'prewarmed':<16} {0.0:8.1f} ms  (all of the above done before assignment)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Token cost of the system prompt, before vs after compilation.
+
+Usage:
+    python benchmarks/prompt_tokens.py [--baseline-rev REV] [--turns N]
+
+"Before" is SYSTEM_PROMPT as defined in agent.py at REV (default: the
+repository's root commit), evaluated without importing LiveKit. "After" is
+prompt.build_system_prompt(). The cached-prefix ratio is the share of tokens
+two renders for different days have in common from the start, i.e. what a
+provider-side prompt cache can reuse across days. Install tiktoken for exact
+counts; otherwise ~4 chars/token is used.
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import prompt
+from costs import PRICING, estimate_tokens, tiktoken
+
+OPENAI_MIN_CACHED_PREFIX = 1024  # Provider caches only prefixes at least this long
+
+def load_baseline(rev: str, today: str) -> str:
+    source = subprocess.check_output(["git", "show", f"{rev}:agent.py"], cwd=ROOT, text=True)
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == "SYSTEM_PROMPT" for t in node.targets):
+            return eval(compile(ast.Expression(node.value), "agent.py", "eval"), {"TODAY": today})
+    raise SystemExit(f"SYSTEM_PROMPT not found in agent.py at {rev}")
+
+def common_prefix_tokens(a: str, b: str) -> int:
+    i = 0
+    while i < min(len(a), len(b)) and a[i] == b[i]:
+        i += 1
+    return estimate_tokens(a[:i]) if i else 0
+
+def report(label: str, render, turns: int):
+    day_one, day_two = render("Monday, January 05, 2026"), render("Tuesday, January 06, 2026")
+    tokens = estimate_tokens(day_one)
+    prefix = common_prefix_tokens(day_one, day_two)
+    cost = tokens * turns * PRICING["llm_input_per_million"] / 1_000_000
+    print(f"{label:<8} chars={len(day_one):>6}  tokens={tokens:>5}  cached-prefix={prefix:>5} "
+          f"({prefix / tokens:.0%})  cacheable={'yes' if prefix >= OPENAI_MIN_CACHED_PREFIX else 'no'}  "
+          f"${cost:.5f} per {turns}-turn call (uncached)")
+    return tokens
+
+def main():
+    parser = argparse.ArgumentParser()
+    default_rev = subprocess.check_output(["git", "rev-list", "--max-parents=0", "HEAD"], cwd=ROOT, text=True).split()[0]
+    parser.add_argument("--baseline-rev", default=default_rev)
+    parser.add_argument("--turns", type=int, default=12, help="LLM turns in a typical call")
+    args = parser.parse_args()
+
+    print(f"tokenizer: {'tiktoken' if tiktoken else 'chars/4 estimate'}")
+    before = report("before", lambda today: load_baseline(args.baseline_rev, today), args.turns)
+    after = report("after", prompt.build_system_prompt, args.turns)
+    print(f"saved {before - after} tokens per turn ({1 - after / before:.0%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Old select-then-insert booking vs the reservation RPC: latency and double bookings.
+
+Usage:
+    python benchmarks/reservation_race.py [--rounds 200] [--callers 1 5 25]
+
+For each contention level, --rounds times over, that many callers book the
+same slot at once through db.py against benchmarks/fake_supabase.py (15-40ms
+round trips):
+
+  select+insert  the pre-RPC book_appointment: SELECT the ±29 minute window,
+                 then INSERT if it was empty (two sequential round trips)
+  rpc            db.reserve_appointment (one round trip; the check and the
+                 insert run in one transaction)
+
+and prints per-booking p50/p95 latency, round trips per booking, and how many
+rounds ended with more than one booking in the slot. Needs supabase
+installed (db.py imports it), but no network or credentials.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "offline")
+os.environ.setdefault("ARIA_HOST_CACHE", "")  # Per-process caches only: runs never warm each other
+
+import db  # noqa: E402
+from fake_supabase import FakeAsyncClient  # noqa: E402
+
+WINDOW = timedelta(minutes=29)
+
+async def select_then_insert(name: str, slot: datetime) -> bool:
+    conflicts = await db._execute(db._appointments().select("id")
+                                  .gte("appointment_slot", (slot - WINDOW).isoformat())
+                                  .lte("appointment_slot", (slot + WINDOW).isoformat()))
+    if conflicts:
+        return False
+    await db._execute(db._appointments().insert({
+        "user_name": name, "contact_number": "5550000001",
+        "appointment_slot": slot.strftime("%Y-%m-%dT%H:%M:00Z"), "status": "booked"}), write=True)
+    return True
+
+async def rpc(name: str, slot: datetime) -> bool:
+    result = await db.reserve_appointment(name, "5550000001", slot.strftime("%Y-%m-%dT%H:%M:00Z"))
+    return result["ok"]
+
+async def run(path, callers: int, rounds: int, rng: random.Random) -> dict:
+    client = FakeAsyncClient(latency=lambda op: rng.uniform(0.015, 0.040))
+    db.use_client(client)
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    latencies, double_booked = [], 0
+
+    async def timed(name, slot):
+        started = time.perf_counter()
+        ok = await path(name, slot)
+        latencies.append((time.perf_counter() - started) * 1000)
+        return ok
+
+    for n in range(rounds):
+        slot = start + timedelta(hours=n)  # A fresh slot per round
+        won = await asyncio.gather(*(timed(f"Caller {i}", slot) for i in range(callers)))
+        if sum(won) > 1:
+            double_booked += 1
+    latencies.sort()
+    return {
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[min(int(0.95 * len(latencies)), len(latencies) - 1)],
+        "trips": client.stats["round_trips"] / len(latencies),
+        "double_booked": double_booked,
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--callers", type=int, nargs="+", default=[1, 5, 25])
+    args = parser.parse_args()
+
+    print(f"{'callers':>7} {'path':<14} {'p50 ms':>7} {'p95 ms':>7} {'trips':>6}  double-booked rounds")
+    for callers in args.callers:
+        for label, path in (("select+insert", select_then_insert), ("rpc", rpc)):
+            r = asyncio.run(run(path, callers, args.rounds, random.Random(callers)))
+            print(f"{callers:>7} {label:<14} {r['p50']:>7.1f} {r['p95']:>7.1f} {r['trips']:>6.2f}  "
+                  f"{r['double_booked']}/{args.rounds}")
+
+if __name__ == "__main__":
+    main()
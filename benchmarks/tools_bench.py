@@ -0,0 +1,228 @@
+"""Micro-benchmarks for the tool layer, with regression thresholds.
+
+Usage:
+    python benchmarks/tools_bench.py [--rows 10000,100000,1000000] [--iterations 30]
+                                     [--update-baseline] [--tolerance 1.5]
+
+Calls each tool in tools.py directly, the same way the LLM would, against
+benchmarks/fake_supabase.py seeded with --rows appointments (one contact
+per five rows, a year of history ending a month ahead). The history takes
+almost all the rows; the coming month stays sparse, so the open slots the
+caller books and moves to are really free and book_appointment and
+modify_appointment measure their full path, not the fast reject (both are
+checked to succeed). Every iteration starts from a fresh SessionState and
+empty identity and availability caches, so the numbers describe the
+uncached path a new caller pays:
+
+  identify_user        lookup, plus the prefetch it starts (awaited)
+  fetch_slots          one day of availability
+  book_appointment     fast reject + reservation RPC
+  retrieve_appointments
+  modify_appointment   moves option #1
+  cancel_appointment   cancels option #1
+
+For each tool and table size it prints the DB round trips, response bytes
+and median/p95 wall time (the fake adds no network delay, so wall time is
+the worker-side cost). Results are compared against tools_baseline.json:
+any extra round trip, more than 10% extra bytes, or a median more than
+--tolerance times slower fails the run with exit code 1. The first run (or
+--update-baseline) writes the baseline. tests/test_tools_bench.py runs the
+same check at 10k rows with the pytest suite. Needs livekit-agents and
+supabase installed, but no network or credentials.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(HERE, "tools_baseline.json")
+
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "offline")
+os.environ.setdefault("ARIA_HOST_CACHE", "")  # Per-process caches only: runs never warm each other
+
+import availability  # noqa: E402
+import db  # noqa: E402
+import identity  # noqa: E402
+import tools  # noqa: E402
+from fake_supabase import FakeAsyncClient  # noqa: E402
+from loadtest import FakeRoom  # noqa: E402
+from session_state import SessionState  # noqa: E402
+from ui_channel import UIChannel  # noqa: E402
+
+TOOLS = ["identify_user", "fetch_slots", "book_appointment",
+         "retrieve_appointments", "modify_appointment", "cancel_appointment"]
+
+# Slack on top of --tolerance so sub-millisecond tools don't fail on noise.
+WALL_SLACK_MS = 0.5
+BYTES_SLACK = 1.10
+
+ITERATIONS = 30
+SEED = 7
+
+# Appointments per day over the coming month; the rest of --rows is history.
+UPCOMING_DAYS = 30
+UPCOMING_PER_DAY = 8
+
+
+class BenchContext:
+    """The slice of RunContext the tools use."""
+
+    def __init__(self, state: SessionState):
+        self.userdata = state
+        self.session = None
+
+
+def new_context() -> BenchContext:
+    state = SessionState(room_name="bench")
+    state.ui = UIChannel(FakeRoom("bench"), state, window_ms=0)
+    return BenchContext(state)
+
+def cold_caches():
+    """Empties the process-wide caches a returning caller would otherwise hit."""
+    availability._days.clear()
+    identity._known.clear()
+    identity._unknown.clear()
+    identity._inflight.clear()
+
+async def settle(ctx: BenchContext):
+    """Waits for the background work a tool started (prefetch, UI flush)."""
+    while ctx.userdata.tasks:
+        await asyncio.gather(*list(ctx.userdata.tasks), return_exceptions=True)
+
+async def measure(client: FakeAsyncClient, ctx: BenchContext, tool_name: str, **kwargs):
+    before = dict(client.stats)
+    started = time.perf_counter()
+    reply = await getattr(tools, tool_name)(ctx, **kwargs)
+    if tool_name == "identify_user":
+        await settle(ctx)  # The prefetch is part of identify_user's DB cost
+    wall = (time.perf_counter() - started) * 1000
+    await settle(ctx)
+    return reply, {
+        "round_trips": client.stats["round_trips"] - before["round_trips"],
+        "bytes": client.stats["bytes"] - before["bytes"],
+        "wall_ms": wall,
+    }
+
+async def open_slots(rng: random.Random):
+    """A day in the next two weeks with two free slots far enough apart to move between."""
+    window = timedelta(minutes=availability.CALENDAR.conflict_window)
+    while True:
+        day = (datetime.now(timezone.utc) + timedelta(days=rng.randint(1, 14))).date()
+        times = [datetime(day.year, day.month, day.day, hour, minute, tzinfo=timezone.utc)
+                 for hour in range(9, 17) for minute in (0, 30)]
+        rng.shuffle(times)
+        free = [t for t in times if await availability.is_free(t)]
+        for slot in free:
+            for other in free:
+                if abs(other - slot) > window:
+                    return day.isoformat(), slot.strftime("%H:%M"), other.strftime("%H:%M")
+
+async def one_call(client: FakeAsyncClient, numbers: list[str], rng: random.Random) -> dict:
+    """Runs every tool once for one returning caller, like a short call would."""
+    phone = rng.choice(numbers)
+    cold_caches()
+    day, slot, other = await open_slots(rng)
+
+    cold_caches()
+    ctx = new_context()
+    samples = {}
+    _, samples["identify_user"] = await measure(client, ctx, "identify_user", phone_number=phone)
+    _, samples["fetch_slots"] = await measure(client, ctx, "fetch_slots", date=day)
+    reply, samples["book_appointment"] = await measure(
+        client, ctx, "book_appointment", name="Bench", contact_number=phone, date=day, time_str=slot)
+    assert reply.startswith("Perfect."), f"book_appointment {day} {slot} did not book: {reply}"
+    _, samples["retrieve_appointments"] = await measure(client, ctx, "retrieve_appointments", contact_number=phone)
+    reply, samples["modify_appointment"] = await measure(
+        client, ctx, "modify_appointment", appointment_number="1", new_date=day, new_time=other)
+    assert reply.startswith("Updated to"), f"modify_appointment to {day} {other} did not move: {reply}"
+    _, samples["cancel_appointment"] = await measure(client, ctx, "cancel_appointment", appointment_number="1")
+    ctx.userdata.clear()
+    return samples
+
+async def bench_size(rows: int, iterations: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    client = FakeAsyncClient(latency=lambda op: 0)
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    upcoming = min(rows // 10, UPCOMING_DAYS * UPCOMING_PER_DAY)
+    contacts = max(rows // 5, 1)
+    numbers = client.seed(rows - upcoming, contacts, days=365 - UPCOMING_DAYS,
+                          start=today - timedelta(days=365 - UPCOMING_DAYS), rng=rng)
+    client.seed(upcoming, contacts, days=UPCOMING_DAYS, start=today, rng=rng)  # Same contacts
+    db.use_client(client)
+
+    for _ in range(3):  # Warm-up: imports, first-call caches
+        await one_call(client, numbers, rng)
+
+    runs = [await one_call(client, numbers, rng) for _ in range(iterations)]
+    report = {}
+    for name in TOOLS:
+        walls = sorted(run[name]["wall_ms"] for run in runs)
+        report[name] = {
+            "round_trips": max(run[name]["round_trips"] for run in runs),
+            "bytes": round(statistics.mean(run[name]["bytes"] for run in runs)),
+            "wall_ms_p50": round(statistics.median(walls), 3),
+            "wall_ms_p95": round(walls[min(int(0.95 * len(walls)), len(walls) - 1)], 3),
+        }
+    return report
+
+def load_baseline() -> dict:
+    with open(BASELINE) as f:
+        return json.load(f)
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    failures = []
+    for rows, tools_report in results.items():
+        for name, now in tools_report.items():
+            then = baseline.get(rows, {}).get(name)
+            if then is None:
+                continue
+            if now["round_trips"] > then["round_trips"]:
+                failures.append(f"{name} @ {rows} rows: {now['round_trips']} round trips (baseline {then['round_trips']})")
+            if now["bytes"] > then["bytes"] * BYTES_SLACK:
+                failures.append(f"{name} @ {rows} rows: {now['bytes']} bytes (baseline {then['bytes']})")
+            if now["wall_ms_p50"] > then["wall_ms_p50"] * tolerance + WALL_SLACK_MS:
+                failures.append(f"{name} @ {rows} rows: p50 {now['wall_ms_p50']}ms (baseline {then['wall_ms_p50']}ms)")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", default="10000,100000,1000000", help="Comma-separated table sizes")
+    parser.add_argument("--iterations", type=int, default=ITERATIONS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Allowed p50 slowdown factor")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'rows':>8} {'tool':<22} {'trips':>5} {'bytes':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for rows in (int(n) for n in args.rows.split(",")):
+        results[str(rows)] = report = asyncio.run(bench_size(rows, args.iterations, args.seed))
+        for name, r in report.items():
+            print(f"{rows:>8} {name:<22} {r['round_trips']:>5} {r['bytes']:>9} "
+                  f"{r['wall_ms_p50']:>8} {r['wall_ms_p95']:>8}")
+
+    if args.update_baseline or not os.path.exists(BASELINE):
+        with open(BASELINE, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {os.path.relpath(BASELINE, ROOT)}")
+        return
+
+    failures = regressions(results, load_baseline(), args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    if failures:
+        sys.exit(1)
+    print("No regressions against the baseline.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+# LiveKit runs every job in a fresh process, so a purely in-process cache only
+# lives for one call. HostStore is the tier that outlives it: one SQLite file
+# per host that every job process opens, so the next call (another caller on
+# a popular day, or the same caller redialling) starts warm. Set
+# ARIA_HOST_CACHE= (empty) to keep caches per process.
+HOST_CACHE_PATH = os.getenv("ARIA_HOST_CACHE",
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), ".aria_cache", "host.sqlite3"))
+_PRUNE_EVERY = 200  # Writes between sweeps of expired rows
+
+class HostStore:
+    """Text values with wall-clock expiry, shared by every process on the host.
+
+    Best effort: any SQLite error is logged and treated as a miss, so a locked
+    or damaged file costs a DB round trip, never a failed call.
+    """
+
+    def __init__(self, path: str, namespace: str):
+        self.path = path
+        self.namespace = namespace
+        self._conn: sqlite3.Connection | None = None
+        self._pid = None
+        self._writes = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():  # Never reuse a connection across fork
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=0.05, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")  # Readers never wait for a writer
+            conn.execute("PRAGMA synchronous=OFF")  # It's a cache: losing it on a crash is fine
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (ns TEXT NOT NULL, key TEXT NOT NULL, "
+                         "expires REAL NOT NULL, value TEXT NOT NULL, PRIMARY KEY (ns, key))")
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def _run(self, sql: str, params: tuple = ()):
+        try:
+            return self._db().execute(sql, params).fetchone()
+        except sqlite3.Error as e:
+            print(f"Host Cache Error ({self.namespace}): {e}")
+            return None
+
+    def get(self, key: str) -> tuple[float, str] | None:
+        """(expires_at wall time, value) for a fresh entry, else None."""
+        row = self._run("SELECT expires, value FROM entries WHERE ns = ? AND key = ? AND expires > ?",
+                        (self.namespace, key, time.time()))
+        return (row[0], row[1]) if row else None
+
+    def set(self, key: str, value: str, expires_at: float):
+        self._run("INSERT OR REPLACE INTO entries (ns, key, expires, value) VALUES (?, ?, ?, ?)",
+                  (self.namespace, key, expires_at, value))
+        self._writes += 1
+        if self._writes % _PRUNE_EVERY == 0:
+            self._run("DELETE FROM entries WHERE expires <= ?", (time.time(),))
+
+    def delete(self, key: str):
+        self._run("DELETE FROM entries WHERE ns = ? AND key = ?", (self.namespace, key))
+
+    def clear(self):
+        self._run("DELETE FROM entries WHERE ns = ?", (self.namespace,))
+
+def host_store(namespace: str) -> HostStore | None:
+    """The host-wide tier for one cache, or None when ARIA_HOST_CACHE is empty."""
+    return HostStore(HOST_CACHE_PATH, namespace) if HOST_CACHE_PATH else None
+
+
+class TTLCache:
+    """Small in-process LRU cache whose entries also expire after `ttl` seconds.
+
+    With `shared`, writes also go to a HostStore and in-process misses are
+    filled from it (values cross as text via `encode`/`decode`). Not
+    thread-safe; every caller lives on the worker's event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock=time.monotonic, shared: HostStore | None = None,
+                 encode=json.dumps, decode=json.loads):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+        self.shared = shared
+        self._encode = encode
+        self._decode = decode
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return self._from_shared(key)
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            return self._from_shared(key)
+        return value
+
+    def _from_shared(self, key):
+        found = self.shared.get(key) if self.shared is not None else None
+        if found is None:
+            return _MISSING
+        expires_wall, text = found
+        try:
+            value = self._decode(text)
+        except (ValueError, TypeError) as e:
+            print(f"Host Cache Ignoring Bad Entry ({self.shared.namespace}/{key}): {e}")
+            return _MISSING
+        self.shared_hits += 1
+        self._put(key, value, self._clock() + (expires_wall - time.time()))  # Keeps the writer's expiry
+        return value
+
+    def _put(self, key, value, expires_at: float):
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        """Returns a fresh entry and marks it most recently used."""
+        value = self._live(key)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def peek(self, key, default=None):
+        """Like get(), but leaves counters and LRU order untouched."""
+        value = self._live(key)
+        return default if value is _MISSING else value
+
+    def set(self, key, value):
+        self._put(key, value, self._clock() + self.ttl)
+        if self.shared is not None:
+            self.shared.set(key, self._encode(value), time.time() + self.ttl)
+
+    def update(self, key, value):
+        """Rewrites an entry changed in place (both tiers), keeping its expiry."""
+        entry = self._data.get(key)
+        if entry is None:
+            return
+        self._data[key] = (entry[0], value)
+        if self.shared is not None:
+            self.shared.set(key, self._encode(value), time.time() + (entry[0] - self._clock()))
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        if self.shared is not None:
+            self.shared.delete(key)
+        return default if entry is None else entry[1]
+
+    def items(self):
+        """Fresh in-process entries (the host tier is not scanned)."""
+        now = self._clock()
+        return [(key, value) for key, (expires_at, value) in self._data.items() if expires_at > now]
+
+    def values(self):
+        return [value for _, value in self.items()]
+
+    def clear(self):
+        self._data.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,143 @@
+import asyncio
+import os
+import time
+
+import telemetry
+
+try:
+    import psutil  # Ships with livekit-agents; only the CPU signal needs it
+except ImportError:
+    psutil = None
+
+# Load reported to the LiveKit dispatcher. Each signal is normalized so 1.0
+# means "full"; the worker reports the worst one scaled by LOAD_THRESHOLD,
+# so it stops taking jobs exactly when any signal hits its ceiling:
+#   sessions   active jobs / ARIA_MAX_SESSIONS
+#   cpu        this worker's process tree CPU / ARIA_CPU_CEILING (of all cores)
+#   loop lag   worst job process's event-loop lag p95 / ARIA_LAG_CEILING_MS
+#              (audio frames are 10-20ms)
+MAX_SESSIONS = int(os.getenv("ARIA_MAX_SESSIONS", "20"))
+CPU_CEILING = float(os.getenv("ARIA_CPU_CEILING", "0.8"))
+LAG_CEILING_MS = float(os.getenv("ARIA_LAG_CEILING_MS", "40"))
+LOAD_THRESHOLD = float(os.getenv("ARIA_LOAD_THRESHOLD", "0.9"))
+
+# --- SIGNALS ---
+
+class CPUSampler:
+    """CPU share of this process and its children (job processes) since the last sample."""
+
+    def __init__(self):
+        self.cores = os.cpu_count() or 1
+        self._procs: dict[int, object] = {}
+        self._last = (time.monotonic(), time.process_time())
+
+    def sample(self) -> float:
+        if psutil is None:
+            # Own process only: enough for thread-executor workers and the simulation
+            now, cpu = time.monotonic(), time.process_time()
+            (then, cpu_then), self._last = self._last, (now, cpu)
+            return (cpu - cpu_then) / max(now - then, 1e-6) / self.cores
+        me = psutil.Process()
+        total = 0.0
+        alive = {}
+        for proc in [me, *me.children(recursive=True)]:
+            proc = self._procs.get(proc.pid, proc)  # cpu_percent needs the same object across calls
+            try:
+                total += proc.cpu_percent(None)
+            except psutil.Error:
+                continue
+            alive[proc.pid] = proc
+        self._procs = alive
+        return total / 100 / self.cores
+
+
+class LoopLagMonitor:
+    """Event-loop lag measured inside a job process, where the sessions and
+    their audio run: how late a short sleep wakes up. Published as the
+    "loop_lag" stat, which reaches the main worker process in the job's
+    telemetry reports."""
+
+    def __init__(self, interval: float = 0.1, max_samples: int = 50):
+        self.interval = interval
+        self.histogram = telemetry.LatencyHistogram(max_samples)  # ~5s of samples
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        """Starts sampling on the running loop, once per process."""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            return
+        self._task = loop.create_task(self._sample_forever())
+        telemetry.STAT_SOURCES["loop_lag"] = self.stats
+
+    async def _sample_forever(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.histogram.observe(max(0.0, (time.monotonic() - started - self.interval) * 1000))
+
+    def p95(self) -> float:
+        return self.histogram.percentile(0.95)
+
+    def stats(self) -> dict:
+        return {"p95_ms": round(self.p95(), 1), "samples": len(self.histogram.samples)}
+
+
+def job_loop_lag_ms() -> float:
+    """Worst loop-lag p95 among this worker's job processes, from their fresh reports."""
+    return max((snap["stats"].get("loop_lag", {}).get("p95_ms", 0.0) for snap in telemetry.job_snapshots()),
+               default=0.0)
+
+# --- LOAD FUNCTION ---
+
+class LoadCalculator:
+    """WorkerOptions.load_fnc: called by the worker every few seconds with itself."""
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, cpu_ceiling: float = CPU_CEILING,
+                 lag_ceiling_ms: float = LAG_CEILING_MS, threshold: float = LOAD_THRESHOLD,
+                 lag_source=job_loop_lag_ms):
+        self.max_sessions = max_sessions
+        self.cpu_ceiling = cpu_ceiling
+        self.lag_ceiling_ms = lag_ceiling_ms
+        self.threshold = threshold
+        self.cpu = CPUSampler()
+        self.lag_source = lag_source
+        self.last = {"sessions": 0, "cpu": 0.0, "loop_lag_ms": 0.0, "load": 0.0, "limited_by": "sessions"}
+        self.full_reports = 0
+
+    def signals(self, sessions: int, cpu: float, lag_ms: float) -> dict:
+        return {
+            "sessions": sessions / self.max_sessions,
+            "cpu": cpu / self.cpu_ceiling,
+            "loop_lag": lag_ms / self.lag_ceiling_ms,
+        }
+
+    def compute(self, sessions: int, cpu: float, lag_ms: float) -> float:
+        normalized = self.signals(sessions, cpu, lag_ms)
+        limited_by = max(normalized, key=normalized.get)
+        load = min(1.0, normalized[limited_by] * self.threshold)
+        if load >= self.threshold:
+            self.full_reports += 1
+        self.last = {"sessions": sessions, "cpu": round(cpu, 3), "loop_lag_ms": round(lag_ms, 1),
+                     "load": round(load, 3), "limited_by": limited_by}
+        return load
+
+    def __call__(self, worker) -> float:
+        return self.compute(len(getattr(worker, "active_jobs", ())), self.cpu.sample(), self.lag_source())
+
+    def stats(self) -> dict:
+        return {
+            "sessions": self.last["sessions"],
+            "max_sessions": self.max_sessions,
+            "free_sessions": max(self.max_sessions - self.last["sessions"], 0),
+            "cpu": self.last["cpu"],
+            "loop_lag_p95_ms": self.last["loop_lag_ms"],
+            "load": self.last["load"],
+            "load_threshold": self.threshold,
+            "full_reports": self.full_reports,
+        }
+
+
+LOAD = LoadCalculator()
+LAG_MONITOR = LoopLagMonitor()
+telemetry.STAT_SOURCES["capacity"] = LOAD.stats
@@ -0,0 +1,116 @@
+import json
+import os
+from contextvars import ContextVar
+
+try:
+    import tiktoken
+except ImportError:  # Optional: falls back to a ~4 chars/token estimate
+    tiktoken = None
+
+# --- PRICING ---
+# USD unit prices. Override any key with a JSON file named by PRICING_FILE,
+# e.g. {"llm_input_per_million": 0.15, "tts_per_1k_chars": 0.03}.
+DEFAULT_PRICING = {
+    "stt_per_minute": 0.0043,              # Deepgram streaming
+    "tts_per_1k_chars": 0.03,              # Cartesia
+    "llm_input_per_million": 0.15,         # gpt-4o-mini
+    "llm_cached_input_per_million": 0.075,
+    "llm_output_per_million": 0.60,
+    "db_per_call": 0.0,
+}
+
+def load_pricing() -> dict:
+    pricing = dict(DEFAULT_PRICING)
+    path = os.getenv("PRICING_FILE")
+    if path:
+        with open(path) as f:
+            pricing.update(json.load(f))
+    return pricing
+
+PRICING = load_pricing()
+
+def estimate_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    if tiktoken is not None:
+        try:
+            return len(tiktoken.encoding_for_model(model).encode(text))
+        except KeyError:
+            pass
+    return max(1, len(text) // 4)
+
+# Size of the instructions resent on every LLM turn; set once by agent.py.
+SYSTEM_PROMPT_TOKENS = 0
+
+# --- USAGE LEDGER ---
+
+class UsageLedger:
+    """Raw usage counters for one session; each one also rolls into the worker total."""
+
+    __slots__ = ("stt_audio_seconds", "tts_characters", "tts_audio_seconds", "llm_turns",
+                 "prompt_tokens", "cached_prompt_tokens", "completion_tokens", "db_calls", "parent")
+
+    def __init__(self, parent: "UsageLedger | None" = None):
+        self.stt_audio_seconds = 0.0
+        self.tts_characters = 0
+        self.tts_audio_seconds = 0.0
+        self.llm_turns = 0
+        self.prompt_tokens = 0
+        self.cached_prompt_tokens = 0
+        self.completion_tokens = 0
+        self.db_calls = 0
+        self.parent = parent
+
+    def add_stt(self, audio_seconds: float):
+        self.stt_audio_seconds += audio_seconds
+        if self.parent: self.parent.add_stt(audio_seconds)
+
+    def add_tts(self, characters: int, audio_seconds: float):
+        self.tts_characters += characters
+        self.tts_audio_seconds += audio_seconds
+        if self.parent: self.parent.add_tts(characters, audio_seconds)
+
+    def add_llm_turn(self, prompt_tokens: int, cached_tokens: int, completion_tokens: int):
+        self.llm_turns += 1
+        self.prompt_tokens += prompt_tokens
+        self.cached_prompt_tokens += cached_tokens
+        self.completion_tokens += completion_tokens
+        if self.parent: self.parent.add_llm_turn(prompt_tokens, cached_tokens, completion_tokens)
+
+    def add_db_call(self):
+        self.db_calls += 1
+        if self.parent: self.parent.add_db_call()
+
+    def costs(self, pricing: dict = PRICING) -> dict:
+        uncached = self.prompt_tokens - self.cached_prompt_tokens
+        stt = self.stt_audio_seconds / 60 * pricing["stt_per_minute"]
+        tts = self.tts_characters / 1000 * pricing["tts_per_1k_chars"]
+        llm = (uncached * pricing["llm_input_per_million"]
+               + self.cached_prompt_tokens * pricing["llm_cached_input_per_million"]
+               + self.completion_tokens * pricing["llm_output_per_million"]) / 1_000_000
+        db = self.db_calls * pricing["db_per_call"]
+        return {"stt": stt, "tts": tts, "llm": llm, "db": db, "total": stt + tts + llm + db}
+
+    def system_prompt_share(self) -> float:
+        """Fraction of all input tokens spent resending the system prompt."""
+        if not self.prompt_tokens:
+            return 0.0
+        return min(1.0, SYSTEM_PROMPT_TOKENS * self.llm_turns / self.prompt_tokens)
+
+    def totals(self) -> dict:
+        """Flat counters and USD costs, for the metrics endpoint."""
+        out = {name: getattr(self, name) for name in self.__slots__ if name != "parent"}
+        out.update({f"cost_{k}_usd": round(v, 6) for k, v in self.costs().items()})
+        out["system_prompt_tokens"] = SYSTEM_PROMPT_TOKENS
+        out["system_prompt_share"] = round(self.system_prompt_share(), 3)
+        return out
+
+
+# Aggregate over every session this worker process has served.
+WORKER_USAGE = UsageLedger()
+
+# The ledger of the session whose task is running; set in agent.entrypoint so
+# tasks spawned by that session (tool calls included) inherit it.
+current_ledger: ContextVar[UsageLedger | None] = ContextVar("current_ledger", default=None)
+
+def count_db_call():
+    ledger = current_ledger.get()
+    (ledger or WORKER_USAGE).add_db_call()
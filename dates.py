@@ -0,0 +1,219 @@
+import functools
+import re
+from datetime import date, datetime, time, timedelta, timezone
+
+from slots import MINUTES_PER_DAY
+
+# One parser for every date and time the tools receive, whether the LLM
+# passes ISO ("2026-03-12", "14:30") or the caller's words ("Thursday the
+# 12th", "tomorrow", "half past three"). Relative days resolve against the
+# session clock, which is UTC like every stored slot, so "tomorrow at 3"
+# and the slot it books always name the same day. Results are memoized,
+# and ISO input never touches a regex.
+
+def now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def today() -> date:
+    """The caller's "today", read fresh on every call (never frozen at import)."""
+    return now().date()
+
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_MONTHS = ["january", "february", "march", "april", "may", "june", "july",
+           "august", "september", "october", "november", "december"]
+_MONTH_ABBR = {m[:3]: i for i, m in enumerate(_MONTHS, start=1)}
+_MONTH_ABBR["sept"] = 9
+
+_ORDINAL_WORDS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5, "sixth": 6, "seventh": 7,
+    "eighth": 8, "ninth": 9, "tenth": 10, "eleventh": 11, "twelfth": 12, "thirteenth": 13,
+    "fourteenth": 14, "fifteenth": 15, "sixteenth": 16, "seventeenth": 17, "eighteenth": 18,
+    "nineteenth": 19, "twentieth": 20, "thirtieth": 30,
+}
+for _unit, _n in list(_ORDINAL_WORDS.items())[:9]:
+    _ORDINAL_WORDS[f"twenty {_unit}"] = 20 + _n
+    _ORDINAL_WORDS[f"twenty-{_unit}"] = 20 + _n
+_ORDINAL_WORDS["thirty first"] = _ORDINAL_WORDS["thirty-first"] = 31
+
+_ORDINAL = r"(?:(?P<num>\d{1,2})(?:st|nd|rd|th)?|(?P<word>" + "|".join(
+    sorted((re.escape(w) for w in _ORDINAL_WORDS), key=len, reverse=True)) + r"))"
+_MONTH = r"(?P<month>" + "|".join(_MONTHS) + r"|" + "|".join(_MONTH_ABBR) + r")\.?"
+_WEEKDAY = r"(?P<weekday>" + "|".join(_WEEKDAYS) + r")"
+
+_PATTERNS = [
+    ("iso", re.compile(r"\b(?P<y>\d{4})-(?P<m>\d{2})-(?P<d>\d{2})\b")),
+    ("relative", re.compile(r"\b(?P<rel>day after tomorrow|tomorrow|today|tonight)\b")),
+    ("month_day", re.compile(r"\b" + _MONTH + r"\s+(?:the\s+)?" + _ORDINAL + r"\b")),
+    ("day_month", re.compile(r"\b(?:the\s+)?" + _ORDINAL + r"\s+of\s+" + _MONTH + r"\b")),
+    ("weekday_day", re.compile(r"\b" + _WEEKDAY + r",?\s+the\s+" + _ORDINAL + r"\b")),
+    ("weekday", re.compile(r"\b(?P<which>next|this|coming)?\s*" + _WEEKDAY + r"\b")),
+    ("day", re.compile(r"\bthe\s+" + _ORDINAL + r"\b(?!\s+one\b)")),  # Not "the second one"
+]
+
+def _day_number(match) -> int | None:
+    if match.group("num"):
+        return int(match.group("num"))
+    return _ORDINAL_WORDS.get(match.group("word"))
+
+def _month_number(name: str) -> int:
+    name = name.rstrip(".")
+    return _MONTHS.index(name) + 1 if name in _MONTHS else _MONTH_ABBR[name]
+
+def _safe_date(year: int, month: int, day: int) -> date | None:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+def _upcoming_month_day(today: date, month: int, day: int) -> date | None:
+    """March 12 means this year's, unless it has already passed."""
+    found = _safe_date(today.year, month, day)
+    if found is not None and found < today:
+        found = _safe_date(today.year + 1, month, day)
+    return found
+
+def _upcoming_day_of_month(today: date, day: int) -> date | None:
+    """"The 12th" means this month's, unless it has passed, then next month's."""
+    year, month = today.year, today.month
+    for _ in range(3):  # Skip months too short for the day (e.g. the 31st)
+        found = _safe_date(year, month, day)
+        if found is not None and found >= today:
+            return found
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return None
+
+def _upcoming_weekday(today: date, weekday: int, which: str | None) -> date:
+    ahead = (weekday - today.weekday()) % 7
+    if which == "next" and ahead == 0:
+        ahead = 7
+    return today + timedelta(days=ahead)
+
+def _resolve(kind: str, match, today: date) -> date | None:
+    if kind == "iso":
+        return _safe_date(int(match.group("y")), int(match.group("m")), int(match.group("d")))
+    if kind == "relative":
+        offset = {"today": 0, "tonight": 0, "tomorrow": 1, "day after tomorrow": 2}[match.group("rel")]
+        return today + timedelta(days=offset)
+    if kind in ("month_day", "day_month"):
+        day = _day_number(match)
+        return _upcoming_month_day(today, _month_number(match.group("month")), day) if day else None
+    if kind == "weekday_day":
+        # "Thursday the 12th": the number is more precise than the weekday
+        day = _day_number(match)
+        return _upcoming_day_of_month(today, day) if day else None
+    if kind == "weekday":
+        return _upcoming_weekday(today, _WEEKDAYS.index(match.group("weekday")), match.group("which"))
+    if kind == "day":
+        day = _day_number(match)
+        return _upcoming_day_of_month(today, day) if day else None
+    return None
+
+def dates_in_transcript(text: str, today: date) -> list[date]:
+    """Every distinct day a (possibly partial) transcript refers to, in spoken order."""
+    text = text.lower()
+    claimed: list[tuple[int, int]] = []  # Spans already matched by a more specific pattern
+    found: list[tuple[int, date]] = []
+    for kind, pattern in _PATTERNS:
+        for match in pattern.finditer(text):
+            start, end = match.span()
+            if any(start < e and s < end for s, e in claimed):
+                continue
+            day = _resolve(kind, match, today)
+            if day is not None:
+                claimed.append((start, end))
+                found.append((start, day))
+    ordered = []
+    for _, day in sorted(found, key=lambda item: item[0]):
+        if day not in ordered:
+            ordered.append(day)
+    return ordered
+
+
+# --- TOOL ARGUMENTS ---
+
+@functools.lru_cache(maxsize=1024)
+def _parse_date(text: str, today: date) -> date | None:
+    try:
+        return date.fromisoformat(text[:10])  # Fast path: what the LLM usually sends
+    except ValueError:
+        pass
+    found = dates_in_transcript(text, today)
+    return found[0] if found else None
+
+def parse_date(value: str, relative_to: date | None = None) -> date | None:
+    """"2026-03-12", "tomorrow", "next Friday", "March 12th" -> date, or None."""
+    text = " ".join(str(value).lower().split())
+    return _parse_date(text, relative_to or today()) if text else None
+
+_HOUR_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+}
+_MINUTE_WORDS = {
+    "o'clock": 0, "oclock": 0, "fifteen": 15, "thirty": 30, "forty five": 45, "forty-five": 45,
+    "oh five": 5, "ten": 10, "twenty": 20, "forty": 40, "fifty": 50,
+}
+_NAMED_TIMES = {"noon": time(12, 0), "midday": time(12, 0), "midnight": time(0, 0)}
+
+_CLOCK = re.compile(r"^(?:t)?(?P<h>\d{1,2})(?::?(?P<m>\d{2}))?(?::\d{2}(?:\.\d+)?)?\s*(?P<ampm>[ap])?\.?\s*m?\.?"
+                    r"(?:\s*(?:z|utc|(?P<offset>[+-]\d{2}:?\d{2})))?$")
+_HOUR = "(?P<h>" + "|".join(_HOUR_WORDS) + r"|\d{1,2})"
+_SPOKEN = re.compile(r"^(?:(?P<rel>half|quarter)\s+(?P<dir>past|to)\s+)?" + _HOUR +
+                     r"(?:\s+(?P<mw>" + "|".join(sorted(_MINUTE_WORDS, key=len, reverse=True)) + r"))?"
+                     r"(?:\s*(?P<ampm>[ap])\.?\s*m\.?|\s+in the (?P<part>morning|afternoon|evening))?$")
+
+# Business hours: a bare "3" or "three" means 3 PM, "9" means 9 AM.
+_ASSUME_PM_BELOW = 8
+
+def _to_24h(hour: int, ampm: str | None, part: str | None = None) -> int | None:
+    if part:
+        ampm = "a" if part == "morning" else "p"
+    if ampm:
+        if not 1 <= hour <= 12:
+            return None
+        return hour % 12 + (12 if ampm == "p" else 0)
+    if hour < _ASSUME_PM_BELOW and hour != 0:
+        return hour + 12
+    return hour if hour < 24 else None
+
+@functools.lru_cache(maxsize=1024)
+def _parse_time(text: str) -> time | None:
+    if text in _NAMED_TIMES:
+        return _NAMED_TIMES[text]
+    match = _CLOCK.match(text)
+    if match:
+        hour = int(match.group("h"))
+        # "13:00" and "09:30" are explicit 24h; "3" and "3:00" get the business-hours guess
+        explicit_24h = match.group("m") is not None and (len(match.group("h")) == 2 or hour >= _ASSUME_PM_BELOW)
+        if match.group("ampm") or not explicit_24h:
+            hour = _to_24h(hour, match.group("ampm"))
+        minute = int(match.group("m") or 0)
+        if hour is None or hour > 23 or minute > 59:
+            return None
+        if match.group("offset") and match.group("offset")[1:].replace(":", "") != "0000":
+            return None  # Slots are UTC; a shifted time could also mean a different day
+        return time(hour, minute)
+    match = _SPOKEN.match(text)
+    if match:
+        raw = match.group("h")
+        hour = int(raw) if raw.isdigit() else _HOUR_WORDS[raw]
+        minute = _MINUTE_WORDS.get(match.group("mw"), 0) if match.group("mw") else 0
+        hour = _to_24h(hour, match.group("ampm"), match.group("part"))
+        if hour is None or hour > 23:
+            return None
+        if match.group("rel"):
+            minute = 30 if match.group("rel") == "half" else 15
+            if match.group("dir") == "to":
+                # On the 24h clock, so "quarter to one" is 12:45 and "to eight" stays morning
+                hour, minute = divmod((hour * 60 - minute) % MINUTES_PER_DAY, 60)
+        return time(hour, minute)
+    return None
+
+def parse_time(value: str) -> time | None:
+    """"14:30", "2:30 PM", "2pm", "13:00:00", "half past two", "noon" -> UTC time, or None.
+
+    "Z", "UTC" and "+00:00" suffixes are accepted; any other offset is refused
+    rather than dropped.
+    """
+    text = re.sub(r"^at\s+", "", " ".join(str(value).lower().split()))
+    return _parse_time(text) if text else None
@@ -0,0 +1,128 @@
+import os
+import uuid
+from dotenv import load_dotenv
+from postgrest.types import ReturnMethod
+from supabase import AsyncClient
+
+import costs
+import resilience
+
+load_dotenv()
+
+# --- INITIALIZATION ---
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+
+if not SUPABASE_URL or not SUPABASE_KEY:
+    raise ValueError("Missing Supabase credentials in .env file")
+
+APPOINTMENTS_TABLE = "appointments"
+
+# One async client per worker process. Its PostgREST session owns a single
+# pooled HTTP connection, so every tool call in every room reuses the same
+# keep-alive sockets instead of opening new ones.
+_client: AsyncClient | None = None
+
+def get_client() -> AsyncClient:
+    """Returns the shared async Supabase client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = AsyncClient(SUPABASE_URL, SUPABASE_KEY)
+    return _client
+
+def use_client(client):
+    """Swaps in another client with the same interface (e.g. the offline
+    stand-in in benchmarks/fake_supabase.py)."""
+    global _client
+    _client = client
+
+def _appointments():
+    return get_client().table(APPOINTMENTS_TABLE)
+
+async def _execute(query, write: bool = False):
+    """Runs one PostgREST request within the calling tool's budget (see
+    resilience.py) and charges every attempt to the current session's usage.
+    Reads may be hedged; writes must be idempotent, as they may be retried."""
+    async def run():
+        costs.count_db_call()
+        result = await query.execute()
+        return result.data
+    return await (resilience.write(run) if write else resilience.read(run))
+
+_warmed = False
+
+async def warm():
+    """Opens the pooled HTTPS connection with a trivial query, once per process,
+    so the first real tool call skips DNS + TLS setup."""
+    global _warmed
+    if _warmed:
+        return
+    _warmed = True
+    try:
+        await _execute(_appointments().select("id").limit(1))
+    except Exception as e:
+        _warmed = False
+        print(f"DB Warm-up Error: {e}")
+
+# --- DATA ACCESS ---
+# Every query awaits the async client, so a slow round trip only suspends the
+# calling tool and never stalls VAD/STT/TTS for other sessions on the worker.
+# Each one selects only the columns its caller reads, bounded by a limit where
+# it can be, and is served by an index from migrations/0003.
+
+async def find_user(contact_number: str) -> dict | None:
+    """Returns {"user_name"} for a known contact number, if any."""
+    query = _appointments() \
+        .select("user_name") \
+        .eq("contact_number", contact_number) \
+        .limit(1)
+    rows = await _execute(query)
+    return rows[0] if rows else None
+
+async def taken_slots_between(start_iso: str, end_iso: str) -> list[dict]:
+    """Returns the booked (id, slot) rows in the inclusive [start, end] range."""
+    query = _appointments() \
+        .select("id, appointment_slot") \
+        .gte("appointment_slot", start_iso) \
+        .lte("appointment_slot", end_iso)
+    return await _execute(query)
+
+async def list_appointments(contact_number: str, limit: int = 5) -> list[dict]:
+    """Returns the caller's most recent appointments, newest first."""
+    query = _appointments() \
+        .select("id, appointment_slot") \
+        .eq("contact_number", contact_number) \
+        .order("appointment_slot", desc=True) \
+        .limit(limit)
+    return await _execute(query)
+
+# Writes go through the Postgres functions in migrations/ (0001, redefined in 0002
+# and 0004), which check the collision window and write in one transaction. Both
+# return {"ok": True, "id", "appointment_slot"} or {"ok": False, "conflict_slot"}.
+# The request id makes a retried call return the first call's result.
+
+async def reserve_appointment(user_name: str, contact_number: str, slot_iso: str,
+                              window_minutes: int = 29, capacity: int = 1) -> dict:
+    return await _execute(get_client().rpc("reserve_appointment", {
+        "p_user_name": user_name,
+        "p_contact_number": contact_number,
+        "p_slot": slot_iso,
+        "p_window_minutes": window_minutes,
+        "p_capacity": capacity,
+        "p_request_id": str(uuid.uuid4()),
+    }), write=True)
+
+async def move_appointment(appointment_id: str, slot_iso: str,
+                           window_minutes: int = 29, capacity: int = 1) -> dict:
+    return await _execute(get_client().rpc("move_appointment", {
+        "p_id": appointment_id,
+        "p_slot": slot_iso,
+        "p_window_minutes": window_minutes,
+        "p_capacity": capacity,
+        "p_request_id": str(uuid.uuid4()),
+    }), write=True)
+
+async def delete_appointment(appointment_id: str):
+    # returning="minimal": nobody reads the deleted row, so don't ship it back
+    # Deleting by id is idempotent, so it can be retried as is
+    await _execute(_appointments().delete(returning=ReturnMethod.minimal).eq("id", appointment_id), write=True)
@@ -0,0 +1,79 @@
+import asyncio
+import os
+
+import db
+import resilience
+from cache import TTLCache, host_store
+
+# "Who is this number" cache, keyed by the 10 digits. A redial lands in a new
+# job process, so entries live in the host-wide tier (cache.HostStore) as
+# well as in process; only the in-flight query sharing is per process.
+# Known callers keep their name for IDENTITY_CACHE_TTL; unknown numbers are
+# remembered for a shorter IDENTITY_NEGATIVE_TTL, since another worker may
+# book for them at any moment. Bookings made here update both.
+IDENTITY_CACHE_TTL = float(os.getenv("IDENTITY_CACHE_TTL", "600"))
+IDENTITY_NEGATIVE_TTL = float(os.getenv("IDENTITY_NEGATIVE_TTL", "60"))
+IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", "4096"))
+
+_known = TTLCache(maxsize=IDENTITY_CACHE_SIZE, ttl=IDENTITY_CACHE_TTL, shared=host_store("identity_known"))
+_unknown = TTLCache(maxsize=IDENTITY_CACHE_SIZE, ttl=IDENTITY_NEGATIVE_TTL, shared=host_store("identity_unknown"))
+_inflight: dict[str, asyncio.Future] = {}
+
+def normalize(contact_number: str) -> str:
+    return "".join(filter(str.isdigit, str(contact_number)))
+
+async def lookup(contact_number: str) -> dict | None:
+    """Returns {"user_name"} for a known caller or None, hitting the DB at most
+    once per number per TTL. Concurrent lookups for one number share a query."""
+    number = normalize(contact_number)
+    user = _known.get(number)
+    if user is not None:
+        return user
+    if _unknown.get(number) is not None:
+        return None
+
+    pending = _inflight.get(number)
+    if pending is None:
+        pending = _inflight[number] = asyncio.ensure_future(_load(number))
+        pending.add_done_callback(lambda _: _inflight.pop(number, None))
+    try:
+        # The shared query runs in its own task, so bound the wait by this tool's budget
+        return await asyncio.wait_for(asyncio.shield(pending), resilience.remaining())
+    except asyncio.TimeoutError:
+        raise resilience.DBUnavailable("identity lookup over budget")
+
+async def _load(number: str) -> dict | None:
+    user = await db.find_user(number)
+    if user:
+        _known.set(number, user)
+    else:
+        _unknown.set(number, True)
+    return user
+
+async def prefetch(contact_number: str):
+    """Fire-and-forget lookup, e.g. from a transcript, so the real one is a cache hit."""
+    try:
+        await lookup(contact_number)
+    except Exception as e:
+        print(f"Identity Prefetch Error: {e}")
+
+def record_booking(contact_number: str, user_name: str):
+    """A booking makes the number known; drop any negative entry."""
+    number = normalize(contact_number)
+    _unknown.pop(number)
+    if _known.peek(number) is None:
+        _known.set(number, {"user_name": user_name})
+
+def stats() -> dict:
+    known, unknown = _known.stats(), _unknown.stats()
+    hits = known["hits"] + unknown["hits"]
+    lookups = hits + unknown["misses"]  # A miss always falls through both caches
+    return {
+        "hits": hits,
+        "negative_hits": unknown["hits"],
+        "shared_hits": known["shared_hits"] + unknown["shared_hits"],  # Answered by another call's lookup
+        "misses": unknown["misses"],
+        "evictions": known["evictions"] + unknown["evictions"],
+        "size": known["size"] + unknown["size"],
+        "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+    }
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import time
+
+# Upper bound on waiting for the goodbye line to finish before hanging up.
+EXIT_PLAYOUT_TIMEOUT = float(os.getenv("EXIT_PLAYOUT_TIMEOUT", "10"))
+
+class SessionLifecycle:
+    """Event-driven end of a call: no polling loop, no fixed sleeps.
+
+    The job waits on the room's `disconnected` event. summarize_and_exit asks
+    for a hang-up once its goodbye has played out, and aclose() then closes
+    the pipeline, the avatar and the session's background tasks in order,
+    timing each step so slow teardown shows up in the metrics.
+    """
+
+    def __init__(self, room, state):
+        self.room = room
+        self.state = state
+        self.session = None
+        self.avatar = None
+        self.timings: dict[str, float] = {}
+        self._disconnected = asyncio.Event()
+        room.on("disconnected", lambda *_: self._disconnected.set())
+
+    def attach(self, session, avatar=None):
+        self.session = session
+        self.avatar = avatar
+
+    def hang_up(self):
+        """Disconnects now (e.g. the caller left)."""
+        if not self._disconnected.is_set():
+            self.state.spawn(self.room.disconnect())
+
+    def hang_up_after(self, speech_handle):
+        """Disconnects as soon as `speech_handle` finishes playing."""
+        self.state.spawn(self._hang_up_after(speech_handle))
+
+    async def _hang_up_after(self, speech_handle):
+        try:
+            await asyncio.wait_for(speech_handle.wait_for_playout(), EXIT_PLAYOUT_TIMEOUT)
+        except Exception as e:
+            print(f"Exit playout wait ended early: {e!r}")
+        if self.state.ui is not None:
+            await self.state.ui.flush()
+        await self.room.disconnect()
+
+    async def wait(self):
+        """Returns once the room is gone."""
+        if self.room.isconnected():
+            await self._disconnected.wait()
+
+    async def _step(self, name: str, awaitable):
+        started = time.perf_counter()
+        try:
+            await awaitable
+        except Exception as e:
+            print(f"Teardown step {name} failed: {e!r}")
+        finally:
+            self.timings[name] = (time.perf_counter() - started) * 1000
+            self.state.latency.observe(f"teardown_{name}", self.timings[name])
+
+    async def aclose(self):
+        """Closes STT/TTS/LLM streams, the avatar, data-channel and prefetch tasks, then the room."""
+        started = time.perf_counter()
+        if self.session is not None:
+            await self._step("session", self.session.aclose())
+        avatar_close = getattr(self.avatar, "aclose", None)
+        if avatar_close is not None:
+            await self._step("avatar", avatar_close())
+
+        tasks = list(self.state.tasks)
+        for task in tasks:
+            task.cancel()
+        await self._step("tasks", asyncio.gather(*tasks, return_exceptions=True))
+
+        if self.room.isconnected():
+            await self._step("room", self.room.disconnect())
+
+        self.timings["total"] = (time.perf_counter() - started) * 1000
+        self.state.latency.observe("teardown_total", self.timings["total"])
+        print(f"Teardown for {self.state.room_name}: " + " | ".join(f"{k} {int(v)}ms" for k, v in self.timings.items()))
@@ -0,0 +1,90 @@
+-- 0001: atomic booking.
+-- book_appointment / modify_appointment used to SELECT the ±29 minute window
+-- and then INSERT/UPDATE in a second request, leaving a gap where two callers
+-- could both see the slot as free. These functions do the check and the write
+-- in one transaction, reached through a single PostgREST RPC round trip.
+-- Writers are serialized per UTC day with transaction-scoped advisory locks.
+
+create or replace function public._lock_appointment_days(p_from timestamptz, p_to timestamptz)
+returns void
+language plpgsql
+as $$
+declare
+    v_day date;
+begin
+    -- Always lock in ascending day order so concurrent writers can't deadlock.
+    for v_day in
+        select generate_series((p_from at time zone 'UTC')::date, (p_to at time zone 'UTC')::date, interval '1 day')::date
+    loop
+        perform pg_advisory_xact_lock(hashtext('appointments:' || v_day::text));
+    end loop;
+end;
+$$;
+
+create or replace function public.reserve_appointment(
+    p_user_name text,
+    p_contact_number text,
+    p_slot timestamptz,
+    p_window_minutes int default 29
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_window interval := make_interval(mins => p_window_minutes);
+    v_conflict timestamptz;
+    v_id appointments.id%type;
+begin
+    perform public._lock_appointment_days(p_slot - v_window, p_slot + v_window);
+
+    select appointment_slot into v_conflict
+      from appointments
+     where appointment_slot between p_slot - v_window and p_slot + v_window
+     order by abs(extract(epoch from appointment_slot - p_slot))
+     limit 1;
+
+    if found then
+        return jsonb_build_object('ok', false, 'conflict_slot', v_conflict);
+    end if;
+
+    insert into appointments (user_name, contact_number, appointment_slot, status)
+    values (p_user_name, p_contact_number, p_slot, 'booked')
+    returning id into v_id;
+
+    return jsonb_build_object('ok', true, 'id', v_id, 'appointment_slot', p_slot);
+end;
+$$;
+
+create or replace function public.move_appointment(
+    p_id appointments.id%type,
+    p_slot timestamptz,
+    p_window_minutes int default 29
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_window interval := make_interval(mins => p_window_minutes);
+    v_conflict timestamptz;
+begin
+    perform public._lock_appointment_days(p_slot - v_window, p_slot + v_window);
+
+    select appointment_slot into v_conflict
+      from appointments
+     where id <> p_id
+       and appointment_slot between p_slot - v_window and p_slot + v_window
+     order by abs(extract(epoch from appointment_slot - p_slot))
+     limit 1;
+
+    if found then
+        return jsonb_build_object('ok', false, 'conflict_slot', v_conflict);
+    end if;
+
+    update appointments set appointment_slot = p_slot where id = p_id;
+    if not found then
+        return jsonb_build_object('ok', false, 'missing', true);
+    end if;
+
+    return jsonb_build_object('ok', true, 'id', p_id, 'appointment_slot', p_slot);
+end;
+$$;
@@ -0,0 +1,77 @@
+-- 0002: slot-engine aware reservations.
+-- The slot calendar (slots.py) can now run several providers in parallel, so
+-- a slot only conflicts once `p_capacity` bookings already start inside the
+-- window. The window itself is passed in from the calendar configuration.
+
+drop function if exists public.reserve_appointment(text, text, timestamptz, int);
+drop function if exists public.move_appointment(uuid, timestamptz, int);
+
+create or replace function public.reserve_appointment(
+    p_user_name text,
+    p_contact_number text,
+    p_slot timestamptz,
+    p_window_minutes int default 29,
+    p_capacity int default 1
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_window interval := make_interval(mins => p_window_minutes);
+    v_taken int;
+    v_conflict timestamptz;
+    v_id appointments.id%type;
+begin
+    perform public._lock_appointment_days(p_slot - v_window, p_slot + v_window);
+
+    select count(*), (array_agg(appointment_slot order by abs(extract(epoch from appointment_slot - p_slot))))[1]
+      into v_taken, v_conflict
+      from appointments
+     where appointment_slot between p_slot - v_window and p_slot + v_window;
+
+    if v_taken >= p_capacity then
+        return jsonb_build_object('ok', false, 'conflict_slot', v_conflict);
+    end if;
+
+    insert into appointments (user_name, contact_number, appointment_slot, status)
+    values (p_user_name, p_contact_number, p_slot, 'booked')
+    returning id into v_id;
+
+    return jsonb_build_object('ok', true, 'id', v_id, 'appointment_slot', p_slot);
+end;
+$$;
+
+create or replace function public.move_appointment(
+    p_id appointments.id%type,
+    p_slot timestamptz,
+    p_window_minutes int default 29,
+    p_capacity int default 1
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_window interval := make_interval(mins => p_window_minutes);
+    v_taken int;
+    v_conflict timestamptz;
+begin
+    perform public._lock_appointment_days(p_slot - v_window, p_slot + v_window);
+
+    select count(*), (array_agg(appointment_slot order by abs(extract(epoch from appointment_slot - p_slot))))[1]
+      into v_taken, v_conflict
+      from appointments
+     where id <> p_id
+       and appointment_slot between p_slot - v_window and p_slot + v_window;
+
+    if v_taken >= p_capacity then
+        return jsonb_build_object('ok', false, 'conflict_slot', v_conflict);
+    end if;
+
+    update appointments set appointment_slot = p_slot where id = p_id;
+    if not found then
+        return jsonb_build_object('ok', false, 'missing', true);
+    end if;
+
+    return jsonb_build_object('ok', true, 'id', p_id, 'appointment_slot', p_slot);
+end;
+$$;
@@ -0,0 +1,16 @@
+-- 0003: indexes for every query shape db.py and the RPCs issue.
+--   find_user / list_appointments  where contact_number = $1 [order by appointment_slot desc] limit n
+--   taken_slots_between / RPCs     where appointment_slot between $1 and $2
+-- The composite index also serves plain contact_number lookups (leftmost
+-- prefix), so no separate single-column contact_number index is added; it
+-- would only slow down every insert.
+-- On a large live table, run each statement on its own with
+-- `create index concurrently` instead (it cannot run inside a transaction).
+
+create index if not exists appointments_contact_slot_idx
+    on public.appointments (contact_number, appointment_slot desc);
+
+create index if not exists appointments_slot_idx
+    on public.appointments (appointment_slot);
+
+analyze public.appointments;
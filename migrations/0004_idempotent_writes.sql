@@ -0,0 +1,119 @@
+-- 0004: idempotent reservations.
+-- db.py now retries a write that timed out. The first attempt may have
+-- committed with only the response lost, so each call carries a request id
+-- (p_request_id) and the functions replay the stored result for an id they
+-- have already seen instead of booking or moving twice. Rows are only
+-- needed for the few seconds a retry can take; purge anything older than a
+-- day from a scheduled job (e.g. pg_cron) if the table grows.
+
+create table if not exists public.appointment_requests (
+    request_id uuid primary key,
+    result jsonb not null,
+    created_at timestamptz not null default now()
+);
+create index if not exists appointment_requests_created_idx
+    on public.appointment_requests (created_at);
+
+drop function if exists public.reserve_appointment(text, text, timestamptz, int, int);
+drop function if exists public.move_appointment(uuid, timestamptz, int, int);
+
+create or replace function public.reserve_appointment(
+    p_user_name text,
+    p_contact_number text,
+    p_slot timestamptz,
+    p_window_minutes int default 29,
+    p_capacity int default 1,
+    p_request_id uuid default null
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_window interval := make_interval(mins => p_window_minutes);
+    v_taken int;
+    v_conflict timestamptz;
+    v_id appointments.id%type;
+    v_result jsonb;
+begin
+    perform public._lock_appointment_days(p_slot - v_window, p_slot + v_window);
+
+    -- A retry of the same request takes the same day locks, so this check
+    -- can't race the first attempt.
+    if p_request_id is not null then
+        select result into v_result from appointment_requests where request_id = p_request_id;
+        if found then
+            return v_result;
+        end if;
+    end if;
+
+    select count(*), (array_agg(appointment_slot order by abs(extract(epoch from appointment_slot - p_slot))))[1]
+      into v_taken, v_conflict
+      from appointments
+     where appointment_slot between p_slot - v_window and p_slot + v_window;
+
+    if v_taken >= p_capacity then
+        v_result := jsonb_build_object('ok', false, 'conflict_slot', v_conflict);
+    else
+        insert into appointments (user_name, contact_number, appointment_slot, status)
+        values (p_user_name, p_contact_number, p_slot, 'booked')
+        returning id into v_id;
+        v_result := jsonb_build_object('ok', true, 'id', v_id, 'appointment_slot', p_slot);
+    end if;
+
+    if p_request_id is not null then
+        insert into appointment_requests (request_id, result) values (p_request_id, v_result)
+        on conflict (request_id) do nothing;
+    end if;
+    return v_result;
+end;
+$$;
+
+create or replace function public.move_appointment(
+    p_id appointments.id%type,
+    p_slot timestamptz,
+    p_window_minutes int default 29,
+    p_capacity int default 1,
+    p_request_id uuid default null
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_window interval := make_interval(mins => p_window_minutes);
+    v_taken int;
+    v_conflict timestamptz;
+    v_result jsonb;
+begin
+    perform public._lock_appointment_days(p_slot - v_window, p_slot + v_window);
+
+    if p_request_id is not null then
+        select result into v_result from appointment_requests where request_id = p_request_id;
+        if found then
+            return v_result;
+        end if;
+    end if;
+
+    select count(*), (array_agg(appointment_slot order by abs(extract(epoch from appointment_slot - p_slot))))[1]
+      into v_taken, v_conflict
+      from appointments
+     where id <> p_id
+       and appointment_slot between p_slot - v_window and p_slot + v_window;
+
+    if v_taken >= p_capacity then
+        v_result := jsonb_build_object('ok', false, 'conflict_slot', v_conflict);
+    else
+        update appointments set appointment_slot = p_slot where id = p_id;
+        if found then
+            v_result := jsonb_build_object('ok', true, 'id', p_id, 'appointment_slot', p_slot);
+        else
+            v_result := jsonb_build_object('ok', false, 'missing', true);
+        end if;
+    end if;
+
+    if p_request_id is not null then
+        insert into appointment_requests (request_id, result) values (p_request_id, v_result)
+        on conflict (request_id) do nothing;
+    end if;
+    return v_result;
+end;
+$$;
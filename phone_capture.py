@@ -0,0 +1,87 @@
+import re
+
+# Transcript-level phone-number capture, so the identity step doesn't need an
+# LLM round trip just to turn "five five five, oh one two..." into digits.
+
+_DIGITS = {
+    "zero": "0", "oh": "0", "o": "0", "one": "1", "two": "2", "three": "3", "four": "4",
+    "five": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9",
+}
+_TEENS = {
+    "ten": "10", "eleven": "11", "twelve": "12", "thirteen": "13", "fourteen": "14",
+    "fifteen": "15", "sixteen": "16", "seventeen": "17", "eighteen": "18", "nineteen": "19",
+}
+_TENS = {
+    "twenty": "2", "thirty": "3", "forty": "4", "fifty": "5",
+    "sixty": "6", "seventy": "7", "eighty": "8", "ninety": "9",
+}
+_REPEAT = {"double": 2, "triple": 3}
+# Words callers drop between digit groups without ending the number. "and"
+# is not one of them: "5550123456 and 2" is a number followed by a choice.
+_FILLER = {"uh", "um", "umm", "er", "ah", "like", "dash", "hyphen"}
+
+# Sentence punctuation ends a run ("555 123 4567, 2 pm" is a number, then a
+# time). A comma inside an unfinished number is STT's group separator, as in
+# "five five five, oh one two, ...", so it only ends a run once a full number
+# has been read.
+_TOKEN = re.compile(r"[a-z]+|\d+|[.,;:!?]")
+
+def _runs(transcript: str):
+    """Yields every maximal run of spoken/written digits as (digits, leading "oh" count)."""
+    tokens = _TOKEN.findall(transcript.lower())
+    digits, leading_oh, repeat = [], 0, 1
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        chunk = None
+        if token.isdigit():
+            chunk = token
+        elif token in _DIGITS:
+            chunk = _DIGITS[token]
+            if token in ("oh", "o") and len(digits) == leading_oh:
+                leading_oh += 1  # "Oh, it's..." may be an interjection, not a zero
+        elif token in _TEENS:
+            chunk = _TEENS[token]
+        elif token in _TENS:
+            # "fifty five" -> 55, "fifty" -> 50
+            nxt = tokens[i + 1] if i + 1 < len(tokens) else ""
+            if nxt in _DIGITS and nxt not in ("oh", "o", "zero"):
+                chunk = _TENS[token] + _DIGITS[nxt]
+                i += 1
+            else:
+                chunk = _TENS[token] + "0"
+        elif token == "hundred" and digits:
+            chunk = "00"
+        elif token in _REPEAT:
+            repeat = _REPEAT[token]
+        elif token in _FILLER and digits:
+            pass
+        elif token == "," and 0 < len("".join(digits)) < 10:
+            pass
+        else:
+            if digits:
+                yield "".join(digits), leading_oh
+            digits, leading_oh, repeat = [], 0, 1
+        if chunk is not None:
+            digits.append(chunk[0] * repeat + chunk[1:] if repeat > 1 else chunk)
+            repeat = 1
+        i += 1
+    if digits:
+        yield "".join(digits), leading_oh
+
+def extract_phone_number(transcript: str) -> str | None:
+    """Returns the last 10-digit number spoken in `transcript`, or None.
+
+    Handles written digits, spoken digits ("oh" = 0), "double"/"triple",
+    teens and tens ("fifty five"), separators and a leading country code 1.
+    The last match wins, so "555... no sorry, 556..." picks the correction.
+    """
+    found = None
+    for digits, leading_oh in _runs(transcript):
+        while len(digits) > 10 and leading_oh:
+            digits, leading_oh = digits[1:], leading_oh - 1
+        if len(digits) == 11 and digits[0] == "1":
+            digits = digits[1:]
+        if len(digits) == 10:
+            found = digits
+    return found
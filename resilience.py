@@ -0,0 +1,223 @@
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from collections import deque
+
+# Deadline-bounded DB access. Every tool gets a latency budget; each query it
+# issues runs against what is left of it. Idempotent reads are hedged with a
+# duplicate request when the first one is slower than usual, writes are
+# retried with the same idempotency key while budget remains, and a circuit
+# breaker fails fast once Supabase keeps failing, so the caller hears a
+# fallback line instead of silence.
+
+# Seconds per tool, end to end. Writes get longer: a retried reservation is
+# still better than asking the caller to repeat themselves.
+TOOL_BUDGETS = {
+    "identify_user": 1.5,
+    "fetch_slots": 2.0,
+    "find_next_available": 2.5,
+    "retrieve_appointments": 2.0,
+    "book_appointment": 4.0,
+    "modify_appointment": 4.0,
+    "cancel_appointment": 3.0,
+}
+DEFAULT_BUDGET = float(os.getenv("DB_DEFAULT_BUDGET", "3.0"))  # Queries outside a tool (prefetch, warm-up)
+HEDGE_ENABLED = os.getenv("DB_HEDGE", "1") != "0"
+HEDGE_MIN_DELAY = float(os.getenv("DB_HEDGE_MIN_MS", "120")) / 1000
+WRITE_RETRIES = int(os.getenv("DB_WRITE_RETRIES", "2"))
+# Per attempt, so a write whose reply got lost still leaves budget for a retry.
+WRITE_ATTEMPT_TIMEOUT = float(os.getenv("DB_WRITE_ATTEMPT_MS", "1200")) / 1000
+BREAKER_FAILURES = int(os.getenv("DB_BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN = float(os.getenv("DB_BREAKER_COOLDOWN", "10"))
+
+FALLBACK_LINE = ("I'm having trouble accessing the system right now. "
+                 "Could we try that again in a moment?")
+
+class DBUnavailable(Exception):
+    """The DB didn't answer within budget, or the breaker is open."""
+
+# --- CIRCUIT BREAKER ---
+
+class CircuitBreaker:
+    """Opens after `failures` consecutive errors; after `cooldown` one probe is let
+    through (half-open) and its outcome closes or re-opens the circuit."""
+
+    def __init__(self, failures: int, cooldown: float, clock=time.monotonic):
+        self.failures = failures
+        self.cooldown = cooldown
+        self._clock = clock
+        self.consecutive = 0
+        self.opened_at: float | None = None
+        self.probing = False
+        self.opens = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self._clock() - self.opened_at >= self.cooldown else "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.probing:
+            self.probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def success(self):
+        self.consecutive = 0
+        self.opened_at = None
+        self.probing = False
+
+    def release(self):
+        """Ends a probe that got no verdict (cancelled, or never sent) so the next call can probe."""
+        self.probing = False
+
+    def failure(self):
+        self.consecutive += 1
+        if self.probing or self.consecutive >= self.failures:
+            if self.opened_at is None or self.probing:
+                self.opens += 1
+            self.opened_at = self._clock()
+            self.probing = False
+
+
+BREAKER = CircuitBreaker(BREAKER_FAILURES, BREAKER_COOLDOWN)
+
+# Worker-wide counters, exported on the metrics endpoint.
+DB_TOTALS = {"timeouts": 0, "errors": 0, "hedges": 0, "hedge_wins": 0, "retries": 0, "fallbacks": 0}
+
+# Recent read latencies (seconds): the hedge fires at their ~p90.
+_read_latency: deque = deque(maxlen=256)
+
+def hedge_delay() -> float:
+    if len(_read_latency) < 20:
+        return HEDGE_MIN_DELAY * 2
+    ordered = sorted(_read_latency)
+    return max(HEDGE_MIN_DELAY, ordered[int(0.9 * len(ordered))])
+
+def stats() -> dict:
+    return {**DB_TOTALS, "breaker": BREAKER.state, "breaker_opens": BREAKER.opens,
+            "breaker_rejected": BREAKER.rejected, "hedge_after_ms": round(hedge_delay() * 1000)}
+
+# --- BUDGETS ---
+
+# (owning task, absolute deadline). Background tasks a tool spawns inherit the
+# context but not the deadline: they fall back to DEFAULT_BUDGET.
+_deadline: contextvars.ContextVar[tuple | None] = contextvars.ContextVar("db_deadline", default=None)
+
+def remaining() -> float:
+    owner = _deadline.get()
+    if owner is not None and owner[0] is asyncio.current_task():
+        return owner[1] - time.monotonic()
+    return DEFAULT_BUDGET
+
+def budgeted(fn):
+    """Gives a tool its DB budget, and turns DBUnavailable into the spoken fallback."""
+    @functools.wraps(fn)
+    async def wrapper(ctx, *args, **kwargs):
+        budget = TOOL_BUDGETS.get(fn.__name__, DEFAULT_BUDGET)
+        token = _deadline.set((asyncio.current_task(), time.monotonic() + budget))
+        try:
+            return await fn(ctx, *args, **kwargs)
+        except DBUnavailable as e:
+            DB_TOTALS["fallbacks"] += 1
+            ctx.userdata.tool_failures += 1
+            print(f"DB Fallback in {fn.__name__}: {e}")
+            return FALLBACK_LINE
+        finally:
+            _deadline.reset(token)
+
+    return wrapper
+
+# --- EXECUTION ---
+
+def _check_budget() -> tuple[float, bool]:
+    """Returns the budget left and whether this call holds the half-open probe."""
+    budget = remaining()
+    if budget <= 0:
+        raise DBUnavailable("tool budget exhausted")
+    if not BREAKER.allow():
+        raise DBUnavailable("circuit open")
+    return budget, BREAKER.probing
+
+async def _attempt(run, timeout: float):
+    """One bounded request; feeds the breaker."""
+    try:
+        result = await asyncio.wait_for(run(), timeout)
+    except asyncio.TimeoutError:
+        DB_TOTALS["timeouts"] += 1
+        BREAKER.failure()
+        raise DBUnavailable(f"no answer within {int(timeout * 1000)}ms")
+    except Exception as e:
+        DB_TOTALS["errors"] += 1
+        BREAKER.failure()
+        raise DBUnavailable(repr(e)) from e
+    BREAKER.success()
+    return result
+
+async def read(run):
+    """Idempotent read: if the first request is slower than usual (or fails
+    outright), send one duplicate and take whichever answers first."""
+    budget, probe = _check_budget()
+    started = time.monotonic()
+    deadline = started + budget
+    first = asyncio.ensure_future(_attempt(run, budget))
+    tasks = [first]
+    hedged = not HEDGE_ENABLED
+
+    def hedge():
+        nonlocal hedged
+        hedged = True
+        DB_TOTALS["hedges"] += 1
+        tasks.append(asyncio.ensure_future(_attempt(run, deadline - time.monotonic())))
+
+    try:
+        delay = hedge_delay()
+        if not hedged and delay < budget:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and BREAKER.state == "closed":
+                hedge()
+        while True:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            winner = next((t for t in done if t.exception() is None), None)
+            if winner is not None:
+                if winner is not first:
+                    DB_TOTALS["hedge_wins"] += 1
+                _read_latency.append(time.monotonic() - started)
+                return winner.result()
+            tasks = list(pending)
+            if not hedged and BREAKER.state == "closed" and deadline - time.monotonic() > 0.05:
+                hedge()
+            if not tasks:
+                raise next(iter(done)).exception()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        if probe:
+            BREAKER.release()  # A cancelled probe must not hold the breaker half-open forever
+
+async def write(run):
+    """Write with bounded retries. Callers pass idempotency keys, so a retry
+    after a lost response can't apply the change twice."""
+    attempt = 0
+    while True:
+        budget, probe = _check_budget()
+        try:
+            return await _attempt(run, min(budget, WRITE_ATTEMPT_TIMEOUT))
+        except DBUnavailable:
+            attempt += 1
+            if attempt > WRITE_RETRIES or remaining() <= 0 or BREAKER.state == "open":
+                raise
+            DB_TOTALS["retries"] += 1
+        finally:
+            if probe:
+                BREAKER.release()  # See read()
+        await asyncio.sleep(min(0.1 * 2 ** (attempt - 1), max(remaining(), 0)))
@@ -0,0 +1,113 @@
+import asyncio
+import sys
+import time
+from collections import deque
+
+import telemetry
+from costs import WORKER_USAGE, UsageLedger
+
+class SessionState:
+    """Per-room state attached to AgentSession.userdata.
+
+    Replaces the old module globals so concurrent rooms on one worker never
+    see each other's appointment references or timers. __slots__ keeps an
+    idle session to a fixed handful of pointers.
+    """
+
+    __slots__ = ("room_name", "started_at", "id_map", "appointments_prefetch", "tasks", "latency", "usage",
+                 "lifecycle", "ui", "caller_number", "speculation", "tool_calls", "tool_failures")
+
+    def __init__(self, room_name: str = ""):
+        self.room_name = room_name
+        self.started_at = time.time()
+        self.id_map: dict[str, str] = {}  # Maps #1, #2 to UUIDs for voice ease
+        self.appointments_prefetch = None  # (contact_number, started_at, task)
+        self.tasks: set[asyncio.Task] = set()  # Background work owned by this session
+        self.latency = telemetry.session_recorder()  # Per-turn stage timings, rolled up per worker
+        self.usage = UsageLedger(parent=WORKER_USAGE)  # Billable usage, rolled up per worker
+        self.lifecycle = None  # SessionLifecycle, set by agent.entrypoint
+        self.ui = None  # UIChannel, set by agent.entrypoint
+        self.caller_number = None  # Last number identify ran for (tool or transcript fast path)
+        self.speculation = None  # SlotSpeculator, set by agent.entrypoint
+        self.tool_calls = 0  # Finished tool calls (telemetry.timed_tool)
+        self.tool_failures = 0  # Of those, errors and spoken fallbacks
+
+    @property
+    def duration_sec(self) -> float:
+        return time.time() - self.started_at
+
+    def remember_appointments(self, appointment_ids: list[str]):
+        """Replaces the #1/#2 reference map with a fresh lookup."""
+        self.id_map = {str(index): uuid for index, uuid in enumerate(appointment_ids, start=1)}
+
+    def resolve(self, appointment_number: str) -> str | None:
+        return self.id_map.get(str(appointment_number).lstrip("#").strip())
+
+    def spawn(self, coro) -> asyncio.Task:
+        """Runs a coroutine in the background and cancels it when the session ends."""
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    def prefetch_appointments(self, contact_number: str, coro):
+        self.appointments_prefetch = (contact_number, time.monotonic(), self.spawn(coro))
+
+    async def prefetched_appointments(self, contact_number: str, max_age: float) -> list[dict] | None:
+        """Returns warm appointment rows for this caller, waiting on the fetch if it's still in flight."""
+        if not self.appointments_prefetch:
+            return None
+        number, started_at, task = self.appointments_prefetch
+        if number != contact_number or time.monotonic() - started_at > max_age or task.cancelled():
+            return None
+        try:
+            return await task
+        except Exception:
+            return None
+
+    def drop_prefetch(self):
+        """Forgets warm appointment rows after a write changes them."""
+        self.appointments_prefetch = None
+
+    def approx_size(self) -> int:
+        """Bytes held by this session for capacity planning: its own fields plus
+        everything it owns (latency recorder, usage ledger, UI queue and snapshot,
+        lifecycle, speculation, task objects). Worker-wide parents, the room and
+        the AgentSession are shared, so they are not counted."""
+        shared = {id(WORKER_USAGE), id(telemetry.WORKER)}
+        for owner, attrs in ((self.ui, ("room",)), (self.lifecycle, ("room", "session", "avatar"))):
+            shared.update(id(getattr(owner, attr, None)) for attr in attrs)
+        return _deep_size(self, shared | {id(None)})
+
+    def clear(self):
+        """Drops everything the session accumulated. Called on disconnect."""
+        for task in list(self.tasks):
+            task.cancel()
+        self.tasks.clear()
+        self.id_map = {}
+        self.appointments_prefetch = None
+        self.lifecycle = None
+        self.ui = None
+        self.caller_number = None
+        if self.speculation is not None:
+            self.speculation.close()
+            self.speculation = None
+
+# Repo types approx_size walks into; anything else (tasks, events, frames) counts shallow.
+_OWNED_MODULES = {"session_state", "telemetry", "costs", "ui_channel", "lifecycle", "speculation"}
+
+def _deep_size(obj, seen: set) -> int:
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return size + sum(_deep_size(k, seen) + _deep_size(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        return size + sum(_deep_size(item, seen) for item in obj)
+    if type(obj).__module__ in _OWNED_MODULES:
+        for name in getattr(type(obj), "__slots__", ()):
+            size += _deep_size(getattr(obj, name, None), seen)
+        if hasattr(obj, "__dict__"):
+            size += _deep_size(vars(obj), seen)
+    return size
@@ -0,0 +1,217 @@
+import os
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, time, timedelta, timezone
+
+# --- TIME <-> INTEGER MINUTES ---
+# Everything inside the engine is whole minutes since the Unix epoch (UTC),
+# so comparisons are integer ops and bookings can live in one sorted list.
+
+def to_minute(dt: datetime) -> int:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp()) // 60
+
+def from_minute(minute: int) -> datetime:
+    return datetime.fromtimestamp(minute * 60, timezone.utc)
+
+MINUTES_PER_DAY = 24 * 60
+
+def _day_start_minute(day: date) -> int:
+    return to_minute(datetime(day.year, day.month, day.day, tzinfo=timezone.utc))
+
+def _hhmm(value: str) -> int:
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+def _minute_of_day(value: time | str | None) -> int | None:
+    """Band edge as minutes into the day: a time (as parsed by dates.parse_time) or "HH:MM"."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, time):
+        return value.hour * 60 + value.minute
+    return _hhmm(value)
+
+
+class BookingIndex:
+    """Sorted booking start minutes plus an id lookup for O(log n) updates."""
+
+    __slots__ = ("minutes", "by_id")
+
+    def __init__(self, bookings: dict[str, int] | None = None):
+        self.by_id: dict[str, int] = dict(bookings or {})
+        self.minutes: list[int] = sorted(self.by_id.values())
+
+    def __len__(self):
+        return len(self.minutes)
+
+    def add(self, appointment_id: str, minute: int):
+        self.remove(appointment_id)
+        self.by_id[appointment_id] = minute
+        insort(self.minutes, minute)
+
+    def remove(self, appointment_id: str):
+        minute = self.by_id.pop(appointment_id, None)
+        if minute is not None:
+            del self.minutes[bisect_left(self.minutes, minute)]
+
+    def count_between(self, lo: int, hi: int, exclude_id: str | None = None) -> int:
+        """Number of bookings starting in [lo, hi]."""
+        count = bisect_right(self.minutes, hi) - bisect_left(self.minutes, lo)
+        own = self.by_id.get(exclude_id) if exclude_id else None
+        if own is not None and lo <= own <= hi:
+            count -= 1
+        return count
+
+    def nearest(self, minute: int) -> int | None:
+        """Booking start closest to `minute`, if any."""
+        i = bisect_left(self.minutes, minute)
+        neighbours = self.minutes[max(i - 1, 0):i + 1]
+        return min(neighbours, key=lambda m: abs(m - minute)) if neighbours else None
+
+    @classmethod
+    def merge(cls, indexes) -> "BookingIndex":
+        merged = {}
+        for index in indexes:
+            merged.update(index.by_id)
+        return cls(merged)
+
+
+class SlotCalendar:
+    """Business-hours slot grid checked against a BookingIndex.
+
+    A candidate start is free while fewer than `resources` bookings start
+    within `conflict_window` minutes of it (slot length + buffer, exclusive),
+    which is the same ±29 minute rule the booking RPCs enforce for 30 minute
+    slots with no buffer. Hours are interpreted in UTC like the stored slots.
+    """
+
+    def __init__(self, open_time: str = "09:00", close_time: str = "17:30", slot_minutes: int = 30,
+                 step_minutes: int | None = None, buffer_minutes: int = 0, resources: int = 1):
+        self.open_minute = _hhmm(open_time)
+        self.close_minute = _hhmm(close_time)
+        self.slot_minutes = slot_minutes
+        self.step_minutes = step_minutes or slot_minutes
+        self.buffer_minutes = buffer_minutes
+        self.resources = resources
+
+    @classmethod
+    def from_env(cls) -> "SlotCalendar":
+        return cls(
+            open_time=os.getenv("SLOT_OPEN_TIME", "09:00"),
+            close_time=os.getenv("SLOT_CLOSE_TIME", "17:30"),
+            slot_minutes=int(os.getenv("SLOT_MINUTES", "30")),
+            step_minutes=int(os.getenv("SLOT_STEP_MINUTES", "0")) or None,
+            buffer_minutes=int(os.getenv("SLOT_BUFFER_MINUTES", "0")),
+            resources=int(os.getenv("SLOT_RESOURCES", "1")),
+        )
+
+    @property
+    def conflict_window(self) -> int:
+        return self.slot_minutes + self.buffer_minutes - 1
+
+    def starts_for_day(self, day: date) -> range:
+        """Candidate start minutes (absolute) for one day."""
+        base = _day_start_minute(day)
+        last_start = self.close_minute - self.slot_minutes
+        return range(base + self.open_minute, base + last_start + 1, self.step_minutes)
+
+    def _starts_between(self, start_day: date, end_day: date, earliest: int | None, latest: int | None):
+        day = start_day
+        while day <= end_day:
+            base = _day_start_minute(day)
+            for minute in self.starts_for_day(day):
+                offset = minute - base
+                if (earliest is None or offset >= earliest) and (latest is None or offset <= latest):
+                    yield minute
+            day += timedelta(days=1)
+
+    def _band(self, earliest: int | None, latest: int | None) -> tuple[int, int] | None:
+        """First and last grid offsets (minutes into a day) inside the time-of-day band."""
+        first = self.open_minute
+        lo = max(first, earliest if earliest is not None else first)
+        lo = first + -(-(lo - first) // self.step_minutes) * self.step_minutes
+        hi = min(self.close_minute - self.slot_minutes, latest if latest is not None else MINUTES_PER_DAY)
+        hi = first + (hi - first) // self.step_minutes * self.step_minutes
+        return (lo, hi) if lo <= hi else None
+
+    def _next_start(self, minute: int, band: tuple[int, int]) -> int:
+        """First grid start at or after `minute` (O(1), no candidate list)."""
+        lo, hi = band
+        base = minute - minute % MINUTES_PER_DAY
+        offset = minute - base
+        if offset <= lo:
+            return base + lo
+        if offset > hi:
+            return base + MINUTES_PER_DAY + lo
+        return base + lo + -(-(offset - lo) // self.step_minutes) * self.step_minutes
+
+    def _prev_start(self, minute: int, band: tuple[int, int]) -> int:
+        """Last grid start at or before `minute`."""
+        lo, hi = band
+        base = minute - minute % MINUTES_PER_DAY
+        offset = minute - base
+        if offset >= hi:
+            return base + hi
+        if offset < lo:
+            return base - MINUTES_PER_DAY + hi
+        return base + lo + (offset - lo) // self.step_minutes * self.step_minutes
+
+    def is_free(self, index: BookingIndex, minute: int, exclude_id: str | None = None) -> bool:
+        window = self.conflict_window
+        return index.count_between(minute - window, minute + window, exclude_id) < self.resources
+
+    def free_slots(self, index: BookingIndex, day: date) -> list[datetime]:
+        """Every free start on `day`, in chronological order."""
+        return [from_minute(m) for m in self.starts_for_day(day) if self.is_free(index, m)]
+
+    def earliest_free(self, index: BookingIndex, start_day: date, end_day: date, count: int,
+                      earliest: time | str | None = None, latest: time | str | None = None,
+                      not_before: datetime | None = None) -> list[datetime]:
+        """First `count` free starts in the range, optionally within a time-of-day band."""
+        floor = to_minute(not_before) if not_before else None
+        found = []
+        for minute in self._starts_between(start_day, end_day,
+                                           _minute_of_day(earliest), _minute_of_day(latest)):
+            if floor is not None and minute < floor:
+                continue
+            if self.is_free(index, minute):
+                found.append(from_minute(minute))
+                if len(found) >= count:
+                    break
+        return found
+
+    def nearest_free(self, index: BookingIndex, target: datetime, start_day: date, end_day: date,
+                     count: int, earliest: time | str | None = None, latest: time | str | None = None,
+                     not_before: datetime | None = None) -> list[datetime]:
+        """The `count` free starts closest to `target` within the range, closest first.
+
+        Walks outward from `target` one grid start at a time, computing each
+        start arithmetically; every check is a bisect, so a query costs
+        O(log n) per start examined, however wide the range.
+        """
+        band = self._band(_minute_of_day(earliest), _minute_of_day(latest))
+        if band is None:
+            return []
+        lo = _day_start_minute(start_day)
+        hi = _day_start_minute(end_day) + MINUTES_PER_DAY - 1
+        if not_before is not None:
+            lo = max(lo, to_minute(not_before))
+        pivot = to_minute(target)
+        right = self._next_start(max(pivot, lo), band)
+        left = self._prev_start(min(pivot - 1, hi), band)
+        found = []
+        while len(found) < count:
+            right_ok, left_ok = right <= hi, left >= lo
+            if not (right_ok or left_ok):
+                break
+            if right_ok and (not left_ok or right - pivot <= pivot - left):
+                minute, right = right, self._next_start(right + 1, band)
+            else:
+                minute, left = left, self._prev_start(left - 1, band)
+            if self.is_free(index, minute):
+                found.append(from_minute(minute))
+        return found
+
+
+# Worker-wide calendar, configured through the SLOT_* environment variables.
+CALENDAR = SlotCalendar.from_env()
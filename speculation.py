@@ -0,0 +1,101 @@
+import asyncio
+import os
+from datetime import date, timedelta
+
+import availability
+import dates
+
+# Speculative availability: while the caller is still talking ("anything on
+# Thursday the 12th..."), interim transcripts name a day, and that day's
+# bookings start loading before the LLM has even decided to call fetch_slots.
+SPECULATION_ENABLED = os.getenv("ARIA_SPECULATE_SLOTS", "1") != "0"
+MAX_SPECULATIVE_DAYS = 3  # In flight per session; one utterance rarely names more
+SPECULATION_HORIZON_DAYS = 90  # Ignore dates too far out to be a booking request
+
+# Worker-wide counters, exported on the metrics endpoint. A miss is a day that
+# was speculated but still had to be loaded at fetch_slots time (cancelled,
+# failed or stale); days never speculated count as "unspeculated".
+SPECULATION_TOTALS = {"issued": 0, "hits": 0, "misses": 0, "unspeculated": 0, "cancelled": 0, "wasted": 0}
+
+def stats() -> dict:
+    lookups = SPECULATION_TOTALS["hits"] + SPECULATION_TOTALS["misses"]
+    issued = SPECULATION_TOTALS["issued"]
+    return {
+        **SPECULATION_TOTALS,
+        "hit_rate": round(SPECULATION_TOTALS["hits"] / lookups, 3) if lookups else 0.0,
+        "waste_rate": round(SPECULATION_TOTALS["wasted"] / issued, 3) if issued else 0.0,
+    }
+
+
+class SlotSpeculator:
+    """Per-session day prefetches driven by (interim) user transcripts.
+
+    Each day is queried at most once per session. A final transcript that no
+    longer mentions a day cancels its query if it's still in flight. A query
+    fetch_slots never reads counts as wasted when the session ends.
+    """
+
+    def __init__(self, state):
+        self.state = state
+        self.pending: dict[str, asyncio.Task] = {}  # ISO day -> day_bookings task
+        self.used: set[str] = set()
+        self.dropped: set[str] = set()  # Speculated, then cancelled by a final transcript
+
+    def observe(self, transcript: str, is_final: bool, today: date | None = None):
+        if not SPECULATION_ENABLED:
+            return
+        today = today or dates.today()
+        mentioned = [d.isoformat() for d in dates.dates_in_transcript(transcript, today)
+                     if today <= d <= today + timedelta(days=SPECULATION_HORIZON_DAYS)]
+
+        for day in mentioned:
+            if day in self.pending or len(self._in_flight()) >= MAX_SPECULATIVE_DAYS:
+                continue
+            if availability.cached_day(day) is not None:
+                continue  # Already warm; speculating would only add a query
+            self.pending[day] = self.state.spawn(availability.day_bookings(day))
+            SPECULATION_TOTALS["issued"] += 1
+
+        if is_final:
+            # Interim hypotheses the final transcript dropped ("Thursday... no, Friday")
+            for day, task in list(self.pending.items()):
+                if day not in mentioned and day not in self.used and not task.done():
+                    task.cancel()
+                    del self.pending[day]
+                    self.dropped.add(day)
+                    SPECULATION_TOTALS["cancelled"] += 1
+                    SPECULATION_TOTALS["wasted"] += 1
+
+    def _in_flight(self) -> list[asyncio.Task]:
+        return [task for task in self.pending.values() if not task.done()]
+
+    async def take(self, day: str):
+        """The speculated BookingIndex for `day`, or None if it wasn't speculated (or failed)."""
+        task = self.pending.get(day)
+        if task is None and day not in self.dropped:
+            SPECULATION_TOTALS["unspeculated"] += 1
+            return None
+        if task is None or task.cancelled():
+            SPECULATION_TOTALS["misses"] += 1
+            return None
+        try:
+            bookings = await task
+        except Exception:
+            SPECULATION_TOTALS["misses"] += 1
+            return None
+        if availability.cached_day(day) is not bookings:
+            SPECULATION_TOTALS["misses"] += 1  # Expired or invalidated since; reload
+            return None
+        if day not in self.used:
+            self.used.add(day)
+            SPECULATION_TOTALS["hits"] += 1
+        return bookings
+
+    def close(self):
+        """Counts speculated days nobody read, and cancels any still loading."""
+        for day, task in self.pending.items():
+            if day not in self.used:
+                SPECULATION_TOTALS["wasted"] += 1
+                task.cancel()
+        self.pending = {}
+        self.dropped = set()
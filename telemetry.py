@@ -0,0 +1,303 @@
+import asyncio
+import functools
+import json
+import os
+import socket
+import threading
+import time
+from collections import deque
+
+from livekit.agents import metrics as lk_metrics
+
+from costs import WORKER_USAGE, UsageLedger
+
+# --- LATENCY HISTOGRAMS ---
+
+class LatencyHistogram:
+    """Rolling window of millisecond samples with exact percentiles.
+
+    The window is bounded, so memory stays flat no matter how long a session
+    or worker runs; count/total keep the lifetime figures for Prometheus.
+    """
+
+    __slots__ = ("samples", "count", "total")
+
+    def __init__(self, max_samples: int):
+        self.samples: deque = deque(maxlen=max_samples)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value_ms: float):
+        self.samples.append(value_ms)
+        self.count += 1
+        self.total += value_ms
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def summary(self) -> dict:
+        return {
+            "p50": round(self.percentile(0.50), 1),
+            "p95": round(self.percentile(0.95), 1),
+            "p99": round(self.percentile(0.99), 1),
+            "count": self.count,
+        }
+
+
+class LatencyRecorder:
+    """Named histograms for one scope. Session recorders also feed the worker one."""
+
+    __slots__ = ("histograms", "max_samples", "parent")
+
+    def __init__(self, max_samples: int = 256, parent: "LatencyRecorder | None" = None):
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self.max_samples = max_samples
+        self.parent = parent
+
+    def observe(self, stage: str, value_ms: float):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = LatencyHistogram(self.max_samples)
+        histogram.observe(value_ms)
+        if self.parent is not None:
+            self.parent.observe(stage, value_ms)
+
+    def summary(self, stage: str) -> dict | None:
+        histogram = self.histograms.get(stage)
+        return histogram.summary() if histogram else None
+
+
+# Aggregate over every session this worker process has served.
+WORKER = LatencyRecorder(max_samples=4096)
+
+def session_recorder() -> LatencyRecorder:
+    return LatencyRecorder(parent=WORKER)
+
+# --- PIPELINE HOOKS ---
+
+def record_pipeline_metrics(m, recorder: LatencyRecorder, usage: UsageLedger):
+    """Maps an AgentSession `metrics_collected` payload onto turn-stage histograms
+    and the session's usage counters."""
+    if isinstance(m, lk_metrics.EOUMetrics):
+        recorder.observe("eou_delay", m.end_of_utterance_delay * 1000)
+        recorder.observe("stt_final_transcript", m.transcription_delay * 1000)
+    elif isinstance(m, lk_metrics.STTMetrics):
+        usage.add_stt(m.audio_duration)
+    elif isinstance(m, lk_metrics.LLMMetrics):
+        recorder.observe("llm_ttft", m.ttft * 1000)
+        usage.add_llm_turn(m.prompt_tokens, m.prompt_cached_tokens, m.completion_tokens)
+    elif isinstance(m, lk_metrics.TTSMetrics):
+        recorder.observe("tts_ttfb", m.ttfb * 1000)
+        usage.add_tts(m.characters_count, m.audio_duration)
+
+class StageTimer:
+    """Wall-clock breakdown of one session's bring-up (join -> greeting).
+
+    Stages may overlap; each is recorded as bringup_<stage> in the session
+    recorder so the slowest one shows up in p95s and can be regress-tested.
+    """
+
+    __slots__ = ("recorder", "started", "stages")
+
+    def __init__(self, recorder: LatencyRecorder):
+        self.recorder = recorder
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+
+    async def track(self, stage: str, awaitable):
+        """Awaits one stage and records its own duration."""
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self._record(stage, started)
+
+    def mark(self, stage: str):
+        """Records the time elapsed since bring-up began."""
+        self._record(stage, self.started)
+
+    def _record(self, stage: str, since: float):
+        elapsed_ms = (time.perf_counter() - since) * 1000
+        self.stages[stage] = elapsed_ms
+        self.recorder.observe(f"bringup_{stage}", elapsed_ms)
+
+    def report(self) -> str:
+        return " | ".join(f"{stage} {int(ms)}ms" for stage, ms in self.stages.items())
+
+def timed_tool(fn):
+    """Records a tool's wall time into the calling session's recorder (tool_<name>)
+    and counts the call, and whether it raised, for the session's reliability line.
+    Also where the page's "status" line for the tool is sent from."""
+    stage = f"tool_{fn.__name__}"
+
+    @functools.wraps(fn)
+    async def wrapper(ctx, *args, **kwargs):
+        started = time.perf_counter()
+        if ctx.userdata.ui is not None:
+            ctx.userdata.ui.tool_started(fn.__name__)
+        try:
+            return await fn(ctx, *args, **kwargs)
+        except Exception:
+            ctx.userdata.tool_failures += 1
+            raise
+        finally:
+            ctx.userdata.tool_calls += 1
+            ctx.userdata.latency.observe(stage, (time.perf_counter() - started) * 1000)
+
+    return wrapper
+
+def format_latency_report(recorder: LatencyRecorder) -> str:
+    """Spoken-report lines with real per-turn numbers for summarize_and_exit."""
+    lines = []
+    for stage, label in (("stt_final_transcript", "Transcript Delay"),
+                         ("llm_ttft", "LLM First Token"),
+                         ("tts_ttfb", "TTS First Audio")):
+        stats = recorder.summary(stage)
+        if stats:
+            lines.append(f"• {label}: p50 {int(stats['p50'])}ms / p95 {int(stats['p95'])}ms")
+    tool_stats = [(stage[5:], h.summary()) for stage, h in recorder.histograms.items() if stage.startswith("tool_")]
+    for tool_name, stats in sorted(tool_stats):
+        lines.append(f"• Tool {tool_name}: p50 {int(stats['p50'])}ms ({stats['count']} calls)")
+    return "\n".join(lines) if lines else "• Latency: no turns measured"
+
+# --- PROMETHEUS EXPORT ---
+# LiveKit runs every job in its own process, so the worker's one /metrics
+# endpoint lives in the main worker process. Job processes push a snapshot of
+# their histograms and stats to it over local UDP every
+# METRICS_REPORT_INTERVAL seconds; every series carries the pid it came from.
+# The same reports feed admission (loop lag, see capacity.py), so they flow
+# whether or not METRICS_PORT is set.
+
+REPORT_INTERVAL = float(os.getenv("METRICS_REPORT_INTERVAL", "2"))
+# Set by the main worker process to its job-report port; job processes inherit it.
+REPORT_PORT_ENV = "ARIA_JOB_REPORT_PORT"
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Extra gauge sources registered by other modules: name -> callable returning a dict.
+STAT_SOURCES: dict = {"usage": WORKER_USAGE.totals}
+
+def snapshot() -> dict:
+    """This process's histograms and numeric stats, JSON-ready."""
+    latency = {
+        stage: {"q": [histogram.percentile(q) for q in QUANTILES], "sum": histogram.total, "count": histogram.count}
+        for stage, histogram in list(WORKER.histograms.items())
+    }
+    stats = {}
+    for source, read_stats in list(STAT_SOURCES.items()):
+        try:
+            stats[source] = {key: float(value) for key, value in read_stats().items()
+                             if isinstance(value, (int, float))}  # Labels like "closed" aren't samples
+        except Exception as e:
+            print(f"Stats Source Error ({source}): {e}")
+    return {"pid": os.getpid(), "latency": latency, "stats": stats}
+
+# pid -> (received at, snapshot) from job processes; kept in the main worker process.
+_job_reports: dict[int, tuple[float, dict]] = {}
+
+def job_snapshots() -> list[dict]:
+    """Fresh snapshots from this worker's job processes (stale ones are dropped)."""
+    now = time.monotonic()
+    for pid, (received, _) in list(_job_reports.items()):
+        if now - received > 3 * REPORT_INTERVAL:
+            del _job_reports[pid]
+    return [report for _, report in _job_reports.values() if report["pid"] != os.getpid()]
+
+def render_prometheus() -> str:
+    series: dict[str, list[str]] = {}
+    for snap in [snapshot(), *job_snapshots()]:
+        process = snap["pid"]
+        for stage, h in sorted(snap["latency"].items()):
+            labels = f'process="{process}",stage="{stage}"'
+            for q, value in zip(QUANTILES, h["q"]):
+                series.setdefault("aria_stage_latency_ms", []).append(
+                    f'aria_stage_latency_ms{{{labels},quantile="{q}"}} {value:.1f}')
+            series.setdefault("aria_stage_latency_ms_sum", []).append(f"aria_stage_latency_ms_sum{{{labels}}} {h['sum']:.1f}")
+            series.setdefault("aria_stage_latency_ms_count", []).append(f"aria_stage_latency_ms_count{{{labels}}} {h['count']}")
+        for source, values in sorted(snap["stats"].items()):
+            for key, value in values.items():
+                name = f"aria_{source}_{key}"
+                series.setdefault(name, []).append(f'{name}{{process="{process}"}} {value:g}')
+    out = [
+        "# HELP aria_stage_latency_ms Per-turn pipeline and tool latency, per worker process.",
+        "# TYPE aria_stage_latency_ms summary",
+    ]
+    for name in ("aria_stage_latency_ms", "aria_stage_latency_ms_sum", "aria_stage_latency_ms_count"):
+        out.extend(series.pop(name, []))
+    for name in sorted(series):
+        out.extend(series[name])
+    return "\n".join(out) + "\n"
+
+async def _serve_metrics(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        await reader.readuntil(b"\r\n\r\n")
+        body = render_prometheus().encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/plain; version=0.0.4\r\n"
+            b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+            b"Connection: close\r\n\r\n" + body
+        )
+        await writer.drain()
+    except Exception as e:
+        print(f"Metrics Endpoint Error: {e}")
+    finally:
+        writer.close()
+
+class _JobReports(asyncio.DatagramProtocol):
+    def datagram_received(self, data: bytes, addr):
+        try:
+            report = json.loads(data)
+            _job_reports[int(report["pid"])] = (time.monotonic(), report)
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Metrics Report Error: {e}")
+
+async def _run_exporter(reports: socket.socket, http_port: int | None):
+    await asyncio.get_running_loop().create_datagram_endpoint(_JobReports, sock=reports)
+    if http_port is not None:
+        try:
+            await asyncio.start_server(_serve_metrics, os.getenv("METRICS_HOST", "127.0.0.1"), http_port)
+            print(f"Metrics endpoint listening on :{http_port}")
+        except OSError as e:
+            print(f"Metrics endpoint not started: {e}")
+    await asyncio.Event().wait()  # The loop keeps both listeners serving for the life of the worker
+
+_exporter: threading.Thread | None = None
+
+def start_worker_exporter():
+    """Starts collecting job-process reports, plus the /metrics endpoint when
+    METRICS_PORT is set. Call in the main worker process before any job
+    process exists: the report port is handed to them through the environment."""
+    global _exporter
+    if _exporter is not None:
+        return
+    reports = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    reports.bind(("127.0.0.1", 0))  # Ephemeral, so workers sharing a host never mix reports
+    os.environ[REPORT_PORT_ENV] = str(reports.getsockname()[1])
+    port = os.getenv("METRICS_PORT")
+    _exporter = threading.Thread(target=lambda: asyncio.run(_run_exporter(reports, int(port) if port else None)),
+                                 name="aria-metrics", daemon=True)
+    _exporter.start()
+
+_reporter: asyncio.Task | None = None
+
+def ensure_reporter():
+    """Starts this job process's periodic push to the main worker process, once per process."""
+    global _reporter
+    port = os.getenv(REPORT_PORT_ENV)
+    loop = asyncio.get_running_loop()
+    if not port or (_reporter is not None and not _reporter.done() and _reporter.get_loop() is loop):
+        return
+    _reporter = loop.create_task(_report_forever(int(port)))
+
+async def _report_forever(port: int):
+    transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+        asyncio.DatagramProtocol, remote_addr=("127.0.0.1", port))
+    try:
+        while True:
+            transport.sendto(json.dumps(snapshot()).encode())
+            await asyncio.sleep(REPORT_INTERVAL)
+    finally:
+        transport.close()
@@ -0,0 +1,46 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))  # fake_supabase
+
+# db.py refuses to import without credentials; tests never reach the network
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "offline")
+
+# Host-wide caches (cache.HostStore) go to a throwaway file, never the repo's
+os.environ["ARIA_HOST_CACHE"] = os.path.join(tempfile.mkdtemp(prefix="aria-tests-"), "host.sqlite3")
+
+import glob  # noqa: E402
+
+import pytest  # noqa: E402
+
+SCHEMA = """
+create extension if not exists pgcrypto;
+create table if not exists public.appointments (
+    id uuid primary key default gen_random_uuid(),
+    user_name text,
+    contact_number text,
+    appointment_slot timestamptz not null,
+    status text default 'booked',
+    created_at timestamptz default now()
+);
+"""
+
+
+@pytest.fixture(scope="session")
+def postgres():
+    """DSN of a THROWAWAY local Postgres (ARIA_TEST_DATABASE_URL) with migrations/ applied."""
+    dsn = os.getenv("ARIA_TEST_DATABASE_URL")
+    if not dsn:
+        pytest.skip("ARIA_TEST_DATABASE_URL not set")
+    psycopg = pytest.importorskip("psycopg")
+    with psycopg.connect(dsn) as conn:
+        with conn.cursor() as cur:
+            cur.execute(SCHEMA)
+            for path in sorted(glob.glob(os.path.join(ROOT, "migrations", "*.sql"))):
+                cur.execute(open(path).read())
+        conn.commit()
+    return dsn
@@ -0,0 +1,56 @@
+import asyncio
+import os
+import subprocess
+import sys
+import textwrap
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("supabase")
+
+import availability  # noqa: E402
+import db  # noqa: E402
+from fake_supabase import FakeAsyncClient  # noqa: E402
+
+START = datetime(2026, 3, 2, tzinfo=timezone.utc)
+DAY = "2026-03-03"
+
+# One caller's job process asks about a day; it then exits, like every LiveKit job.
+FIRST_CALL = textwrap.dedent(f"""
+    import asyncio
+    from datetime import datetime, timezone
+    import availability, db
+    from fake_supabase import FakeAsyncClient
+
+    client = FakeAsyncClient(latency=lambda op: 0)
+    client.seed(200, 20, days=7, start=datetime(2026, 3, 2, tzinfo=timezone.utc))
+    db.use_client(client)
+    asyncio.run(availability.day_bookings({DAY!r}))
+""")
+
+
+def test_popular_day_is_shared_with_the_next_callers_process():
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    subprocess.run([sys.executable, "-c", FIRST_CALL], env=env, check=True, timeout=30)
+
+    client = FakeAsyncClient(latency=lambda op: 0)
+    client.seed(200, 20, days=7, start=START)
+    db.use_client(client)
+    availability._days._data.clear()  # This process has never seen the day
+    bookings = asyncio.run(availability.day_bookings(DAY))
+    assert client.stats["round_trips"] == 0
+    assert len(bookings) == sum(1 for slot, _ in client.appointments.by_slot if slot.startswith(DAY))
+
+def test_write_through_reaches_the_host_tier():
+    client = FakeAsyncClient(latency=lambda op: 0)
+    db.use_client(client)
+    availability._days.clear()
+    asyncio.run(availability.day_bookings("2026-04-01"))
+    availability.record_booking("new-id", datetime(2026, 4, 1, 10, 0, tzinfo=timezone.utc))
+
+    availability._days._data.clear()  # Another process: only the host tier knows the booking
+    assert "new-id" in availability.cached_day("2026-04-01").by_id
+    availability.forget("new-id")
+    availability._days._data.clear()
+    assert "new-id" not in availability.cached_day("2026-04-01").by_id
@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+from cache import HostStore, TTLCache
+
+# Each TTLCache over the same HostStore file stands in for one job process.
+
+
+def pair(tmp_path, ttl: float = 30):
+    path = str(tmp_path / "host.sqlite3")
+    return (TTLCache(16, ttl, shared=HostStore(path, "test")),
+            TTLCache(16, ttl, shared=HostStore(path, "test")))
+
+def test_entry_written_by_one_process_is_a_hit_in_the_next(tmp_path):
+    first, second = pair(tmp_path)
+    first.set("5550123456", {"user_name": "Ada"})
+    assert second.get("5550123456") == {"user_name": "Ada"}
+    assert second.stats()["hits"] == second.stats()["shared_hits"] == 1
+
+def test_host_entries_expire_with_the_writers_ttl(tmp_path):
+    first, second = pair(tmp_path, ttl=0.05)
+    first.set("day", [1, 2])
+    time.sleep(0.1)
+    assert second.get("day") is None
+
+def test_update_and_pop_reach_other_processes(tmp_path):
+    first, second = pair(tmp_path)
+    first.set("day", {"a": 1})
+    first.update("day", {"a": 1, "b": 2})
+    assert second.peek("day") == {"a": 1, "b": 2}
+    first.pop("day")
+    second.clear()  # Drop its in-process copy; only the host tier can answer now
+    assert TTLCache(16, 30, shared=HostStore(str(tmp_path / "host.sqlite3"), "test")).get("day") is None
+
+def test_namespaces_do_not_mix(tmp_path):
+    path = str(tmp_path / "host.sqlite3")
+    TTLCache(16, 30, shared=HostStore(path, "identity")).set("k", 1)
+    assert TTLCache(16, 30, shared=HostStore(path, "availability")).get("k") is None
+
+def test_unusable_store_degrades_to_a_miss(tmp_path):
+    (tmp_path / "host.sqlite3").write_bytes(b"not a database" * 100)
+    cache = TTLCache(16, 30, shared=HostStore(str(tmp_path / "host.sqlite3"), "test"))
+    cache.set("k", 1)  # Logged, not raised
+    assert cache.get("k") == 1  # The in-process tier still works
+
+def test_entry_survives_the_writing_process(tmp_path):
+    path = str(tmp_path / "host.sqlite3")
+    child = textwrap.dedent(f"""
+        from cache import HostStore, TTLCache
+        TTLCache(16, 30, shared=HostStore({path!r}, "test")).set("day", {{"id": 600}})
+    """)
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    subprocess.run([sys.executable, "-c", child], env=env, check=True, timeout=30)
+    assert TTLCache(16, 30, shared=HostStore(path, "test")).get("day") == {"id": 600}
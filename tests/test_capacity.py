@@ -0,0 +1,62 @@
+import asyncio
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+pytest.importorskip("livekit")
+
+import capacity  # noqa: E402
+import telemetry  # noqa: E402
+
+# Stands in for a LiveKit job process: blocks its own loop, as a session
+# burning CPU would, and reports through the real telemetry path.
+JOB = textwrap.dedent("""
+    import asyncio, time
+    import capacity, telemetry
+
+    async def main():
+        capacity.LAG_MONITOR.start()
+        for _ in range(10):
+            await asyncio.sleep(0)
+            time.sleep(0.08)  # Blocks the job's loop for 80ms at a time
+        telemetry.ensure_reporter()
+        await asyncio.sleep(0.3)
+
+    asyncio.run(main())
+""")
+
+
+class FakeWorker:
+    active_jobs = ()
+
+
+def test_monitor_sees_a_blocked_loop():
+    monitor = capacity.LoopLagMonitor(interval=0.01)
+
+    async def scenario():
+        monitor.start()
+        for _ in range(10):
+            await asyncio.sleep(0.02)
+            time.sleep(0.05)
+
+    asyncio.run(scenario())
+    assert monitor.p95() >= 30
+
+def test_load_follows_lag_reported_by_a_job_process():
+    telemetry.start_worker_exporter()
+    # os.environ now carries the report port, as it would for a spawned job process
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    subprocess.run([sys.executable, "-c", JOB], env=env, check=True, timeout=30)
+
+    calc = capacity.LoadCalculator(max_sessions=20, cpu_ceiling=100.0, lag_ceiling_ms=40)
+    deadline = time.monotonic() + 5
+    while capacity.job_loop_lag_ms() == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    load = calc(FakeWorker())
+    assert calc.last["loop_lag_ms"] >= 40
+    assert calc.last["limited_by"] == "loop_lag"
+    assert load >= calc.threshold
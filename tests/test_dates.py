@@ -0,0 +1,121 @@
+import random
+import string
+from datetime import date, time, timedelta
+
+import pytest
+
+import dates
+
+# Randomized property checks: each seed draws a fresh "today" and inputs, and
+# the assertions hold for all of them rather than for a few fixed examples.
+
+SEEDS = range(60)
+HOUR_WORDS = {v: k for k, v in dates._HOUR_WORDS.items()}
+
+
+def random_day(rng: random.Random) -> date:
+    return date(2020, 1, 1) + timedelta(days=rng.randrange(0, 20 * 366))
+
+def twelve_hour(hour: int) -> tuple[int, str]:
+    return (hour % 12 or 12), ("am" if hour < 12 else "pm")
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_iso_dates_round_trip(seed):
+    rng = random.Random(seed)
+    day, today = random_day(rng), random_day(rng)
+    assert dates.parse_date(day.isoformat(), today) == day
+    assert dates.parse_date(f"{day.isoformat()}T{rng.randrange(24):02d}:00:00Z", today) == day
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_weekdays_land_within_the_coming_week(seed):
+    rng = random.Random(seed)
+    today = random_day(rng)
+    weekday = rng.randrange(7)
+    which = rng.choice(["", "this ", "next ", "coming "])
+    got = dates.parse_date(f"{which}{dates._WEEKDAYS[weekday]}", today)
+    assert got.weekday() == weekday
+    assert today <= got <= today + timedelta(days=7)
+    if which == "next ":
+        assert got != today
+    else:
+        assert got < today + timedelta(days=7)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_month_and_day_is_the_next_such_date(seed):
+    rng = random.Random(seed)
+    today = random_day(rng)
+    target = today + timedelta(days=rng.randrange(0, 366))
+    month = dates._MONTHS[target.month - 1]
+    spoken = rng.choice([f"{month} {target.day}", f"{month} the {target.day}th",
+                         f"the {target.day} of {month}", f"{month[:3]} {target.day}"])
+    got = dates.parse_date(spoken, today)
+    assert (got.month, got.day) == (target.month, target.day)
+    assert today <= got <= target
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_relative_days(seed):
+    rng = random.Random(seed)
+    today = random_day(rng)
+    assert dates.parse_date("today", today) == today
+    assert dates.parse_date("Tomorrow", today) == today + timedelta(days=1)
+    assert dates.parse_date("the day after tomorrow", today) == today + timedelta(days=2)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_clock_times_round_trip(seed):
+    rng = random.Random(seed)
+    hour, minute = rng.randrange(24), rng.randrange(60)
+    want = time(hour, minute)
+    h12, ampm = twelve_hour(hour)
+    assert dates.parse_time(f"{hour:02d}:{minute:02d}") == want
+    assert dates.parse_time(f"{hour:02d}:{minute:02d}:00") == want
+    assert dates.parse_time(f"T{hour:02d}:{minute:02d}:00Z") == want
+    assert dates.parse_time(f"{hour:02d}:{minute:02d}+00:00") == want
+    assert dates.parse_time(f"{h12}:{minute:02d} {ampm.upper()}") == want
+    assert dates.parse_time(f"at {h12}:{minute:02d}{ampm[0]}.m.") == want
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_spoken_quarter_and_half_hours(seed):
+    rng = random.Random(seed)
+    hour = rng.randrange(24)
+    h12, ampm = twelve_hour(hour)
+    word = HOUR_WORDS[h12]
+    on_the_hour = dates.parse_time(f"{word} {ampm}")
+    assert on_the_hour == time(hour, 0)
+    assert dates.parse_time(f"half past {word} {ampm}") == time(hour, 30)
+    assert dates.parse_time(f"quarter past {word} {ampm}") == time(hour, 15)
+    before = (hour * 60 - 15) % (24 * 60)
+    assert dates.parse_time(f"quarter to {word} {ampm}") == time(*divmod(before, 60))
+    # Without am/pm, "quarter to X" is 15 minutes before whatever bare "X" means
+    bare = dates.parse_time(word)
+    to_bare = dates.parse_time(f"quarter to {word}")
+    assert to_bare == time(*divmod((bare.hour * 60 - 15) % (24 * 60), 60))
+
+@pytest.mark.parametrize("text, want", [
+    ("quarter to one", time(12, 45)),
+    ("quarter to one pm", time(12, 45)),
+    ("quarter to one am", time(0, 45)),
+    ("quarter to eight", time(7, 45)),
+    ("half past three", time(15, 30)),
+    ("noon", time(12, 0)),
+])
+def test_spoken_examples(text, want):
+    assert dates.parse_time(text) == want
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_non_utc_offsets_are_refused(seed):
+    rng = random.Random(seed)
+    offset = rng.choice([h for h in range(-12, 15) if h]) * 60 + rng.choice([0, 30])
+    sign = "+" if offset > 0 else "-"
+    suffix = f"{sign}{abs(offset) // 60:02d}:{abs(offset) % 60:02d}"
+    assert dates.parse_time(f"{rng.randrange(24):02d}:{rng.randrange(60):02d}{suffix}") is None
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_garbage_never_raises(seed):
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + " :+-.'"
+    text = "".join(rng.choice(alphabet) for _ in range(rng.randrange(0, 24)))
+    got_time = dates.parse_time(text)
+    got_date = dates.parse_date(text, random_day(rng))
+    assert got_time is None or isinstance(got_time, time)
+    assert got_date is None or isinstance(got_date, date)
@@ -0,0 +1,59 @@
+import asyncio
+import contextvars
+import time
+
+import pytest
+
+pytest.importorskip("supabase")
+
+import db  # noqa: E402
+import resilience  # noqa: E402
+from fake_supabase import FakeAsyncClient  # noqa: E402
+
+# Round-trip time for the request being issued; each session sets its own
+ROUND_TRIP = contextvars.ContextVar("round_trip", default=0.02)
+
+
+def test_slow_query_does_not_stall_other_sessions(monkeypatch):
+    """One caller's 1s query must not hold up another caller's query or the
+    20ms audio-frame cadence every session on the worker depends on."""
+    monkeypatch.setattr(resilience, "HEDGE_ENABLED", False)
+    monkeypatch.setattr(resilience, "BREAKER", resilience.CircuitBreaker(5, 10))
+    client = FakeAsyncClient(latency=lambda op: ROUND_TRIP.get())
+    numbers = client.seed(50, 10)
+    db.use_client(client)
+
+    async def slow_session():
+        ROUND_TRIP.set(1.0)
+        return await db.find_user(numbers[0])
+
+    async def fast_session():
+        await asyncio.sleep(0.05)  # Starts while the slow query is in flight
+        started = time.perf_counter()
+        await db.list_appointments(numbers[1])
+        return time.perf_counter() - started
+
+    async def audio_frames(stop: asyncio.Event):
+        worst, last = 0.0, time.perf_counter()
+        while not stop.is_set():
+            await asyncio.sleep(0.02)
+            now = time.perf_counter()
+            worst, last = max(worst, now - last), now
+        return worst
+
+    async def scenario():
+        stop = asyncio.Event()
+        frames = asyncio.create_task(audio_frames(stop))
+        slow = asyncio.create_task(slow_session())
+        fast_elapsed = await fast_session()
+        assert not slow.done()  # The slow query really overlapped
+        await slow
+        stop.set()
+        return fast_elapsed, await frames
+
+    try:
+        fast_elapsed, worst_gap = asyncio.run(scenario())
+    finally:
+        db.use_client(None)
+    assert fast_elapsed < 0.3
+    assert worst_gap < 0.1
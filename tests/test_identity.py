@@ -0,0 +1,60 @@
+import asyncio
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+pytest.importorskip("supabase")
+
+import db  # noqa: E402
+import identity  # noqa: E402
+from fake_supabase import FakeAsyncClient  # noqa: E402
+
+# The first call identifies the caller (or learns the number is unknown) in
+# its own job process, which then exits like every LiveKit job.
+FIRST_CALL = textwrap.dedent("""
+    import asyncio
+    import db, identity
+    from fake_supabase import FakeAsyncClient
+
+    client = FakeAsyncClient(latency=lambda op: 0)
+    known = client.seed(20, 4)[0]
+    db.use_client(client)
+
+    async def main():
+        await identity.lookup(known)
+        await identity.lookup("5559990000")
+
+    asyncio.run(main())
+    print(known)
+""")
+
+
+def test_redial_in_a_new_process_skips_the_db():
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    known = subprocess.run([sys.executable, "-c", FIRST_CALL], env=env, check=True, timeout=30,
+                           capture_output=True, text=True).stdout.split()[-1]
+
+    client = FakeAsyncClient(latency=lambda op: 0)
+    client.seed(20, 4)
+    db.use_client(client)
+
+    async def redial():
+        return await identity.lookup(known), await identity.lookup("555-999-0000")
+
+    user, stranger = asyncio.run(redial())
+    assert user is not None and stranger is None
+    assert client.stats["round_trips"] == 0
+    assert identity.stats()["shared_hits"] == 2
+
+def test_booking_clears_the_shared_negative_entry():
+    client = FakeAsyncClient(latency=lambda op: 0)
+    db.use_client(client)
+    asyncio.run(identity.lookup("5558880000"))
+    identity.record_booking("5558880000", "Grace")
+
+    identity._known._data.clear()  # A later call's process: only the host tier remains
+    identity._unknown._data.clear()
+    assert asyncio.run(identity.lookup("5558880000")) == {"user_name": "Grace"}
@@ -0,0 +1,38 @@
+import pytest
+
+from phone_capture import extract_phone_number
+
+
+@pytest.mark.parametrize("transcript, expected", [
+    ("my number is 555 012 3456", "5550123456"),
+    ("five five five, oh one two, three four five six", "5550123456"),
+    ("oh, it's triple five oh one two thirty four fifty six", "5550123456"),
+    ("one 555 012 3456", "5550123456"),
+    ("555 uh 012 um 3456", "5550123456"),
+    ("555 0123 455 no sorry 555 0123 456", "5550123456"),
+])
+def test_extracts_spoken_and_written_numbers(transcript, expected):
+    assert extract_phone_number(transcript) == expected
+
+
+@pytest.mark.parametrize("transcript", [
+    "5550123456 and 2",
+    "it's 5550123456 and option 2 please",
+    "five five five oh one two three four five six and two",
+])
+def test_and_does_not_extend_the_number(transcript):
+    assert extract_phone_number(transcript) == "5550123456"
+
+
+@pytest.mark.parametrize("transcript", [
+    "555 123 4567, 2 pm",
+    "it's 555 123 4567. 2 pm works",
+    "five five five one two three four five six seven, two pm",
+    "1 555 123 4567; 2 pm",
+])
+def test_punctuation_ends_the_number(transcript):
+    assert extract_phone_number(transcript) == "5551234567"
+
+
+def test_digit_groups_joined_by_and_are_separate_numbers():
+    assert extract_phone_number("555 and 0123456") is None
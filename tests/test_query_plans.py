@@ -0,0 +1,79 @@
+import json
+import os
+
+import pytest
+
+# EXPLAINs the SQL PostgREST generates for each query in db.py, plus the window
+# scan inside the reservation RPCs, against the 0003 indexes: none may read
+# appointments with a sequential scan. Runs against ARIA_TEST_DATABASE_URL
+# (see conftest.postgres), topped up once to ARIA_TEST_PLAN_ROWS rows.
+
+ROWS = int(os.getenv("ARIA_TEST_PLAN_ROWS", "1000000"))
+
+SEED = """
+insert into public.appointments (user_name, contact_number, appointment_slot, status)
+select 'Caller ' || g,
+       lpad((5550000000 + (random() * %(contacts)s)::bigint)::text, 10, '0'),
+       date_trunc('hour', now()) - interval '330 days'
+           + make_interval(mins => 30 * (random() * 365 * 48)::int),
+       'booked'
+  from generate_series(1, %(missing)s) as g;
+"""
+
+# The statements PostgREST builds for db.py, with representative parameters.
+QUERIES = {
+    "find_user": """
+        select user_name from public.appointments
+         where contact_number = '5550000042' limit 1""",
+    "list_appointments": """
+        select id, appointment_slot from public.appointments
+         where contact_number = '5550000042'
+         order by appointment_slot desc limit 5""",
+    "taken_slots_between (day)": """
+        select id, appointment_slot from public.appointments
+         where appointment_slot >= date_trunc('day', now()) + interval '2 days'
+           and appointment_slot <= date_trunc('day', now()) + interval '2 days 23:59:59'""",
+    "taken_slots_between (week)": """
+        select id, appointment_slot from public.appointments
+         where appointment_slot >= date_trunc('day', now()) + interval '1 day'
+           and appointment_slot <= date_trunc('day', now()) + interval '7 days 23:59:59'""",
+    "reserve/move window scan": """
+        select count(*), (array_agg(appointment_slot order by abs(extract(epoch from appointment_slot - now()))))[1]
+          from public.appointments
+         where id <> '00000000-0000-0000-0000-000000000000'
+           and appointment_slot between now() - interval '29 minutes' and now() + interval '29 minutes'""",
+    "delete_appointment": """
+        delete from public.appointments where id = '00000000-0000-0000-0000-000000000000'""",
+}
+
+
+def seq_scans(plan: dict) -> list[str]:
+    """Returns the relations a plan (or any child) reads with a sequential scan."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name", "?"))
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+@pytest.fixture(scope="module")
+def seeded(postgres):
+    psycopg = pytest.importorskip("psycopg")
+    with psycopg.connect(postgres) as conn:
+        with conn.cursor() as cur:
+            cur.execute("select count(*) from public.appointments")
+            missing = ROWS - cur.fetchone()[0]
+            if missing > 0:
+                cur.execute(SEED, {"missing": missing, "contacts": max(ROWS // 5, 1)})
+            cur.execute("analyze public.appointments")
+        conn.commit()
+        yield conn
+
+@pytest.mark.parametrize("name", list(QUERIES))
+def test_query_is_index_backed(seeded, name):
+    with seeded.cursor() as cur:
+        # EXPLAIN without ANALYZE never executes the statement, so the delete is safe
+        cur.execute("explain (format json) " + QUERIES[name])
+        plan = cur.fetchone()[0]
+    plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+    assert "appointments" not in seq_scans(plan), f"{name}: {json.dumps(plan, indent=1)}"
@@ -0,0 +1,94 @@
+import asyncio
+import random
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("supabase")
+
+import db  # noqa: E402
+import resilience  # noqa: E402
+from fake_supabase import FakeAsyncClient, canon_slot  # noqa: E402
+
+CALLERS = 25
+SLOT = datetime.now(timezone.utc).replace(hour=15, minute=0, second=0, microsecond=0) + timedelta(days=3)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(resilience, "BREAKER", resilience.CircuitBreaker(5, 10))
+    rng = random.Random(4)
+    fake = FakeAsyncClient(latency=lambda op: rng.uniform(0.005, 0.030))
+    db.use_client(fake)
+    yield fake
+    db.use_client(None)
+
+def _iso(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:00Z")
+
+def _race(coros) -> list[dict]:
+    async def run():
+        return await asyncio.gather(*coros)
+    return asyncio.run(run())
+
+def test_simultaneous_bookings_of_one_slot_have_one_winner(client):
+    results = _race(db.reserve_appointment(f"Caller {i}", f"555000{i:04d}", _iso(SLOT))
+                    for i in range(CALLERS))
+    winners = [r for r in results if r["ok"]]
+    assert len(winners) == 1
+    assert all(r["conflict_slot"] == canon_slot(SLOT) for r in results if not r["ok"])
+    assert len(client.appointments.rows) == 1
+
+def test_bookings_inside_the_window_conflict(client):
+    # 10 minutes apart: inside the ±29 minute window, so still one winner
+    slots = [SLOT + timedelta(minutes=10 * (i % 3)) for i in range(CALLERS)]
+    results = _race(db.reserve_appointment(f"Caller {i}", "5550000001", _iso(slot))
+                    for i, slot in enumerate(slots))
+    assert sum(r["ok"] for r in results) == 1
+
+def test_capacity_admits_exactly_that_many(client):
+    results = _race(db.reserve_appointment(f"Caller {i}", "5550000001", _iso(SLOT), capacity=2)
+                    for i in range(CALLERS))
+    assert sum(r["ok"] for r in results) == 2
+
+def test_simultaneous_moves_into_one_slot_have_one_winner(client):
+    start = SLOT + timedelta(days=1)
+    ids = [_race([db.reserve_appointment(f"Caller {i}", "5550000001", _iso(start + timedelta(hours=i)))])[0]["id"]
+           for i in range(5)]
+    results = _race(db.move_appointment(appointment_id, _iso(SLOT)) for appointment_id in ids)
+    assert sum(r["ok"] for r in results) == 1
+
+
+# --- AGAINST POSTGRES ---
+# The same race against the real functions in migrations/, with one connection
+# per caller. Point ARIA_TEST_DATABASE_URL at a THROWAWAY local database.
+
+def test_simultaneous_bookings_on_postgres(postgres):
+    dsn = postgres
+    psycopg = pytest.importorskip("psycopg")
+    # A slot no earlier run can have used
+    slot = datetime(2090, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=30 * random.randrange(10 ** 6))
+    contact = f"test-{uuid.uuid4()}"
+    barrier = threading.Barrier(CALLERS)
+    results = []
+
+    def caller(i: int):
+        with psycopg.connect(dsn, autocommit=True) as conn:
+            barrier.wait()
+            row = conn.execute("select public.reserve_appointment(%s, %s, %s, 29, 1, %s)",
+                               (f"Caller {i}", contact, slot, uuid.uuid4())).fetchone()
+            results.append(row[0])
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    try:
+        assert len(results) == CALLERS
+        assert sum(bool(r["ok"]) for r in results) == 1
+    finally:
+        with psycopg.connect(dsn, autocommit=True) as conn:
+            conn.execute("delete from public.appointments where contact_number = %s", (contact,))
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+import resilience
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def half_open(monkeypatch):
+    """A breaker that has just cooled down, with one probe to give out."""
+    clock = Clock()
+    breaker = resilience.CircuitBreaker(failures=1, cooldown=10, clock=clock)
+    breaker.failure()
+    clock.now = 11
+    assert breaker.state == "half_open"
+    monkeypatch.setattr(resilience, "BREAKER", breaker)
+    monkeypatch.setattr(resilience, "HEDGE_ENABLED", False)
+    return breaker
+
+async def hang():
+    await asyncio.Event().wait()
+
+async def ok():
+    return "ok"
+
+async def cancel_mid_query(call):
+    started = asyncio.Event()
+
+    async def run():
+        started.set()
+        return await hang()
+
+    task = asyncio.ensure_future(call(run))
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+@pytest.mark.parametrize("call", [resilience.read, resilience.write])
+def test_cancelled_probe_lets_the_next_call_probe(half_open, call):
+    async def scenario():
+        await cancel_mid_query(call)
+        assert not half_open.probing
+        assert half_open.state == "half_open"
+        assert await call(ok) == "ok"  # The next query probes, succeeds and closes the circuit
+        assert half_open.state == "closed"
+
+    asyncio.run(scenario())
+
+def test_probe_is_not_taken_when_the_budget_is_gone(half_open, monkeypatch):
+    monkeypatch.setattr(resilience, "remaining", lambda: 0.0)
+    with pytest.raises(resilience.DBUnavailable):
+        asyncio.run(resilience.read(ok))
+    assert not half_open.probing
+
+def test_failed_probe_reopens(half_open):
+    async def broken():
+        raise RuntimeError("down")
+
+    with pytest.raises(resilience.DBUnavailable):
+        asyncio.run(resilience.read(broken))
+    assert half_open.state == "open"
+    assert not half_open.probing
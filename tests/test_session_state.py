@@ -0,0 +1,25 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("livekit")
+
+from session_state import SessionState  # noqa: E402
+
+
+def test_approx_size_counts_owned_state_and_clear_releases_it():
+    async def scenario():
+        state = SessionState("room-1")
+        idle = state.approx_size()
+        for i in range(200):
+            state.latency.observe("llm_ttft", float(i))
+        state.remember_appointments([f"{i:036d}" for i in range(5)])
+        state.spawn(asyncio.sleep(10))
+        busy = state.approx_size()
+        state.clear()
+        await asyncio.sleep(0)
+        return idle, busy, state
+
+    idle, busy, state = asyncio.run(scenario())
+    assert busy > idle + 200 * 8  # The histogram samples are counted, not just the map
+    assert not state.tasks and not state.id_map
@@ -0,0 +1,49 @@
+import random
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from slots import BookingIndex, SlotCalendar, _hhmm, from_minute, to_minute
+
+START, END = date(2026, 3, 2), date(2026, 3, 15)
+
+
+def brute_nearest(calendar, index, target, count, earliest=None, latest=None, not_before=None):
+    """Every candidate start in the range, sorted by distance (later wins ties)."""
+    starts = calendar._starts_between(START, END, _hhmm(earliest) if earliest else None,
+                                      _hhmm(latest) if latest else None)
+    floor = to_minute(not_before) if not_before else None
+    pivot = to_minute(target)
+    free = [m for m in starts if (floor is None or m >= floor) and calendar.is_free(index, m)]
+    free.sort(key=lambda m: (abs(m - pivot), m < pivot))
+    return [from_minute(m) for m in free[:count]]
+
+@pytest.mark.parametrize("seed", range(40))
+def test_nearest_free_matches_a_full_scan(seed):
+    rng = random.Random(seed)
+    calendar = SlotCalendar(open_time=rng.choice(["08:00", "09:00", "09:15"]),
+                            close_time=rng.choice(["17:00", "17:30", "18:45"]),
+                            slot_minutes=rng.choice([15, 30, 45]),
+                            step_minutes=rng.choice([None, 15, 20]),
+                            resources=rng.choice([1, 2]))
+    base = to_minute(datetime(2026, 3, 1, tzinfo=timezone.utc))
+    index = BookingIndex({f"b{i}": base + rng.randrange(0, 17 * 1440, 15) for i in range(rng.randrange(0, 300))})
+    target = from_minute(base + rng.randrange(-1440, 18 * 1440))
+    band = rng.choice([(None, None), ("10:00", None), (None, "12:00"), ("13:10", "15:50")])
+    not_before = rng.choice([None, from_minute(base + rng.randrange(0, 15 * 1440))])
+    count = rng.randrange(1, 12)
+
+    got = calendar.nearest_free(index, target, START, END, count, *band, not_before=not_before)
+    want = brute_nearest(calendar, index, target, count, *band, not_before=not_before)
+    assert got == want
+
+def test_nearest_free_cost_does_not_grow_with_the_range():
+    calendar = SlotCalendar()
+    index = BookingIndex()
+    target = datetime(2026, 3, 9, 14, 0, tzinfo=timezone.utc)
+    checks = []
+    original = calendar.is_free
+    calendar.is_free = lambda *args, **kwargs: checks.append(1) or original(*args, **kwargs)
+    found = calendar.nearest_free(index, target, START, START + timedelta(days=3650), 3)
+    assert [slot.strftime("%H:%M") for slot in found] == ["14:00", "14:30", "13:30"]
+    assert len(checks) == 3
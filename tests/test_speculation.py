@@ -0,0 +1,59 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+pytest.importorskip("supabase")
+
+import availability  # noqa: E402
+import db  # noqa: E402
+import speculation  # noqa: E402
+from fake_supabase import FakeAsyncClient  # noqa: E402
+from session_state import SessionState  # noqa: E402
+
+TODAY = date(2026, 3, 2)  # A Monday
+
+
+@pytest.fixture
+def speculator(monkeypatch):
+    monkeypatch.setattr(speculation, "SPECULATION_TOTALS", dict.fromkeys(speculation.SPECULATION_TOTALS, 0))
+    monkeypatch.setattr(speculation, "SPECULATION_ENABLED", True)
+    db.use_client(FakeAsyncClient(latency=lambda op: 0.05))
+    availability._days.clear()
+    yield speculation.SlotSpeculator(SessionState(room_name="test"))
+    db.use_client(None)
+
+def test_speculated_day_is_a_hit(speculator):
+    async def scenario():
+        speculator.observe("anything tomorrow", is_final=True, today=TODAY)
+        assert await speculator.take("2026-03-03") is not None
+
+    asyncio.run(scenario())
+    assert speculation.stats()["hits"] == 1
+    assert speculation.stats()["misses"] == 0
+
+def test_day_nobody_mentioned_is_unspeculated_not_a_miss(speculator):
+    assert asyncio.run(speculator.take("2026-03-04")) is None
+    assert speculation.stats()["unspeculated"] == 1
+    assert speculation.stats()["misses"] == 0
+
+def test_cancelled_day_is_a_miss(speculator):
+    async def scenario():
+        speculator.observe("anything tomorrow", is_final=False, today=TODAY)
+        speculator.observe("no, Thursday", is_final=True, today=TODAY)
+        return await speculator.take("2026-03-03")
+
+    assert asyncio.run(scenario()) is None
+    assert speculation.stats()["cancelled"] == 1
+    assert speculation.stats()["misses"] == 1
+    assert speculation.stats()["unspeculated"] == 0
+
+def test_stale_day_is_a_miss(speculator):
+    async def scenario():
+        speculator.observe("anything tomorrow", is_final=True, today=TODAY)
+        await asyncio.sleep(0.1)
+        availability._days.pop("2026-03-03")  # Invalidated before fetch_slots read it
+        return await speculator.take("2026-03-03")
+
+    assert asyncio.run(scenario()) is None
+    assert speculation.stats()["misses"] == 1
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("livekit")
+pytest.importorskip("supabase")
+
+import availability  # noqa: E402
+import db  # noqa: E402
+import resilience  # noqa: E402
+import tools  # noqa: E402
+from fake_supabase import FakeAsyncClient  # noqa: E402
+from loadtest import FakeRoom  # noqa: E402
+from session_state import SessionState  # noqa: E402
+from ui_channel import UIChannel  # noqa: E402
+
+
+class Context:
+    def __init__(self):
+        self.userdata = SessionState(room_name="test")
+        self.userdata.ui = UIChannel(FakeRoom("test"), self.userdata, window_ms=0)
+        self.session = None
+
+
+def test_reliability_counts_errors_and_fallbacks(monkeypatch):
+    client = FakeAsyncClient(latency=lambda op: 0)
+    number = client.seed(10, 2)[0]
+    db.use_client(client)
+    monkeypatch.setattr(resilience, "BREAKER", resilience.CircuitBreaker(5, 10))
+    ctx = Context()
+
+    async def broken_day(date):
+        raise RuntimeError("index corrupted")
+
+    async def unavailable(contact_number):
+        raise resilience.DBUnavailable("stalled")
+
+    async def calls():
+        await tools.identify_user(ctx, phone_number=number)
+        with monkeypatch.context() as m:
+            m.setattr(availability, "day_bookings", broken_day)
+            assert (await tools.fetch_slots(ctx, date="2026-03-03")).startswith("Error checking slots")
+        with monkeypatch.context() as m:
+            m.setattr(tools.identity, "lookup", unavailable)
+            assert await tools.identify_user(ctx, phone_number="5551234567") == resilience.FALLBACK_LINE
+        await tools.fetch_slots(ctx, date="2026-03-03")
+
+    asyncio.run(calls())
+    assert (ctx.userdata.tool_calls, ctx.userdata.tool_failures) == (4, 2)
+    assert "• Reliability: 50% (2/4 tool calls succeeded)" in tools.calculate_session_metrics(ctx.userdata)
+
+def test_reliability_without_tool_calls():
+    assert "• Reliability: no tool calls" in tools.calculate_session_metrics(SessionState())
+
+def test_tools_send_status_lines_and_the_summary_counts_them(monkeypatch):
+    client = FakeAsyncClient(latency=lambda op: 0)
+    number = client.seed(10, 2)[0]
+    db.use_client(client)
+    monkeypatch.setattr(resilience, "BREAKER", resilience.CircuitBreaker(5, 10))
+    ctx = Context()
+    events = []
+    monkeypatch.setattr(ctx.userdata.ui, "emit", lambda kind, **fields: events.append((kind, fields)))
+
+    async def calls():
+        await tools.identify_user(ctx, phone_number=number)
+        await tools.fetch_slots(ctx, date="2026-03-03")
+
+    asyncio.run(calls())
+    statuses = [fields for kind, fields in events if kind == "status"]
+    assert [(s["tool"], s["text"], s["actions"]) for s in statuses] == [
+        ("identify_user", "Verifying identity...", 1), ("fetch_slots", "Finding available slots...", 2)]
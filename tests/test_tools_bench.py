@@ -0,0 +1,23 @@
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("livekit")
+pytest.importorskip("supabase")
+
+import availability  # noqa: E402
+import identity  # noqa: E402
+import tools_bench  # noqa: E402
+
+# Wall time is compared loosely here (shared CI machines are noisy); round
+# trips and bytes are exact. The CLI defaults to the stricter 1.5x.
+TOLERANCE = float(os.getenv("ARIA_BENCH_TOLERANCE", "3.0"))
+
+
+def test_tools_stay_within_the_baseline(monkeypatch):
+    # Same calls as the CLI run that recorded the baseline, which keeps caches per process
+    for cache in (availability._days, identity._known, identity._unknown):
+        monkeypatch.setattr(cache, "shared", None)
+    report = asyncio.run(tools_bench.bench_size(10_000, tools_bench.ITERATIONS, tools_bench.SEED))
+    assert tools_bench.regressions({"10000": report}, tools_bench.load_baseline(), TOLERANCE) == []
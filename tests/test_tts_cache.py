@@ -0,0 +1,83 @@
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("livekit")
+
+import costs  # noqa: E402
+from tts_cache import CachedAudio, TTSAudioCache, render  # noqa: E402
+
+VOICE, TEXT = "voice", "Hello! I'm Aria!"
+AUDIO = CachedAudio(24000, 1, b"\x01\x02" * 480)
+
+
+def test_disk_entry_survives_a_new_process(tmp_path):
+    TTSAudioCache(1 << 20, str(tmp_path)).put(VOICE, TEXT, AUDIO)
+    loaded = TTSAudioCache(1 << 20, str(tmp_path)).get(VOICE, TEXT)
+    assert (loaded.sample_rate, loaded.num_channels, loaded.pcm) == (24000, 1, AUDIO.pcm)
+    assert [p.suffix for p in tmp_path.iterdir()] == [".pcm"]  # No temp files left behind
+
+@pytest.mark.parametrize("damage", [
+    lambda blob: blob[:6],  # Shorter than the header
+    lambda blob: blob[:-1],  # Half-written: odd PCM length
+    lambda blob: blob[:-480],  # Half-written: length doesn't match the header
+    lambda blob: b"XXXX" + blob[4:],  # Not a cache file
+])
+def test_damaged_file_is_a_miss(tmp_path, damage):
+    TTSAudioCache(1 << 20, str(tmp_path)).put(VOICE, TEXT, AUDIO)
+    path = next(tmp_path.iterdir())
+    path.write_bytes(damage(path.read_bytes()))
+
+    cache = TTSAudioCache(1 << 20, str(tmp_path))
+    assert cache.get(VOICE, TEXT) is None
+    assert cache.stats()["misses"] == 1
+
+    cache.put(VOICE, TEXT, AUDIO)  # The next render repairs it
+    assert TTSAudioCache(1 << 20, str(tmp_path)).get(VOICE, TEXT).pcm == AUDIO.pcm
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_prewarm_preload_fills_a_fresh_process_from_disk(tmp_path):
+    TTSAudioCache(1 << 20, str(tmp_path)).put(VOICE, TEXT, AUDIO)
+    fresh = TTSAudioCache(1 << 20, str(tmp_path))  # What a new job process starts with
+    assert fresh.preload(VOICE, [TEXT, "never rendered"]) == 1
+    assert fresh.stats()["hits"] == fresh.stats()["misses"] == 0
+    assert fresh.get(VOICE, TEXT).pcm == AUDIO.pcm
+
+
+class FakeTTS:
+    """synthesize() that yields one 10ms frame and counts calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def synthesize(self, text):
+        self.calls += 1
+
+        class Stream:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def __aiter__(self):
+                frame = type("Frame", (), {"data": AUDIO.pcm, "sample_rate": 24000, "num_channels": 1})
+                yield type("Chunk", (), {"frame": frame})
+
+        return Stream()
+
+
+def test_render_charges_the_session_ledger_only_when_it_synthesizes(tmp_path):
+    tts, cache, ledger = FakeTTS(), TTSAudioCache(1 << 20, str(tmp_path)), costs.UsageLedger()
+
+    async def two_calls():
+        costs.current_ledger.set(ledger)
+        await render(tts, TEXT, cache)
+        await render(tts, TEXT, cache)
+
+    asyncio.run(two_calls())
+    assert tts.calls == 1
+    assert ledger.tts_characters == len(TEXT)
+    assert ledger.tts_audio_seconds == pytest.approx(480 / 24000)
@@ -1,17 +1,36 @@
 import os
-import json
-import asyncio
-import time
 from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
-from livekit.agents import llm, RunContext, get_job_context
-from supabase import create_client, Client, AsyncClient
+from livekit.agents import llm, RunContext
+
+import db
+import availability
+import dates
+import identity
+import resilience
+import speculation
+import telemetry
+import tts_cache
+from slots import CALENDAR
+from session_state import SessionState
 
 load_dotenv()
 
+telemetry.STAT_SOURCES["availability_cache"] = availability.stats
+telemetry.STAT_SOURCES["tts_cache"] = tts_cache.AUDIO_CACHE.stats
+telemetry.STAT_SOURCES["identity_cache"] = identity.stats
+telemetry.STAT_SOURCES["slot_speculation"] = speculation.stats
+telemetry.STAT_SOURCES["db"] = resilience.stats
+
+# Spoken by summarize_and_exit from the TTS audio cache on every call.
+EXIT_LINE = "You're welcome. I'll drop off the call in about 3 seconds. Goodbye!"
+
 from datetime import timezone
 
 MIN_LEAD_MINUTES = 15  # you can set 0 if you want
+PREFETCH_DAYS = int(os.getenv("PREFETCH_DAYS", "3"))  # Days of availability warmed after identify_user
+PREFETCH_MAX_AGE = 60  # Seconds a prefetched appointment list stays trustworthy
+MAX_SEARCH_DAYS = 31  # Longest range find_next_available will scan in one query
 
 def _to_utc(dt: datetime) -> datetime:
     """Ensure datetime is timezone-aware UTC."""
@@ -27,146 +46,235 @@ def _is_in_past(requested_dt: datetime) -> bool:
     return requested_utc < min_allowed
 
 
-# --- INITIALIZATION ---
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("Missing Supabase credentials in .env file")
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-supabase_async: AsyncClient = AsyncClient(SUPABASE_URL, SUPABASE_KEY)
-# Global session states
-SESSION_START_TIME = time.time()
-SESSION_ID_MAP = {}  # V2: Maps #1, #2 to UUIDs for voice ease
-
 # --- HELPER FUNCTIONS ---
 
-async def _publish_to_ui(tool_name: str, payload_data: dict):
-    """Sends tool results to the web frontend. Uses V1 format for stability."""
+def _publish_to_ui(state: SessionState, tool_name: str, payload_data: dict):
+    """Queues a tool result for the web frontend on the session's batched UI channel."""
+    state.ui.emit("tool", tool=tool_name, p=payload_data)
+
+async def _quietly(coro):
+    """Awaits a fire-and-forget prefetch, logging instead of raising."""
     try:
-        room = get_job_context().room
-        payload = json.dumps({
-            "type": "tool_call",
-            "tool": tool_name,
-            "payload": payload_data
-        }).encode('utf-8')
-        await room.local_participant.publish_data(payload)
+        return await coro
     except Exception as e:
-        print(f"UI Broadcast Error: {e}")
-
-async def delayed_disconnect(room):
-    await asyncio.sleep(7)
-    await room.disconnect()
-
-def calculate_session_metrics():
-    """V1 formatting with V2 precision."""
-    duration_sec = time.time() - SESSION_START_TIME
-    duration_min = duration_sec / 60
-    
-    stt_cost = duration_min * 0.0043
-    tts_cost = duration_min * 0.02
-    llm_cost = 0.005 
-    total_cost = stt_cost + tts_cost + llm_cost
+        print(f"Prefetch Error: {e}")
+
+def _start_prefetch(state: SessionState, contact_number: str):
+    """Warms the caller's appointments and the next few days of availability
+    while the "User verified" line is still playing."""
+    state.prefetch_appointments(contact_number, db.list_appointments(contact_number, limit=5))
+    today = datetime.now(timezone.utc).date()
+    for offset in range(PREFETCH_DAYS):
+        state.spawn(_quietly(availability.day_bookings((today + timedelta(days=offset)).isoformat())))
+
+def _conflict_reply(result: dict, message: str) -> str:
+    """Turns a reservation conflict into a reply that names the clashing slot."""
+    clash = availability.parse_slot(result["conflict_slot"]).strftime("%I:%M %p")
+    return f"{message} There is already a booking at {clash}. Please pick a different time."
+
+def _tool_error(state: SessionState, reply: str) -> str:
+    """Counts a tool error the caller hears about (see the reliability line)."""
+    state.tool_failures += 1
+    return reply
+
+def _reliability(state: SessionState) -> str:
+    if not state.tool_calls:
+        return "no tool calls"
+    ok = state.tool_calls - state.tool_failures
+    return f"{int(ok / state.tool_calls * 100)}% ({ok}/{state.tool_calls} tool calls succeeded)"
+
+def calculate_session_metrics(state: SessionState):
+    """V1 formatting with V2 precision, timed from this session's own start."""
+    duration_sec = state.duration_sec
+    usage = state.usage
+    cost = usage.costs()
+    cache_stats = availability.stats()
 
     return (
-        f"• Total Cost: ${round(total_cost, 4)}\n"
-        f"• STT Cost: ${round(stt_cost, 4)}\n"
-        f"• TTS Cost: ${round(tts_cost, 4)}\n"
-        f"• LLM Cost: ${round(llm_cost, 4)}\n"
+        f"• Total Cost: ${round(cost['total'], 4)}\n"
+        f"• STT Cost: ${round(cost['stt'], 4)} ({int(usage.stt_audio_seconds)}s audio)\n"
+        f"• TTS Cost: ${round(cost['tts'], 4)} ({usage.tts_characters} chars)\n"
+        f"• LLM Cost: ${round(cost['llm'], 4)} ({usage.prompt_tokens} in / {usage.completion_tokens} out tokens, {usage.llm_turns} turns)\n"
+        f"• System Prompt Share: {int(usage.system_prompt_share() * 100)}% of input tokens\n"
+        f"• DB Calls: {usage.db_calls}\n"
         f"• Duration: {int(duration_sec)}s\n"
         f"• Efficiency: {'High' if duration_sec < 120 else 'Standard'}\n"
-        f"• Reliability: 100%\n"
-        f"• Latency: 150ms"
+        f"• Reliability: {_reliability(state)}\n"
+        f"• Availability Cache: {int(cache_stats['hit_rate'] * 100)}% hits\n"
+        f"• Identity Cache: {int(identity.stats()['hit_rate'] * 100)}% hits\n"
+        f"{telemetry.format_latency_report(state.latency)}"
     )
 
 # --- CORE TOOLS ---
 
-@llm.function_tool
-async def identify_user(ctx: RunContext, phone_number: str):
-    """V1 Logic: Identify a user by their 10-digit phone number."""
+async def identify(state: SessionState, phone_number: str) -> str:
+    """identify_user's work, shared with the transcript fast path in agent.py."""
     clean_number = "".join(filter(str.isdigit, phone_number))
     if len(clean_number) != 10:
         return f"I heard {phone_number}. Please provide a 10-digit phone number."
 
-    result = supabase.table("appointments").select("*").eq("contact_number", clean_number).execute()
-    user_data = result.data[0] if result.data else None
+    # Repeat callers and repeat tool calls are answered from the identity cache
+    user_data = await identity.lookup(clean_number)
+    state.caller_number = clean_number
+    if user_data:
+        _start_prefetch(state, clean_number)
     
-    await _publish_to_ui("identify_user", {"found": bool(user_data), "data": user_data})
+    _publish_to_ui(state, "identify_user", {"found": bool(user_data), "data": user_data})
     
     if user_data:
         return f"User verified: {user_data['user_name']}. Access granted."
     return "No records found. You can proceed as a new guest."
 
 @llm.function_tool
-async def fetch_slots(ctx: RunContext, date: str):
+@telemetry.timed_tool
+@resilience.budgeted
+async def identify_user(ctx: RunContext[SessionState], phone_number: str):
+    """V1 Logic: Identify a user by their 10-digit phone number."""
+    return await identify(ctx.userdata, phone_number)
+
+@llm.function_tool
+@telemetry.timed_tool
+@resilience.budgeted
+async def fetch_slots(ctx: RunContext[SessionState], date: str):
     """V2 Logic: Fetch dynamic availability for a specific date (YYYY-MM-DD)."""
-    all_slots = ["09:00 AM", "10:30 AM", "01:00 PM", "03:30 PM", "05:00 PM"]
     try:
-        day_start, day_end = f"{date}T00:00:00Z", f"{date}T23:59:59Z"
-        result = supabase.table("appointments").select("appointment_slot").gte("appointment_slot", day_start).lte("appointment_slot", day_end).execute()
+        day = dates.parse_date(date)
+        if day is None:
+            return f"I couldn't tell which day '{date}' is. Could you give me the date?"
+        date = day.isoformat()
+
+        # Often already loading since the caller said the day (see speculation.py)
+        speculator = ctx.userdata.speculation
+        bookings = await speculator.take(date) if speculator is not None else None
+        if bookings is None:
+            bookings = await availability.day_bookings(date)
         
-        taken_slots = [datetime.fromisoformat(r['appointment_slot'].replace('Z', '+00:00')).strftime("%I:%M %p") for r in result.data]
-        available_slots = [s for s in all_slots if s not in taken_slots]
+        # Slot grid comes from the configured calendar (SLOT_* env vars)
+        free = CALENDAR.free_slots(bookings, day)
+        available_slots = [slot.strftime("%I:%M %p") for slot in free]
         
-        await _publish_to_ui("fetch_slots", {"available_slots": available_slots})
+        _publish_to_ui(ctx.userdata, "fetch_slots", {"available_slots": available_slots})
         return f"For {date}, available times are: {', '.join(available_slots)}." if available_slots else f"We are fully booked for {date}."
+    except resilience.DBUnavailable:
+        raise  # Spoken fallback from resilience.budgeted
     except Exception as e:
-        return f"Error checking slots: {str(e)}"
+        return _tool_error(ctx.userdata, f"Error checking slots: {str(e)}")
 
-from dateutil import parser as date_parser
+@llm.function_tool
+@telemetry.timed_tool
+@resilience.budgeted
+async def find_next_available(ctx: RunContext[SessionState], start_date: str, end_date: str = "",
+                              earliest_time: str = "", latest_time: str = "", count: int = 5,
+                              near_time: str = ""):
+    """Find the earliest free slots across a date range in one lookup.
+
+    Use for "whenever is soonest" or "any morning next week" instead of calling fetch_slots day by day.
+    With near_time, returns the openings closest to that time on start_date instead ("as close to Thursday at 2 as you can").
+
+    Args:
+        start_date: First day to search (YYYY-MM-DD).
+        end_date: Last day to search (YYYY-MM-DD). Defaults to a week after start_date.
+        earliest_time: Optional earliest time of day (HH:MM, 24h, or spoken like "9am"), e.g. "09:00" for mornings.
+        latest_time: Optional latest start time of day (HH:MM, 24h, or spoken), e.g. "11:30" for mornings.
+        count: How many openings to return (1-10).
+        near_time: Optional time on start_date to search outward from (HH:MM, 24h), e.g. "14:00".
+    """
+    try:
+        first_day = dates.parse_date(start_date)
+        if first_day is None:
+            return f"I couldn't tell which day '{start_date}' is. Could you give me the date?"
+        last_day = (dates.parse_date(end_date) if end_date else None) or first_day + timedelta(days=6)
+        last_day = min(max(last_day, first_day), first_day + timedelta(days=MAX_SEARCH_DAYS - 1))
+        count = min(max(int(count), 1), 10)
+        # Spoken times ("9am", "half past two") parse like book_appointment's; anything
+        # unreadable goes back to the caller instead of surfacing a Python error
+        times = {}
+        for label, value in (("earliest", earliest_time), ("latest", latest_time), ("near", near_time)):
+            times[label] = dates.parse_time(value) if value else None
+            if value and times[label] is None:
+                return f"I couldn't tell what time '{value}' is. Could you say that time again?"
+        target_time = times["near"]
+
+        # One range query for every day, then the slot engine picks the earliest free starts
+        bookings = await availability.range_bookings(first_day, last_day)
+        not_before = datetime.now(timezone.utc) + timedelta(minutes=MIN_LEAD_MINUTES)
+        band = {"earliest": times["earliest"], "latest": times["latest"], "not_before": not_before}
+        if target_time is not None:
+            target = datetime.combine(first_day, target_time, tzinfo=timezone.utc)
+            free = CALENDAR.nearest_free(bookings, target, first_day, last_day, count, **band)
+        else:
+            free = CALENDAR.earliest_free(bookings, first_day, last_day, count, **band)
+
+        openings = [slot.strftime('%A, %b %d at %I:%M %p') for slot in free]
+        _publish_to_ui(ctx.userdata, "find_next_available", {"available_slots": openings})
+        if not openings:
+            return f"Nothing is open between {first_day.isoformat()} and {last_day.isoformat()} in that window."
+        lead = "The closest openings are: " if target_time is not None else "The earliest openings are: "
+        return lead + "; ".join(openings) + "."
+    except resilience.DBUnavailable:
+        raise  # Spoken fallback from resilience.budgeted
+    except Exception as e:
+        return _tool_error(ctx.userdata, f"Error checking slots: {str(e)}")
 
 @llm.function_tool
-async def book_appointment(ctx: RunContext, name: str, contact_number: str, date: str, time_str: str):
+@telemetry.timed_tool
+@resilience.budgeted
+async def book_appointment(ctx: RunContext[SessionState], name: str, contact_number: str, date: str, time_str: str):
     """V2 Hardened: Flexible parsing and isolated side-effects."""
     try:
-        # 1. FLEXIBLE TIME PARSING
-        # This handles "13:00", "1:00 PM", and "13:00:00" (the culprit in your logs)
-        try:
-            time_obj = date_parser.parse(time_str).time()
-
-            requested_dt = datetime.combine(datetime.fromisoformat(date), time_obj)
-            requested_dt = _to_utc(requested_dt)
-            
-            if _is_in_past(requested_dt):
-                return f"The requested time {time_str} on {date} is in the past. Please pick a time in the future."
-            
-            slot_iso = requested_dt.strftime("%Y-%m-%dT%H:%M:00Z")
-
-        except Exception as e:
-            return f"I had trouble understanding the time '{time_str}'. Could you try saying it differently?";
-    
+        # 1. FLEXIBLE PARSING (dates.py, shared with modify_appointment)
+        # Handles "13:00", "1:00 PM", "13:00:00", "half past two"; "tomorrow", "next Friday"
+        day = dates.parse_date(date)
+        if day is None:
+            return f"I had trouble understanding the date '{date}'. Could you try saying it differently?"
+        time_obj = dates.parse_time(time_str)
+        if time_obj is None:
+            return f"I had trouble understanding the time '{time_str}'. Could you try saying it differently?"
+        date = day.isoformat()
+
+        requested_dt = _to_utc(datetime.combine(day, time_obj))
+        if _is_in_past(requested_dt):
+            return f"The requested time {time_str} on {date} is in the past. Please pick a time in the future."
 
-        # 2. COLLISION CHECK
-        start_window = (requested_dt - timedelta(minutes=29)).isoformat()
-        end_window = (requested_dt + timedelta(minutes=29)).isoformat()
-        conflicts = supabase.table("appointments").select("*").gte("appointment_slot", start_window).lte("appointment_slot", end_window).execute()
-        
-        if conflicts.data:
+        slot_iso = requested_dt.strftime("%Y-%m-%dT%H:%M:00Z")
+
+
+        # 2. FAST REJECT (served from the day cache fetch_slots just warmed)
+        if not await availability.is_free(requested_dt):
             return "That slot is already reserved. Please pick a different time."
 
-        # 3. DATABASE TRANSACTION
+        # 3. ATOMIC RESERVATION: conflict check + insert in one round trip
+        reservation = await db.reserve_appointment(name, contact_number, slot_iso,
+                                                   CALENDAR.conflict_window, CALENDAR.resources)
+        if not reservation["ok"]:
+            availability.invalidate(requested_dt)
+            return _conflict_reply(reservation, "That slot is already reserved.")
+
+        availability.record_booking(reservation["id"], requested_dt)
+        identity.record_booking(contact_number, name)
+        ctx.userdata.drop_prefetch()
         data = {
             "user_name": name, 
             "contact_number": contact_number, 
             "appointment_slot": slot_iso, 
             "status": "booked"
         }
-        supabase.table("appointments").insert(data).execute()
 
         # 4. ISOLATED SIDE EFFECT (UI Broadcast)
         # We wrap this in its own try/except so if the UI fails, 
         # the user still gets a success message from the agent.
         try:
-            await _publish_to_ui("book_appointment", {"success": True, "data": data})
+            _publish_to_ui(ctx.userdata, "book_appointment", {"success": True, "data": data})
         except Exception as ui_err:
             print(f"Non-critical UI Broadcast Error: {ui_err}")
 
         return f"Perfect. I've scheduled that for {name} on {date} at {time_obj.strftime('%I:%M %p')}."
 
+    except resilience.DBUnavailable:
+        raise  # Spoken fallback from resilience.budgeted
     except Exception as e:
         print(f"Critical Tool Failure: {e}")
-        return "I encountered a technical issue while finalizing the booking, though the record may have been created. Let me double-check that for you."
+        return _tool_error(ctx.userdata, "I encountered a technical issue while finalizing the booking, though the record may have been created. Let me double-check that for you.")
 
 # @llm.function_tool
 # async def retrieve_appointments(ctx: RunContext, contact_number: str):
@@ -189,30 +297,26 @@ async def book_appointment(ctx: RunContext, name: str, contact_number: str, date
 #     return "I found these: " + ", ".join(summary_list) + ". Which one would you like to handle?"
 
 @llm.function_tool
-async def retrieve_appointments(ctx: RunContext, contact_number: str):
-    global SESSION_ID_MAP
-    
-    # 1. FIX: Await the async client to prevent blocking the agent
-    # 2. FIX: Select ONLY the columns Aria needs to speak (id, appointment_slot)
-    # 3. FIX: Limit to 5 results so the LLM doesn't choke on tokens
-    result = await supabase_async.table("appointments") \
-        .select("id, appointment_slot") \
-        .eq("contact_number", contact_number) \
-        .order("appointment_slot", desc=True) \
-        .limit(5) \
-        .execute()
+@telemetry.timed_tool
+@resilience.budgeted
+async def retrieve_appointments(ctx: RunContext[SessionState], contact_number: str):
+    # db.list_appointments awaits the shared async client, selects only the
+    # columns Aria speaks (id, appointment_slot) and caps the result at 5 rows
+    clean_number = "".join(filter(str.isdigit, contact_number))
+    rows = await ctx.userdata.prefetched_appointments(clean_number, PREFETCH_MAX_AGE)
+    if rows is None:
+        rows = await db.list_appointments(contact_number, limit=5)
     
-    if not result.data:
+    if not rows:
         return "No appointments found for this contact number."
     
     now = datetime.now(timezone.utc)
     summary_list = []
-    SESSION_ID_MAP = {} 
+    # The #1/#2 map lives on this session only, so other rooms can't overwrite it
+    ctx.userdata.remember_appointments([a['id'] for a in rows])
     
     # Process only the filtered results
-    for index, a in enumerate(result.data, start=1):
-        SESSION_ID_MAP[str(index)] = a['id']
-        
+    for index, a in enumerate(rows, start=1):
         # Parse ISO format and handle 'Z' suffix safely
         dt = datetime.fromisoformat(a['appointment_slot'].replace('Z', '+00:00'))
         status = "Past" if dt < now else "Upcoming"
@@ -226,51 +330,70 @@ async def retrieve_appointments(ctx: RunContext, contact_number: str):
     return "I found these: " + "; ".join(summary_list) + ". Which one would you like to handle?"
 
 @llm.function_tool
-async def modify_appointment(ctx: RunContext, appointment_number: str, new_date: str, new_time: str):
+@telemetry.timed_tool
+@resilience.budgeted
+async def modify_appointment(ctx: RunContext[SessionState], appointment_number: str, new_date: str, new_time: str):
     """V2 Logic: Uses simple numbers + Collision checking."""
-    real_uuid = SESSION_ID_MAP.get(str(appointment_number))
+    real_uuid = ctx.userdata.resolve(appointment_number)
     if not real_uuid: return "Please list your appointments first so I know which one to modify."
 
     try:
-        # Time Parsing & Slotting
-        try: t_obj = datetime.strptime(new_time, "%I:%M %p").time()
-        except: t_obj = datetime.strptime(new_time, "%H:%M").time()
-        
-        requested_dt = datetime.combine(datetime.fromisoformat(new_date), t_obj)
-        requested_dt = _to_utc(requested_dt)
+        # Same parser as book_appointment, so anything bookable is also movable
+        day = dates.parse_date(new_date)
+        t_obj = dates.parse_time(new_time)
+        if day is None or t_obj is None:
+            return f"I had trouble understanding '{new_date} {new_time}'. Could you say the new day and time again?"
+
+        requested_dt = _to_utc(datetime.combine(day, t_obj))
         if _is_in_past(requested_dt):
             return f"I can’t move an appointment to a past time. What new day and time would you like instead?"
         
         new_iso = requested_dt.strftime("%Y-%m-%dT%H:%M:00Z")
 
-        # Collision Check (Global)
-        conflicts = supabase.table("appointments").select("*").neq("id", real_uuid).gte("appointment_slot", (requested_dt - timedelta(minutes=29)).isoformat()).lte("appointment_slot", (requested_dt + timedelta(minutes=29)).isoformat()).execute()
-        
-        if conflicts.data: return "That new time is already taken."
-
-        supabase.table("appointments").update({"appointment_slot": new_iso}).eq("id", real_uuid).execute()
-        await _publish_to_ui("modify_appointment", {"success": True})
-        return f"Updated to {new_date} at {new_time}."
+        # Collision Check (Global): cached fast reject, then the atomic move
+        if not await availability.is_free(requested_dt, exclude_id=real_uuid):
+            return "That new time is already taken."
+
+        moved = await db.move_appointment(real_uuid, new_iso, CALENDAR.conflict_window, CALENDAR.resources)
+        if moved.get("missing"):
+            return "I couldn't find that appointment anymore. Let me pull up your list again."
+        if not moved["ok"]:
+            availability.invalidate(requested_dt)
+            return _conflict_reply(moved, "That new time is already taken.")
+
+        availability.record_booking(real_uuid, requested_dt)
+        ctx.userdata.drop_prefetch()
+        _publish_to_ui(ctx.userdata, "modify_appointment", {"success": True})
+        return f"Updated to {day.isoformat()} at {t_obj.strftime('%I:%M %p')}."
+    except resilience.DBUnavailable:
+        raise  # Spoken fallback from resilience.budgeted
     except Exception as e:
-        return f"Update error: {str(e)}"
+        return _tool_error(ctx.userdata, f"Update error: {str(e)}")
 
 @llm.function_tool
-async def cancel_appointment(ctx: RunContext, appointment_number: str):
+@telemetry.timed_tool
+@resilience.budgeted
+async def cancel_appointment(ctx: RunContext[SessionState], appointment_number: str):
     """V2 Logic: Cancel by number (#1, #2) instead of UUID."""
-    real_uuid = SESSION_ID_MAP.get(str(appointment_number))
+    real_uuid = ctx.userdata.resolve(appointment_number)
     if not real_uuid: return "I don't see an appointment with that number in my recent lookup."
 
-    supabase.table("appointments").delete().eq("id", real_uuid).execute()
-    await _publish_to_ui("cancel_appointment", {"success": True})
+    await db.delete_appointment(real_uuid)
+    availability.forget(real_uuid)
+    ctx.userdata.drop_prefetch()
+    _publish_to_ui(ctx.userdata, "cancel_appointment", {"success": True})
     return "Successfully cancelled."
 
 @llm.function_tool
-async def summarize_and_exit(ctx: RunContext, summary: str):
+@telemetry.timed_tool
+async def summarize_and_exit(ctx: RunContext[SessionState], summary: str):
     """V1 Logic: Final recap and disconnect."""
-    room = get_job_context().room
-    metrics = calculate_session_metrics()
+    metrics = calculate_session_metrics(ctx.userdata)
     full_report = f"CONVERSATION RECAP:\n{summary}\n\nTECHNICAL PERFORMANCE:\n{metrics}"
 
-    await _publish_to_ui("summarize_and_exit", {"summary": full_report})
-    asyncio.create_task(delayed_disconnect(room))
-    return "Summary generated. Goodbye."
\ No newline at end of file
+    ctx.userdata.ui.emit("summary", text=full_report, actions=ctx.userdata.ui.actions)
+    await ctx.userdata.ui.flush()  # The report must land before the hang-up
+    goodbye = await tts_cache.say_cached(ctx.session, EXIT_LINE, allow_interruptions=False)
+    # Hang up the moment the goodbye finishes playing instead of after a fixed delay
+    ctx.userdata.lifecycle.hang_up_after(goodbye)
+    return "Summary generated. The goodbye line has already been spoken; say nothing else."
\ No newline at end of file
@@ -0,0 +1,180 @@
+import hashlib
+import os
+import struct
+from collections import OrderedDict
+
+from livekit import rtc
+
+import costs
+
+# Aria repeats a handful of lines on almost every call (greeting, goodbye).
+# LiveKit runs each job in a fresh process, so the memory LRU alone would be
+# empty on every call: the disk store is what carries the audio from one job
+# process to the next. prewarm loads the fixed lines from it before a process
+# takes a job; only the first render on a host (or after a voice change)
+# goes to the TTS service.
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+# Shared by every job process on the host; set TTS_CACHE_DIR= (empty) for memory only.
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".tts_cache")) or None
+VOICE_KEY = os.getenv("CARTESIA_VOICE", "cartesia-default")
+
+# File layout: magic, sample_rate, num_channels, PCM byte length, then the PCM.
+# Job processes share TTS_CACHE_DIR, so files are written whole via os.replace
+# and anything that fails validation on load is treated as a miss.
+_MAGIC = b"ATC1"
+_HEADER = struct.Struct("<4sIII")
+REPLAY_CHUNK_MS = 50
+
+class CachedAudio:
+    """One utterance as contiguous 16-bit PCM."""
+
+    __slots__ = ("sample_rate", "num_channels", "pcm")
+
+    def __init__(self, sample_rate: int, num_channels: int, pcm: bytes):
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+        self.pcm = pcm
+
+    @classmethod
+    def from_frames(cls, frames: list) -> "CachedAudio":
+        first = frames[0]
+        return cls(first.sample_rate, first.num_channels, b"".join(bytes(f.data) for f in frames))
+
+    async def frames(self):
+        """Replays the audio as short frames for session.say(audio=...)."""
+        samples_per_chunk = self.sample_rate * REPLAY_CHUNK_MS // 1000
+        chunk_bytes = samples_per_chunk * self.num_channels * 2
+        for offset in range(0, len(self.pcm), chunk_bytes):
+            data = self.pcm[offset:offset + chunk_bytes]
+            yield rtc.AudioFrame(data, self.sample_rate, self.num_channels, len(data) // (2 * self.num_channels))
+
+
+class TTSAudioCache:
+    """LRU of rendered utterances keyed by (voice, text), bounded by total PCM bytes."""
+
+    def __init__(self, max_bytes: int, disk_dir: str | None = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries: OrderedDict[tuple[str, str], CachedAudio] = OrderedDict()
+        self.bytes_held = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _path(self, voice: str, text: str) -> str:
+        digest = hashlib.sha1(f"{voice}\0{text}".encode()).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.pcm")
+
+    def _load(self, voice: str, text: str) -> CachedAudio | None:
+        if not self.disk_dir:
+            return None
+        path = self._path(voice, text)
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+        except OSError:
+            return None
+        if len(blob) < _HEADER.size:
+            print(f"TTS Cache Ignoring Corrupt File: {path}")
+            return None
+        magic, sample_rate, num_channels, length = _HEADER.unpack_from(blob)
+        pcm = blob[_HEADER.size:]
+        if magic != _MAGIC or not sample_rate or not num_channels or len(pcm) != length \
+                or length % (2 * num_channels):
+            print(f"TTS Cache Ignoring Corrupt File: {path}")
+            return None
+        return CachedAudio(sample_rate, num_channels, pcm)
+
+    def _store(self, key: tuple[str, str], audio: CachedAudio):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes_held -= len(old.pcm)
+        self._entries[key] = audio
+        self.bytes_held += len(audio.pcm)
+        while self.bytes_held > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes_held -= len(evicted.pcm)
+            self.evictions += 1
+
+    def preload(self, voice: str, texts) -> int:
+        """Pulls disk entries into memory ahead of the first call, without counting lookups."""
+        loaded = 0
+        for text in texts:
+            if (voice, text) not in self._entries:
+                audio = self._load(voice, text)
+                if audio is not None:
+                    self._store((voice, text), audio)
+                    loaded += 1
+        return loaded
+
+    def get(self, voice: str, text: str) -> CachedAudio | None:
+        key = (voice, text)
+        audio = self._entries.get(key)
+        if audio is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return audio
+        audio = self._load(voice, text)
+        if audio is not None:
+            self._store(key, audio)
+            self.hits += 1
+            return audio
+        self.misses += 1
+        return None
+
+    def put(self, voice: str, text: str, audio: CachedAudio):
+        self._store((voice, text), audio)
+        if self.disk_dir:
+            path = self._path(voice, text)
+            tmp = f"{path}.{os.getpid()}.tmp"  # Per-process name: concurrent writers never share one
+            try:
+                with open(tmp, "wb") as f:
+                    f.write(_HEADER.pack(_MAGIC, audio.sample_rate, audio.num_channels, len(audio.pcm)) + audio.pcm)
+                os.replace(tmp, path)  # Readers see the old file or the whole new one, never a prefix
+            except OSError as e:
+                print(f"TTS Cache Write Error: {e}")
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.bytes_held,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+AUDIO_CACHE = TTSAudioCache(TTS_CACHE_MAX_BYTES, TTS_CACHE_DIR)
+
+async def render(tts, text: str, cache: TTSAudioCache = AUDIO_CACHE) -> CachedAudio:
+    """Returns the audio for `text`, synthesizing and caching it on a miss."""
+    audio = cache.get(VOICE_KEY, text)
+    if audio is not None:
+        return audio
+    frames = []
+    async with tts.synthesize(text) as stream:
+        async for chunk in stream:
+            frames.append(chunk.frame)
+    audio = CachedAudio.from_frames(frames)
+    cache.put(VOICE_KEY, text, audio)
+    ledger = costs.current_ledger.get()  # Renders run outside the session's own TTS metrics
+    if ledger is not None:
+        ledger.add_tts(len(text), len(audio.pcm) / (2 * audio.num_channels * audio.sample_rate))
+    return audio
+
+async def say_cached(session, text: str, **kwargs):
+    """session.say() that replays cached audio, falling back to live TTS."""
+    try:
+        audio = await render(session.tts, text)
+    except Exception as e:
+        print(f"TTS Cache Error: {e}")
+        return session.say(text, **kwargs)
+    return session.say(text, audio=audio.frames(), **kwargs)
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import os
+import zlib
+
+# Wire format (topic "aria.ui"), one packet per flush:
+#   b"j" + compact JSON   or   b"z" + zlib(compact JSON) for large packets
+#   {"v": 2, "s": <seq>, "e": [{"k": <kind>, ...fields}], "snap": true?}
+# Kinds: "status" (tool started), "tool" (tool result), "summary" (final report).
+# The page sends {"t": "sync", "s": <last seq>} on join or when it sees a gap,
+# and gets the latest event of each kind back instead of blind repeats.
+TOPIC = "aria.ui"
+UI_BATCH_WINDOW_MS = int(os.getenv("UI_BATCH_WINDOW_MS", "40"))
+COMPRESS_OVER_BYTES = 512
+
+# Worker-wide totals, exported on the metrics endpoint.
+UI_TOTALS = {"messages": 0, "bytes": 0, "events": 0, "snapshots": 0}
+
+TOOL_DISPLAY_MAP = {
+    "identify_user": "Verifying identity...",
+    "fetch_slots": "Finding available slots...",
+    "find_next_available": "Searching for the next openings...",
+    "book_appointment": "Securing your appointment...",
+    "retrieve_appointments": "Accessing your records...",
+    "modify_appointment": "Updating your schedule...",
+    "cancel_appointment": "Processing cancellation...",
+    "summarize_and_exit": "Finalizing session notes..."
+}
+
+def encode(packet: dict) -> bytes:
+    raw = json.dumps(packet, separators=(",", ":"), ensure_ascii=False).encode()
+    if len(raw) > COMPRESS_OVER_BYTES:
+        return b"z" + zlib.compress(raw, 6)
+    return b"j" + raw
+
+class UIChannel:
+    """Per-session UI event stream: batched within a short window, sequenced,
+    and replayable as a snapshot when the page (re)joins."""
+
+    def __init__(self, room, state, window_ms: int = UI_BATCH_WINDOW_MS):
+        self.room = room
+        self.state = state
+        self.window = window_ms / 1000
+        self.seq = 0
+        self.pending: list[dict] = []
+        self.snapshot: dict[str, dict] = {}  # Latest event per kind
+        self.messages = 0
+        self.bytes = 0
+        self.actions = 0  # Tools started this session, shown on the page
+        self._flush_task: asyncio.Task | None = None
+        room.on("data_received", self._on_data)
+
+    def emit(self, kind: str, **fields):
+        """Queues an event; it goes out with anything else emitted in the same window."""
+        event = {"k": kind, **fields}
+        self.pending.append(event)
+        self.snapshot[kind] = event
+        UI_TOTALS["events"] += 1
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = self.state.spawn(self._flush_later())
+
+    def tool_started(self, tool_name: str):
+        """Queues the friendly status line for a tool that just started."""
+        self.actions += 1
+        self.emit("status", tool=tool_name, text=TOOL_DISPLAY_MAP.get(tool_name, "Processing..."),
+                  actions=self.actions)
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        await self.flush()
+
+    async def flush(self):
+        """Sends everything queued now (also called right before hang-up)."""
+        if not self.pending:
+            return
+        events, self.pending = self.pending, []
+        self.seq += 1
+        await self._send({"v": 2, "s": self.seq, "e": events})
+
+    async def replay(self, identity: str | None = None):
+        """Sends the latest event of every kind, e.g. to a page that just (re)joined."""
+        if not self.snapshot:
+            return
+        UI_TOTALS["snapshots"] += 1
+        await self._send({"v": 2, "s": self.seq, "snap": True, "e": list(self.snapshot.values())},
+                         [identity] if identity else [])
+
+    async def _send(self, packet: dict, destinations: list[str] | None = None):
+        payload = encode(packet)
+        try:
+            await self.room.local_participant.publish_data(
+                payload, reliable=True, topic=TOPIC, destination_identities=destinations or []
+            )
+        except Exception as e:
+            print(f"UI Broadcast Error: {e}")
+            return
+        self.messages += 1
+        self.bytes += len(payload)
+        UI_TOTALS["messages"] += 1
+        UI_TOTALS["bytes"] += len(payload)
+
+    def _on_data(self, packet):
+        if packet.topic != TOPIC:
+            return
+        try:
+            request = json.loads(packet.data)
+        except ValueError:
+            return
+        if request.get("t") == "sync":
+            identity = packet.participant.identity if packet.participant else None
+            self.state.spawn(self.replay(identity))
+
+    def stats(self) -> dict:
+        return {"messages": self.messages, "bytes": self.bytes, "seq": self.seq}